@@ -1,4 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+from operator import itemgetter
+from typing import List
 
 # ---- Class to store REFEREE message contents ----
 @dataclass
@@ -78,6 +80,42 @@ class DiveMessage:
     dvov_not_rank_flag: str          # 73
     team_event: str                # 74
 
+# ---- Read-only REFEREE message view (used instead of DiveMessage on hot paths) ----
+class DiveMessageView(tuple):
+    """
+    Message fields (as split at "|") with the same attribute names as DiveMessage, missing fields read as "".
+    Built and read by C code only - no per-field Python call (attributes are itemgetter properties, same as namedtuple),
+    so it is cheaper to build and read than DiveMessage (see dev/parse_benchmark.py).
+    """
+    __slots__ = ()
+
+    def __new__(cls, parts):
+        if len(parts) >= DIVE_MESSAGE_FIELD_COUNT:
+            return tuple.__new__(cls, parts[:DIVE_MESSAGE_FIELD_COUNT])
+        return tuple.__new__(cls, (*parts, *_EMPTY_FIELDS[len(parts):]))
+
+    def to_dive_message(self) -> DiveMessage:
+        return DiveMessage(*self)
+
+    def __repr__(self):
+        return repr(self.to_dive_message())
+
+
+DIVE_MESSAGE_FIELD_COUNT = len(fields(DiveMessage))
+_EMPTY_FIELDS = ("",) * DIVE_MESSAGE_FIELD_COUNT
+
+
+def split_dive_message(text: str) -> List[str]:
+    # fields after the ones in DiveMessage are not used, leave them unsplit
+    parts = text.split("|", DIVE_MESSAGE_FIELD_COUNT)
+    if parts[-1].endswith("\r"):
+        parts[-1] = parts[-1][:-1]
+    return parts
+
+for _index, _field in enumerate(fields(DiveMessage)):
+    setattr(DiveMessageView, _field.name, property(itemgetter(_index), doc=_field.name))
+
+
 @dataclass
 class DiveListRecord:
     rank: int
@@ -0,0 +1,180 @@
+'''
+Debug log: structured events with lazy formatting, kept in bounded in-memory ring buffer (flight recorder).
+
+log_info_if_debug(debug, message, *args) (obs_utils.py) records an event - time, level, thread, calling module, message
+as %-format and its args - into ring buffer of the last DEBUG_LOG_CAPACITY events when debug is enabled or recording is
+("Record debug events" setting), otherwise it returns at once. Message is formatted only when it is written: to OBS log
+when debug is enabled, or to dump file. Dumps (<root dir>/debuglog_YYYYmmdd_HHMMSS.log) are made by hotkey
+("Dump Debug Log") and on errors reported by log_error (at most once per DEBUG_DUMP_MIN_INTERVAL_S). Errors are always
+recorded, formatted at once.
+Formatting and writing - OBS log lines and dump files - runs on writer thread, callers only append to ring buffer and
+queue. Args are kept by reference until formatted, pass values which are not changed afterwards.
+'''
+import typing
+
+if typing.TYPE_CHECKING:
+    import _obspython as obs  # full symbol set for IDE
+else:
+    import obspython as obs   # real runtime module
+
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from typing import Deque, List, NamedTuple, Union
+
+DEBUG_LOG_CAPACITY = 5000
+DEBUG_DUMP_MIN_INTERVAL_S = 60.0
+DEBUG_LOG_FILE_EXT = ".log"
+DEBUG_LOG_THREAD_NAME = "DiveRecorder log writer"
+DEBUG_LOG_FLUSH_TIMEOUT = 2.0  # seconds
+
+
+class DebugEvent(NamedTuple):
+    time: float     # time.time()
+    level: int      # obs.LOG_*
+    thread: str
+    source: str     # calling module
+    message: str    # %-format
+    args: tuple
+
+    def text(self) -> str:
+        return _format(self.message, self.args)
+
+
+def _format(message: str, args: tuple) -> str:
+    if not args:
+        return message
+    try:
+        return message % args
+    except Exception:  # bad format or arg which can't be formatted, shouldn't lose the rest of the dump
+        return f"{message} (args not formatted)"
+
+
+root_dir = ""
+recording = False  # debug events recorded even when debug is off
+
+_events: Deque[DebugEvent] = deque(maxlen=DEBUG_LOG_CAPACITY)
+_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+_writer: Union[threading.Thread, None] = None
+_writer_lock = threading.Lock()
+_last_error_dump = 0.0
+
+_LEVEL_NAMES = {obs.LOG_ERROR: "error", obs.LOG_WARNING: "warning", obs.LOG_INFO: "info", obs.LOG_DEBUG: "debug"}
+
+
+def log_event(level: int, message: str, args: tuple, write: bool, depth: int = 2) -> DebugEvent:
+    """Records event (caller's caller is the source by default), queues it for OBS log if write."""
+    event = DebugEvent(time.time(), level, threading.current_thread().name,
+                       sys._getframe(depth).f_globals.get("__name__", "?"), message, args)
+    _events.append(event)
+    if write:
+        _put(("log", event))
+    return event
+
+
+def log_error(message: str, *args):
+    """
+    Error: formatted and written to OBS log at once (not through writer thread), ring buffer dumped. Args (e.g. exception
+    with its traceback and frames) are not kept.
+    """
+    global _last_error_dump
+    text = _format(message, args)
+    log_event(obs.LOG_ERROR, text, (), False)
+    obs.script_log(obs.LOG_ERROR, text)
+
+    now = time.monotonic()
+    if root_dir and now - _last_error_dump >= DEBUG_DUMP_MIN_INTERVAL_S:
+        _last_error_dump = now
+        dump_debug_log("error")
+
+
+def dump_debug_log(reason: str) -> str:
+    """Queues ring buffer contents to be written to new dump file, returns its path."""
+    path = os.path.join(root_dir, time.strftime("debuglog_%Y%m%d_%H%M%S") + DEBUG_LOG_FILE_EXT)
+    _put(("dump", (path, reason, list(_events))))
+    return path
+
+
+def get_debug_events() -> List[DebugEvent]:
+    return list(_events)
+
+
+def flush_debug_log(timeout: float = DEBUG_LOG_FLUSH_TIMEOUT) -> bool:
+    """Waits until everything queued so far is written."""
+    if _writer is None:
+        return True
+    done = threading.Event()
+    _put(("flush", done))
+    return done.wait(timeout)
+
+
+# ---------------------------
+# Writer thread
+# ---------------------------
+def _put(item):
+    if _writer is None:
+        _start_writer()
+    _queue.put(item)
+
+
+def _start_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            return
+        _writer = threading.Thread(target=_writer_main, name=DEBUG_LOG_THREAD_NAME)
+        _writer.daemon = True  # thread will exit when OBS exits
+        _writer.start()
+
+
+def _writer_main():
+    while True:
+        kind, payload = _queue.get()
+        if kind == "stop":
+            return
+        try:
+            if kind == "log":
+                obs.script_log(payload.level, payload.text())
+            elif kind == "dump":
+                _write_dump(*payload)
+            elif kind == "flush":
+                payload.set()
+        except Exception as e:
+            obs.script_log(obs.LOG_ERROR, f"Debug log writer error: {e}")
+
+
+def _write_dump(path: str, reason: str, events: List[DebugEvent]):
+    try:
+        with open(path, "w", encoding="utf-8") as dump_file:
+            for event in events:
+                stamp = time.strftime("%H:%M:%S", time.localtime(event.time)) + f".{int(event.time * 1000) % 1000:03d}"
+                dump_file.write(f"{stamp} {_LEVEL_NAMES.get(event.level, event.level)} [{event.thread}] {event.source}: {event.text()}\n")
+    except OSError as e:
+        obs.script_log(obs.LOG_ERROR, f"Failed to write debug log {path}: {e}")
+        return
+    obs.script_log(obs.LOG_INFO, f"Debug log ({reason}): last {len(events)} events written to {path}")
+
+
+def _stop_writer():
+    global _writer
+    with _writer_lock:
+        writer = _writer
+        _writer = None
+    if writer is not None:
+        _queue.put(("stop", None))
+        writer.join(DEBUG_LOG_FLUSH_TIMEOUT)
+
+
+# ---------- OBS script lifecycle ----------
+def dvov_debug_log_script_update(settings):
+    global root_dir, recording
+    root_dir = obs.obs_data_get_string(settings, "rootDir")
+    recording = obs.obs_data_get_bool(settings, "debug_log_recording")
+
+
+def dvov_debug_log_script_unload():
+    flush_debug_log()
+    _stop_writer()
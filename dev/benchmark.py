@@ -0,0 +1,290 @@
+'''
+OBS API call-count benchmark.
+
+Runs the script against the fake obspython module (dev/obspython.py) and the real scene collection
+(Scenes/Diving_Streaming_and_Board.json) and reports number of OBS calls and wall time per operation:
+REFEREE pre-dive/awards messages (individual and synchro, single and bursts), AVIDEO ENDOFEVENT, rankings set divers/page flip, F1-F10 hotkeys.
+
+Usage:
+    python dev/benchmark.py                        # print report
+    python dev/benchmark.py --save baseline.json   # save results
+    python dev/benchmark.py --flag-pool            # with next diver's flag preloaded (flag_pool.py)
+    python dev/benchmark.py --compare baseline.json [--tolerance 10]
+                                                   # fail (exit code 1) if any operation makes more OBS calls than in baseline
+'''
+import argparse
+import dataclasses
+import json
+import os
+import sys
+import time
+from collections import Counter
+from typing import Callable, Dict, List
+
+DEV_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(DEV_DIR)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, DEV_DIR)  # fake obspython must win over real one
+
+import obspython as obs  # noqa: E402 (fake)
+
+SCENE_COLLECTION = os.path.join(ROOT_DIR, "Scenes", "Diving_Streaming_and_Board.json")
+
+UDP_TICK_MS = 200
+
+
+# ---------- Message builders
+def make_referee_message(**fields) -> str:
+    '''Builds REFEREE datagram text, fields are named as in DiveMessage.'''
+    from datatypes import DiveMessage
+
+    names = [f.name for f in dataclasses.fields(DiveMessage)]
+    values = {name: "" for name in names}
+    values.update(packet_id="REFEREE", event_ab="a", sending_computer_id="BENCH", event_mode="1", event_status="1",
+                  synchro_event="False", number_of_judges="5", long_event_name="Men 1m Springboard",
+                  short_event_name="M1m", meet_title="Benchmark Meet", rounds_in_event="6", divers_in_event="12")
+    values.update(fields)
+    return "|".join(values[name] for name in names) + "|^"
+
+
+def make_diver(no: int, synchro: bool, awards: bool, judges: int = 5, event_ab: str = "a") -> str:
+    fields = dict(
+        event_ab=event_ab,
+        synchro_event="True" if synchro else "False",
+        number_of_judges=str(judges),
+        round=str(1 + no % 6),
+        start_no=str(no),
+        d1_first_name=f"First{no}", d1_family_name=f"Family{no}", d1_team_code=["KPM", "VDC", "SSC", "lt"][no % 4],
+        d1_full_name_team=f"First{no} Family{no} ({['KPM', 'VDC', 'SSC', 'lt'][no % 4]})",
+        dive_no=str(101 + no), pos_code="BCD"[no % 3], dd="1.9", board="3",
+        dive_description="Forward Dive", total=f"{no * 10}.50",
+    )
+    if synchro:
+        fields.update(d2_first_name=f"Second{no}", d2_family_name=f"Pair{no}", d2_team_code="VDC")
+    if awards:
+        scores = ["6", "6½", "7", "6", "5½", "6", "7", "6½", "6", "7", "6"]
+        for i in range(judges):
+            fields[f"j{i + 1}"] = scores[i]
+        fields.update(points="33.60", rank=str(1 + no % 8), penalty_code="0")
+    return make_referee_message(**fields)
+
+
+def make_rankings(count: int):
+    from datatypes import DiveListRecord
+
+    return [DiveListRecord(rank=i, points=f"{300 - i * 7}.45", unknown="", diver=f"First{i} Family{i}",
+                           start_position=count - i + 1, club_code=["KPM", "VDC", "SSC"][i % 3])
+            for i in range(1, count + 1)]
+
+
+# ---------- Harness
+class QueueSocket:
+    '''Non-blocking UDP socket stand-in: returns queued datagrams, then raises BlockingIOError.'''
+
+    def __init__(self):
+        self.datagrams: List[bytes] = []
+
+    def recvfrom(self, bufsize):
+        if not self.datagrams:
+            raise BlockingIOError()
+        return self.datagrams.pop(0), ("127.0.0.1", 58091)
+
+    def setblocking(self, flag):
+        pass
+
+    def close(self):
+        pass
+
+
+class Bench:
+    def __init__(self, flag_pool: bool = False):
+        obs.fake_reset()
+        obs.fake_load_scene_collection(SCENE_COLLECTION)
+
+        import dive_recorder_overlays as script
+        self.script = script
+
+        self.settings = obs.obs_data_create()
+        script.script_defaults(self.settings)
+        obs.obs_data_set_string(self.settings, "rootDir", ROOT_DIR)
+        obs.obs_data_set_bool(self.settings, "overlays_enabled", True)
+        obs.obs_data_set_bool(self.settings, "rankings_enabled", True)
+        obs.obs_data_set_bool(self.settings, "udp_polling_enabled", True)
+        obs.obs_data_set_bool(self.settings, "flag_pool_enabled", flag_pool)
+
+        script.script_load(self.settings)
+        script.script_update(self.settings)
+
+        # replace real socket bound by script_load
+        if script.udp_sock is not None:
+            script.udp_sock.close()
+        self.socket = QueueSocket()
+        script.udp_sock = self.socket
+
+        obs.fake_advance(5000)  # let startup timers (source paths) run
+        if flag_pool:
+            import flag_pool as pool
+            from datatypes import DiveListRecord
+            # start list of make_diver divers - REFEREE runs send them in start order
+            pool.dvov_flag_pool_preload(DiveListRecord(rank=no, points="", unknown="", diver=f"First{no} Family{no}",
+                                                       start_position=no, club_code=["KPM", "VDC", "SSC", "lt"][no % 4])
+                                        for no in range(1, 13))
+        self.results: Dict[str, dict] = {}
+
+    def send(self, *texts: str):
+        '''Queues datagram(s) and runs one UDP timer tick.'''
+        self.socket.datagrams.extend(text.encode() for text in texts)
+        obs.fake_advance(UDP_TICK_MS)
+
+    def measure(self, name: str, operation: Callable[[], None], runs: int):
+        calls = Counter()
+        wall_ns = 0
+        obs_ns = 0
+        for _ in range(runs):
+            obs.fake_reset_calls()
+            start = time.perf_counter_ns()
+            operation()
+            wall_ns += time.perf_counter_ns() - start
+            obs_ns += obs.fake_call_time_ns()
+            calls.update(obs.fake_call_counts())
+
+        total_calls = sum(calls.values())
+        self.results[name] = {
+            "runs": runs,
+            "obs_calls": total_calls / runs,
+            "source_updates": calls["obs_source_update"] / runs,
+            "visibility_changes": calls["obs_sceneitem_set_visible"] / runs,
+            "wall_ms": wall_ns / runs / 1e6,
+            "obs_ms": obs_ns / runs / 1e6,
+        }
+
+
+def run(runs: int, flag_pool: bool = False) -> Dict[str, dict]:
+    bench = Bench(flag_pool)
+    script = bench.script
+
+    # ----- REFEREE messages, alternate divers so values really change
+    for synchro in (False, True):
+        label = "synchro" if synchro else "individual"
+        judges = 11 if synchro else 5
+        counter = iter(range(1, 10 ** 6))
+
+        def predive():
+            bench.send(make_diver(next(counter) % 12 + 1, synchro, awards=False, judges=judges))
+
+        def awards():
+            bench.send(make_diver(next(counter) % 12 + 1, synchro, awards=True, judges=judges))
+
+        def predive_awards_pair():
+            no = next(counter) % 12 + 1
+            bench.send(make_diver(no, synchro, awards=False, judges=judges))
+            bench.send(make_diver(no, synchro, awards=True, judges=judges))
+
+        def repeated():
+            bench.send(make_diver(3, synchro, awards=True, judges=judges))
+            bench.send(make_diver(4, synchro, awards=True, judges=judges))
+
+        predive()  # warm-up (scene item index etc.)
+        bench.measure(f"REFEREE {label} pre-dive", predive, runs)
+        bench.measure(f"REFEREE {label} awards", awards, runs)
+        bench.measure(f"REFEREE {label} pre-dive+awards", predive_awards_pair, runs)
+        bench.measure(f"REFEREE {label} alternating repeats", repeated, runs)
+        bench.measure(f"REFEREE {label} burst (5 in one tick)",
+                      lambda: bench.send(*(make_diver(next(counter) % 12 + 1, synchro, awards=True, judges=judges) for _ in range(5))),
+                      runs)
+
+    bench.measure("AVIDEO ENDOFEVENT", lambda: bench.send("AVIDEO|a|BENCH|1|ENDOFEVENT|^"), runs)
+    bench.measure("empty UDP tick", lambda: obs.fake_advance(UDP_TICK_MS), runs)
+
+    # ----- Rankings
+    # new event each run (full repaint), then same event with one diver on displayed page changed (diff)
+    events = [script.parse_dive_message(make_referee_message(long_event_name=f"Event {no}").split("|")) for no in range(2)]
+    for count in (8, 40):
+        records = make_rankings(count)
+        run_no = iter(range(10 ** 6))
+        bench.measure(f"rankings set divers ({count})",
+                      lambda: script.dvov_rank_set_divers(records, events[next(run_no) % 2]), runs)
+
+    def one_diver_changed():
+        records = make_rankings(40)
+        records[-1] = dataclasses.replace(records[-1], points=f"{next(points)}.00", club_code=f"C{next(points) % 2}")
+        script.dvov_rank_set_divers(records, events[0])
+
+    points = iter(range(10 ** 6))
+    script.dvov_rank_set_divers(make_rankings(40), events[0])
+    bench.measure("rankings update (displayed diver changed)", one_diver_changed, runs)
+
+    import rankings
+    bench.measure("rankings page flip", lambda: obs.fake_advance(rankings.rankings_page_display_duration * 1000), runs)
+    bench.measure("rankings show_page", lambda: rankings.show_page(rankings.ranking_rec_working_copy,
+                                                                    rankings.rankings_event_rec_working_copy, 1), runs)
+
+    # ----- Hotkeys (pressed twice for toggles, so state is the same after each run)
+    bench.send(make_diver(5, False, awards=True))
+    for no in range(1, 11):
+        key = f"htk_{no}"
+        if no in (4, 8, 9, 10):
+            bench.measure(f"F{no} hotkey (x2)", lambda key=key: (obs.fake_press_hotkey(key), obs.fake_press_hotkey(key)), runs)
+        else:
+            bench.measure(f"F{no} hotkey", lambda key=key: obs.fake_press_hotkey(key), runs)
+
+    errors = [message for level, message in obs.log if level == obs.LOG_ERROR]
+    if errors:
+        print("Errors logged during benchmark:")
+        for message in errors[:10]:
+            print(f"  {message}")
+
+    script.script_unload()
+    leaked = obs.fake_leaked_refs()
+    if leaked:
+        print(f"Source references leaked after script_unload: {leaked}")
+
+    return bench.results
+
+
+def print_report(results: Dict[str, dict], baseline: Dict[str, dict]):
+    header = f"{'Operation':<42}{'OBS calls':>10}{'updates':>9}{'visib.':>8}{'OBS ms':>9}{'wall ms':>9}"
+    if baseline:
+        header += f"{'base calls':>12}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        line = (f"{name:<42}{r['obs_calls']:>10.1f}{r['source_updates']:>9.1f}{r['visibility_changes']:>8.1f}"
+                f"{r['obs_ms']:>9.3f}{r['wall_ms']:>9.3f}")
+        if baseline:
+            base = baseline.get(name)
+            line += f"{base['obs_calls']:>12.1f}" if base else f"{'-':>12}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OBS API call-count benchmark (runs without OBS)")
+    parser.add_argument("--runs", type=int, default=20, help="runs per operation")
+    parser.add_argument("--save", help="save results to JSON file")
+    parser.add_argument("--compare", help="compare OBS call counts with results saved by --save")
+    parser.add_argument("--flag-pool", action="store_true", help="preload next diver's flag into companion flag sources")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="allowed increase of OBS calls, percent")
+    args = parser.parse_args()
+
+    results = run(args.runs, args.flag_pool)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_report(results, baseline)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    regressions = [name for name, r in results.items()
+                   if name in baseline and r["obs_calls"] > baseline[name]["obs_calls"] * (1 + args.tolerance / 100) + 0.5]
+    if regressions:
+        print(f"\nOBS call count regressions (> {args.tolerance}%): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
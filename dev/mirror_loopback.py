@@ -0,0 +1,205 @@
+'''
+State mirroring test over loopback ("Mirror mode" script setting, state_mirror.py).
+
+Runs primary and follower instance of the script in two processes, each against the fake obspython module
+(dev/obspython.py) and the real scene collection. Primary gets REFEREE messages (individual/synchro, pre-dive/awards),
+rankings with page flips and ENDOFEVENT; follower plays OBS in real time (timers every frame). Follower connects after
+primary rendered rankings and the first divers, so it starts from a snapshot carrying that state. Reports snapshot and
+delta size, apply latency (from primary sending the frame to follower applying it on its main thread) and checks that
+follower sources ended up with the values of primary.
+
+Usage:
+    python dev/mirror_loopback.py [--messages 50] [--port 58095] [--fps 60]
+'''
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+DEV_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DEV_DIR))
+sys.path.insert(0, DEV_DIR)  # fake obspython must win over real one
+
+from latency_trace import percentiles  # noqa: E402
+
+
+def load_script(mode: str, port: int):
+    import obspython as obs
+    from benchmark import ROOT_DIR, SCENE_COLLECTION
+
+    obs.fake_reset()
+    obs.fake_load_scene_collection(SCENE_COLLECTION)
+
+    import dive_recorder_overlays as script
+
+    settings = obs.obs_data_create()
+    script.script_defaults(settings)
+    obs.obs_data_set_string(settings, "rootDir", ROOT_DIR)
+    obs.obs_data_set_bool(settings, "overlays_enabled", True)
+    obs.obs_data_set_bool(settings, "rankings_enabled", True)
+    obs.obs_data_set_bool(settings, "udp_polling_enabled", False)  # messages are fed directly
+    obs.obs_data_set_string(settings, "mirror_mode", mode)
+    obs.obs_data_set_string(settings, "mirror_host", "127.0.0.1")
+    obs.obs_data_set_int(settings, "mirror_port", port)
+    script.script_load(settings)
+    script.script_update(settings)
+    return script
+
+
+def mirror_log(obs):
+    return [text for _, text in obs.log if text.startswith("Mirror")]
+
+
+# ---------- Follower process
+def follower_main(port: int, fps: int, follower_synced, stop, results):
+    import obspython as obs
+    import state_mirror
+    from obs_utils import get_written_values
+
+    script = load_script("follower", port)
+
+    frame_ms = 1000 / fps
+    while not stop.is_set():
+        frame_start = time.perf_counter()
+        obs.fake_advance(frame_ms)
+        if state_mirror._frames_applied and not follower_synced.is_set():
+            follower_synced.set()  # snapshot applied
+        time.sleep(max(0.0, frame_ms / 1000 - (time.perf_counter() - frame_start)))
+    obs.fake_advance(frame_ms)  # apply what arrived last
+
+    latencies_ms = list(state_mirror._latencies_ms)
+    frames = state_mirror._frames_applied
+    values = get_written_values()
+    # written visibility is forgotten when scene items change (e.g. scene collection loaded), use actual one
+    for name in list(values) + [name for name in obs._sources if name not in values]:
+        visible = set(obs.fake_visible(name))
+        if len(visible) == 1:
+            values.setdefault(name, {})["visible"] = visible.pop()
+    script.script_unload()
+    results.put(dict(latencies_ms=latencies_ms, frames=frames, values=values, log=mirror_log(obs)))
+
+
+# ---------- Primary process
+def primary_main(port: int, messages: int, primary_started, follower_synced, primary_done, results):
+    import random
+
+    import obspython as obs
+    import obs_utils
+    import state_mirror
+    from benchmark import UDP_TICK_MS, make_diver, make_rankings
+
+    script = load_script("primary", port)
+
+    delta_sizes = []
+    snapshots = []  # (entries, bytes)
+    encode_frame = state_mirror._encode_frame
+
+    def measured_encode_frame(frame_type, version, new_names, entries):
+        frame = encode_frame(frame_type, version, new_names, entries)
+        if frame_type == state_mirror.MIRROR_FRAME_DELTA:
+            delta_sizes.append(len(frame))
+        else:
+            snapshots.append((len(entries), len(frame)))
+        return frame
+
+    state_mirror._encode_frame = measured_encode_frame
+
+    def tick(*texts):
+        # one UDP tick (batch) with given messages, in real time so follower can apply it
+        with obs_utils.batch_updates():
+            script.process_pending_rankings_update()
+            script.process_udp_datagrams([(text.encode(), ("127.0.0.1", 58091), time.monotonic_ns()) for text in texts])
+        obs.fake_advance(UDP_TICK_MS)
+        time.sleep(random.uniform(0.02, 0.1))
+
+    obs.fake_advance(1000)  # startup timers
+
+    event = script.parse_dive_message(make_diver(1, False, awards=False).split("|"))
+    script.rankings_records, script.rankings_event_record = make_rankings(20), event
+    script.pending_rankings_update = True
+    tick()
+    tick(make_diver(1, False, awards=False), make_diver(1, False, awards=True))
+
+    # state so far reaches follower in snapshot
+    primary_started.set()
+    if not follower_synced.wait(20):
+        print("Follower did not get snapshot")
+
+    for no in range(1, messages + 1):
+        synchro = no % 10 >= 7
+        judges = 11 if synchro else 5
+        tick(make_diver(no % 12 + 1, synchro, awards=False, judges=judges))
+        tick(make_diver(no % 12 + 1, synchro, awards=True, judges=judges))
+
+    # rankings page flips
+    for _ in range(4):
+        obs.fake_advance(5000)
+        time.sleep(0.05)
+    tick("AVIDEO|a|BENCH|1|ENDOFEVENT|^")
+    time.sleep(0.5)
+
+    values = {(name, prop): value for (name, prop_index), value in state_mirror._published.items()
+              for prop in (state_mirror.MIRROR_PROPS[prop_index],)}
+    primary_done.set()
+    script.script_unload()
+    results.put(dict(delta_sizes=delta_sizes, snapshots=snapshots, values=values, log=mirror_log(obs)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=50, help="divers (pre-dive + awards message each)")
+    parser.add_argument("--port", type=int, default=58095)
+    parser.add_argument("--fps", type=int, default=60, help="follower OBS frame rate")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    primary_started = context.Event()
+    follower_synced = context.Event()
+    primary_done = context.Event()
+    primary_results = context.Queue()
+    follower_results = context.Queue()
+
+    primary = context.Process(target=primary_main, args=(args.port, args.messages, primary_started, follower_synced, primary_done, primary_results))
+    primary.start()
+    primary_started.wait(30)  # listening, first state written
+    follower = context.Process(target=follower_main, args=(args.port, args.fps, follower_synced, stop, follower_results))
+    follower.start()
+
+    primary_done.wait()
+    stop.set()
+    primary_result = primary_results.get(timeout=30)
+    follower_result = follower_results.get(timeout=30)
+    primary.join()
+    follower.join()
+
+    for entries, size in primary_result["snapshots"]:
+        print(f"Snapshot: {entries} values, {size} B")
+    sizes = primary_result["delta_sizes"]
+    latencies = follower_result["latencies_ms"]
+    size_p50, size_p95, size_max = percentiles(sizes, (50, 95, 100))
+    latency_p50, latency_p95, latency_max = percentiles(latencies, (50, 95, 100))
+    print(f"Deltas: {len(sizes)} sent, size avg {statistics.mean(sizes):.0f} B, p50 {size_p50} B, p95 {size_p95} B, max {size_max} B")
+    print(f"Follower: {follower_result['frames']} frames applied, latency p50 {latency_p50:.2f} ms, "
+          f"p95 {latency_p95:.2f} ms, max {latency_max:.2f} ms")
+
+    follower_values = follower_result["values"]
+    mismatches = [(name, prop, value, follower_values.get(name, {}).get(prop))
+                  for (name, prop), value in primary_result["values"].items()
+                  if follower_values.get(name, {}).get(prop) != value]
+    print(f"State: {len(primary_result['values'])} values published, {len(mismatches)} differ on follower")
+    for mismatch in mismatches[:10]:
+        print("  ", mismatch)
+
+    for line in primary_result["log"] + follower_result["log"]:
+        print(line)
+    snapshot_values = max((entries for entries, _ in primary_result["snapshots"]), default=0)
+    if not snapshot_values:
+        print("Follower got no snapshot with primary state")
+    return 1 if mismatches or not snapshot_values else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
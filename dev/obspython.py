@@ -0,0 +1,716 @@
+'''
+Stand-in for OBS "obspython" module, so the script can run outside OBS (benchmarks, replays, offline debugging).
+Implements only the subset of the OBS API the script uses: sources, settings data, scenes/scene items (incl. groups),
+signals, frontend events, timers, hotkeys, properties and script_log.
+
+Every OBS API call is recorded (name + duration), see fake_call_counts()/fake_reset_calls().
+Functions prefixed with fake_ are NOT part of OBS API - they are used to drive the fake (load scene collection, advance timers, press hotkeys).
+'''
+import functools
+import json
+import os
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Union
+
+# ---------- Constants
+LOG_ERROR = 100
+LOG_WARNING = 200
+LOG_INFO = 300
+LOG_DEBUG = 400
+
+OBS_PATH_FILE = 0
+OBS_PATH_FILE_SAVE = 1
+OBS_PATH_DIRECTORY = 2
+
+OBS_FRONTEND_EVENT_SCENE_CHANGED = 1
+OBS_FRONTEND_EVENT_SCENE_LIST_CHANGED = 2
+OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGED = 11
+OBS_FRONTEND_EVENT_SCENE_COLLECTION_LIST_CHANGED = 12
+OBS_FRONTEND_EVENT_EXIT = 17
+OBS_FRONTEND_EVENT_FINISHED_LOADING = 26
+OBS_FRONTEND_EVENT_SCENE_COLLECTION_CLEANUP = 27
+OBS_FRONTEND_EVENT_SCRIPTING_SHUTDOWN = 35
+OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGING = 38
+
+OBS_TEXT_DEFAULT = 0
+OBS_COMBO_TYPE_LIST = 2
+OBS_COMBO_FORMAT_STRING = 3
+
+LOG_LEVEL_NAMES = {LOG_ERROR: "error", LOG_WARNING: "warning", LOG_INFO: "info", LOG_DEBUG: "debug"}
+
+# ---------- Call recording
+# (function name, duration in ns) for every OBS API call
+call_log: List[tuple] = []
+record_calls = True
+
+# messages passed to script_log: (level, message)
+log: List[tuple] = []
+print_log = False
+
+
+def fake_reset_calls():
+    call_log.clear()
+
+
+def fake_call_counts() -> Counter:
+    return Counter(name for name, _ in call_log)
+
+
+def fake_call_time_ns() -> int:
+    return sum(duration for _, duration in call_log)
+
+
+def _recorded(func):
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not record_calls:
+            return func(*args, **kwargs)
+        start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            call_log.append((name, time.perf_counter_ns() - start))
+
+    return wrapper
+
+
+# ---------- Object model
+class FakeData:
+    def __init__(self, values: Union[dict, None] = None):
+        self.values = dict(values or {})
+        self.defaults = {}
+        self.refs = 1
+
+    def get(self, key, fallback):
+        if key in self.values:
+            return self.values[key]
+        return self.defaults.get(key, fallback)
+
+
+class FakeDataArray:
+    def __init__(self, items: Union[list, None] = None):
+        self.items = list(items or [])
+        self.refs = 1
+
+
+class FakeSignalHandler:
+    def __init__(self):
+        self.handlers: Dict[str, List[Callable]] = {}
+
+    def emit(self, signal: str, calldata: dict):
+        for callback in list(self.handlers.get(signal, [])):
+            callback(calldata)
+
+
+class FakeSource:
+    def __init__(self, name: str, source_id: str, settings: Union[dict, None] = None):
+        self.name = name
+        self.id = source_id
+        self.settings = FakeData(settings)
+        self.refs = 1  # owned by the "collection"
+        self.removed = False
+        self.filters: Dict[str, "FakeSource"] = {}
+        self.signal_handler = FakeSignalHandler()
+        self.scene: Union["FakeScene", None] = None
+        self.update_count = 0
+
+
+class FakeSceneItem:
+    def __init__(self, scene: "FakeScene", source: FakeSource, visible: bool = True):
+        self.scene = scene
+        self.source = source
+        self.visible = visible
+        self.refs = 1
+
+
+class FakeScene:
+    def __init__(self, source: FakeSource, is_group: bool = False):
+        self.source = source
+        self.is_group = is_group
+        self.items: List[FakeSceneItem] = []
+        source.scene = self
+
+
+class FakeTimer:
+    def __init__(self, callback, interval_ms: int, due_ms: float):
+        self.callback = callback
+        self.interval_ms = interval_ms
+        self.due_ms = due_ms
+        self.removed = False
+
+
+_sources: Dict[str, FakeSource] = {}
+_scene_order: List[str] = []
+_global_signals = FakeSignalHandler()
+_frontend_callbacks: List[Callable] = []
+_timers: List[FakeTimer] = []
+_current_timer: Union[FakeTimer, None] = None
+_clock_ms = 0.0
+_hotkeys: Dict[str, Callable] = {}
+_hotkey_ids: Dict[int, str] = {}
+
+
+# ---------- Fake driver API (not OBS)
+def fake_reset():
+    global _current_timer, _clock_ms
+    _sources.clear()
+    _scene_order.clear()
+    _global_signals.handlers.clear()
+    _frontend_callbacks.clear()
+    _timers.clear()
+    _current_timer = None
+    _clock_ms = 0.0
+    _hotkeys.clear()
+    _hotkey_ids.clear()
+    log.clear()
+    call_log.clear()
+
+
+def fake_add_source(name: str, source_id: str = "text_gdiplus", settings: Union[dict, None] = None) -> FakeSource:
+    src = FakeSource(name, source_id, settings)
+    _sources[name] = src
+    _global_signals.emit("source_create", {"source": src})
+    return src
+
+
+def fake_remove_source(name: str):
+    src = _sources.pop(name)
+    src.removed = True
+    _global_signals.emit("source_remove", {"source": src})
+    _release_source(src)
+
+
+def fake_rename_source(prev_name: str, new_name: str):
+    src = _sources.pop(prev_name)
+    src.name = new_name
+    _sources[new_name] = src
+    _global_signals.emit("source_rename", {"source": src, "prev_name": prev_name, "new_name": new_name})
+
+
+def fake_add_scene(name: str, is_group: bool = False) -> FakeScene:
+    src = fake_add_source(name, "group" if is_group else "scene")
+    if not is_group:
+        _scene_order.append(name)
+    return FakeScene(src, is_group)
+
+
+def fake_add_scene_item(scene_name: str, source_name: str, visible: bool = True) -> FakeSceneItem:
+    scene = _sources[scene_name].scene
+    item = FakeSceneItem(scene, _sources[source_name], visible)
+    scene.items.append(item)
+    scene.source.signal_handler.emit("item_add", {"scene": scene, "item": item})
+    return item
+
+
+def fake_load_scene_collection(json_path: str):
+    '''Loads sources, scenes and groups from an OBS scene collection JSON file.'''
+    with open(json_path, encoding="utf-8") as f:
+        collection = json.load(f)
+
+    scene_defs = []
+    for source_def in collection.get("groups", []) + collection.get("sources", []):
+        source_id = source_def.get("id", "")
+        settings = {k: v for k, v in source_def.get("settings", {}).items() if k != "items"}
+        if source_id in ("scene", "group"):
+            fake_add_scene(source_def["name"], is_group=(source_id == "group"))
+            scene_defs.append(source_def)
+        else:
+            fake_add_source(source_def["name"], source_id, settings)
+
+        for filter_def in source_def.get("filters", []):
+            flt = FakeSource(filter_def["name"], filter_def.get("id", ""), filter_def.get("settings", {}))
+            _sources[source_def["name"]].filters[flt.name] = flt
+
+    for scene_def in scene_defs:
+        for item_def in scene_def.get("settings", {}).get("items", []):
+            # group members are duplicated in the scene as backup items, real ones are in the group
+            if item_def.get("group_item_backup") or item_def.get("name") not in _sources:
+                continue
+            fake_add_scene_item(scene_def["name"], item_def["name"], item_def.get("visible", True))
+
+    fake_fire_frontend_event(OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGED)
+
+
+def fake_fire_frontend_event(event: int):
+    for callback in list(_frontend_callbacks):
+        callback(event)
+
+
+def fake_now_ms() -> float:
+    return _clock_ms
+
+
+def fake_advance(ms: float):
+    '''Advances virtual clock by ms and runs timers that became due (in due time order).'''
+    global _clock_ms, _current_timer
+    end = _clock_ms + ms
+    while True:
+        pending = [t for t in _timers if not t.removed and t.due_ms <= end]
+        if not pending:
+            break
+        timer = min(pending, key=lambda t: t.due_ms)
+        _clock_ms = max(_clock_ms, timer.due_ms)
+        timer.due_ms += max(timer.interval_ms, 1)
+        _current_timer = timer
+        try:
+            timer.callback()
+        finally:
+            _current_timer = None
+        _timers[:] = [t for t in _timers if not t.removed]
+    _clock_ms = end
+
+
+def fake_active_timers() -> List[FakeTimer]:
+    return [t for t in _timers if not t.removed]
+
+
+def fake_press_hotkey(name: str, pressed: bool = True):
+    _hotkeys[name](pressed)
+
+
+def fake_source(name: str) -> FakeSource:
+    return _sources[name]
+
+
+def fake_visible(name: str) -> List[bool]:
+    '''Returns visibility of every scene item (incl. nested in groups) showing given source.'''
+    result = []
+    for src in _sources.values():
+        if src.scene is not None:
+            result.extend(item.visible for item in src.scene.items if item.source.name == name)
+    return result
+
+
+def fake_leaked_refs() -> Dict[str, int]:
+    '''Source references held by someone other than the scene collection.'''
+    return {name: src.refs - 1 for name, src in _sources.items() if src.refs > 1}
+
+
+def _release_source(src: FakeSource):
+    src.refs -= 1
+    if src.refs == 0:
+        _global_signals.emit("source_destroy", {"source": src})
+
+
+# ---------- Logging
+@_recorded
+def script_log(level, message):
+    log.append((level, message))
+    if print_log:
+        print(f"[{LOG_LEVEL_NAMES.get(level, level)}] {message}")
+
+
+# ---------- Sources
+@_recorded
+def obs_get_source_by_name(name):
+    src = _sources.get(name)
+    if src is None:
+        return None
+    src.refs += 1
+    return src
+
+
+@_recorded
+def obs_source_get_ref(source):
+    if source is None or source.refs <= 0:
+        return None
+    source.refs += 1
+    return source
+
+
+@_recorded
+def obs_source_release(source):
+    if source is not None:
+        _release_source(source)
+
+
+@_recorded
+def obs_source_get_name(source):
+    return source.name if source is not None else None
+
+
+@_recorded
+def obs_source_get_id(source):
+    return source.id if source is not None else None
+
+
+@_recorded
+def obs_source_removed(source):
+    return source.removed
+
+
+@_recorded
+def obs_source_get_settings(source):
+    source.settings.refs += 1
+    return source.settings
+
+
+@_recorded
+def obs_source_update(source, settings):
+    source.settings.values.update(settings.values)
+    source.update_count += 1
+
+
+@_recorded
+def obs_source_get_filter_by_name(source, name):
+    return source.filters.get(name)
+
+
+@_recorded
+def obs_source_get_signal_handler(source):
+    return source.signal_handler
+
+
+@_recorded
+def obs_get_signal_handler():
+    return _global_signals
+
+
+@_recorded
+def source_list_release(sources):
+    for src in sources:
+        _release_source(src)
+
+
+# ---------- Signals
+@_recorded
+def signal_handler_connect(handler, signal, callback):
+    handler.handlers.setdefault(signal, []).append(callback)
+
+
+@_recorded
+def signal_handler_disconnect(handler, signal, callback):
+    callbacks = handler.handlers.get(signal, [])
+    if callback in callbacks:
+        callbacks.remove(callback)
+
+
+@_recorded
+def calldata_source(calldata, name):
+    return calldata.get(name)
+
+
+@_recorded
+def calldata_string(calldata, name):
+    return calldata.get(name)
+
+
+@_recorded
+def calldata_sceneitem(calldata, name):
+    return calldata.get(name)
+
+
+@_recorded
+def calldata_bool(calldata, name):
+    return calldata.get(name)
+
+
+# ---------- Settings data
+@_recorded
+def obs_data_create():
+    return FakeData()
+
+
+@_recorded
+def obs_data_create_from_json(json_string):
+    try:
+        return FakeData(json.loads(json_string))
+    except ValueError:
+        return None
+
+
+@_recorded
+def obs_data_release(data):
+    if data is not None:
+        data.refs -= 1
+
+
+@_recorded
+def obs_data_set_string(data, name, value):
+    data.values[name] = value
+
+
+@_recorded
+def obs_data_get_string(data, name):
+    return data.get(name, "")
+
+
+@_recorded
+def obs_data_set_int(data, name, value):
+    data.values[name] = value
+
+
+@_recorded
+def obs_data_get_int(data, name):
+    return data.get(name, 0)
+
+
+@_recorded
+def obs_data_set_double(data, name, value):
+    data.values[name] = value
+
+
+@_recorded
+def obs_data_get_double(data, name):
+    return data.get(name, 0.0)
+
+
+@_recorded
+def obs_data_set_bool(data, name, value):
+    data.values[name] = value
+
+
+@_recorded
+def obs_data_get_bool(data, name):
+    return data.get(name, False)
+
+
+@_recorded
+def obs_data_set_default_string(data, name, value):
+    data.defaults[name] = value
+
+
+@_recorded
+def obs_data_set_default_int(data, name, value):
+    data.defaults[name] = value
+
+
+@_recorded
+def obs_data_set_default_double(data, name, value):
+    data.defaults[name] = value
+
+
+@_recorded
+def obs_data_set_default_bool(data, name, value):
+    data.defaults[name] = value
+
+
+@_recorded
+def obs_data_get_array(data, name):
+    value = data.get(name, None)
+    return FakeDataArray(value if isinstance(value, list) else [])
+
+
+@_recorded
+def obs_data_set_array(data, name, array):
+    data.values[name] = list(array.items)
+
+
+@_recorded
+def obs_data_array_create():
+    return FakeDataArray()
+
+
+@_recorded
+def obs_data_array_push_back(array, data):
+    array.items.append(data)
+
+
+@_recorded
+def obs_data_array_release(array):
+    if array is not None:
+        array.refs -= 1
+
+
+# ---------- Scenes and scene items
+@_recorded
+def obs_scene_from_source(source):
+    return source.scene if source is not None else None
+
+
+@_recorded
+def obs_scene_get_source(scene):
+    return scene.source
+
+
+@_recorded
+def obs_scene_find_source(scene, name):
+    for item in scene.items:
+        if item.source.name == name:
+            return item
+    return None
+
+
+@_recorded
+def obs_scene_find_source_recursive(scene, name):
+    for item in scene.items:
+        if item.source.name == name:
+            return item
+        if item.source.scene is not None and item.source.scene.is_group:
+            found = obs_scene_find_source_recursive(item.source.scene, name)
+            if found:
+                return found
+    return None
+
+
+@_recorded
+def obs_scene_enum_items(scene):
+    for item in scene.items:
+        item.refs += 1
+    return list(scene.items)
+
+
+@_recorded
+def obs_sceneitem_group_enum_items(item):
+    group = item.source.scene
+    if group is None:
+        return []
+    for child in group.items:
+        child.refs += 1
+    return list(group.items)
+
+
+@_recorded
+def sceneitem_list_release(items):
+    for item in items:
+        item.refs -= 1
+
+
+@_recorded
+def obs_sceneitem_addref(item):
+    item.refs += 1
+
+
+@_recorded
+def obs_sceneitem_release(item):
+    item.refs -= 1
+
+
+@_recorded
+def obs_sceneitem_get_source(item):
+    return item.source
+
+
+@_recorded
+def obs_sceneitem_get_scene(item):
+    return item.scene
+
+
+@_recorded
+def obs_sceneitem_is_group(item):
+    return item.source.scene is not None and item.source.scene.is_group
+
+
+@_recorded
+def obs_sceneitem_set_visible(item, visible):
+    if item.visible == visible:
+        return
+    item.visible = visible
+    item.scene.source.signal_handler.emit("item_visible", {"scene": item.scene, "item": item, "visible": visible})
+
+
+@_recorded
+def obs_sceneitem_visible(item):
+    return item.visible
+
+
+# ---------- Frontend
+@_recorded
+def obs_frontend_get_scenes():
+    scenes = []
+    for name in _scene_order:
+        src = _sources.get(name)
+        if src is not None:
+            src.refs += 1
+            scenes.append(src)
+    return scenes
+
+
+@_recorded
+def obs_frontend_add_event_callback(callback):
+    _frontend_callbacks.append(callback)
+
+
+@_recorded
+def obs_frontend_remove_event_callback(callback):
+    if callback in _frontend_callbacks:
+        _frontend_callbacks.remove(callback)
+
+
+# ---------- Timers
+@_recorded
+def timer_add(callback, milliseconds):
+    _timers.append(FakeTimer(callback, milliseconds, _clock_ms + milliseconds))
+
+
+@_recorded
+def timer_remove(callback):
+    for timer in _timers:
+        if timer.callback == callback:
+            timer.removed = True
+
+
+@_recorded
+def remove_current_callback():
+    if _current_timer is not None:
+        _current_timer.removed = True
+
+
+# ---------- Hotkeys
+@_recorded
+def obs_hotkey_register_frontend(name, description, callback):
+    hotkey_id = len(_hotkey_ids) + 1
+    _hotkeys[name] = callback
+    _hotkey_ids[hotkey_id] = name
+    return hotkey_id
+
+
+@_recorded
+def obs_hotkey_load(hotkey_id, array):
+    pass
+
+
+@_recorded
+def obs_hotkey_save(hotkey_id):
+    return FakeDataArray()
+
+
+@_recorded
+def obs_hotkey_unregister(hotkey_id):
+    name = _hotkey_ids.pop(hotkey_id, None)
+    if name is not None:
+        _hotkeys.pop(name, None)
+
+
+# ---------- Properties (UI only - values are irrelevant outside OBS)
+@_recorded
+def obs_properties_create():
+    return {}
+
+
+def _add_property(props, name, *args):
+    props[name] = args
+    return name
+
+
+@_recorded
+def obs_properties_add_bool(props, name, description):
+    return _add_property(props, name, description)
+
+
+@_recorded
+def obs_properties_add_int(props, name, description, minimum, maximum, step):
+    return _add_property(props, name, description, minimum, maximum, step)
+
+
+@_recorded
+def obs_properties_add_text(props, name, description, text_type):
+    return _add_property(props, name, description, text_type)
+
+
+@_recorded
+def obs_properties_add_path(props, name, description, path_type, filter_string, default_path):
+    return _add_property(props, name, description, path_type, filter_string, default_path)
+
+
+@_recorded
+def obs_properties_add_list(props, name, description, combo_type, combo_format):
+    return _add_property(props, name, description, combo_type, combo_format)
+
+
+@_recorded
+def obs_property_list_add_string(prop, name, value):
+    pass
@@ -0,0 +1,84 @@
+'''
+Message parsing micro-benchmark: DiveMessageView (datatypes.py) against the previous DiveMessage parser
+(split everything, pad to 75 fields, build dataclass).
+
+Measures parsing only (no OBS calls): REFEREE datagram to message object, reading the fields overlays use,
+and UPDATE (Update.txt) event record.
+
+Usage:
+    python dev/parse_benchmark.py [--runs 100000]
+'''
+import argparse
+import dataclasses
+import os
+import sys
+import timeit
+
+DEV_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DEV_DIR))
+sys.path.insert(0, DEV_DIR)  # fake obspython must win over real one
+
+from benchmark import make_diver, make_rankings  # noqa: E402
+from datatypes import DiveMessage, DiveMessageView, DIVE_MESSAGE_FIELD_COUNT  # noqa: E402
+
+# fields read by overlay_data/state_controls when REFEREE awards message is displayed
+READ_FIELDS = ["packet_id", "event_ab", "event_status", "round", "start_no", "d1_full_name_team", "d1_family_name",
+               "d2_family_name", "dive_no", "pos_code", "dd", "board", "j1", "j2", "j3", "j4", "j5", "points", "total",
+               "rank", "synchro_event", "number_of_judges", "penalty_code", "d1_first_name", "d1_team_code",
+               "d2_first_name", "d2_team_code", "long_event_name", "dive_description", "meet_title", "rounds_in_event",
+               "divers_in_event"]
+
+
+def legacy_parse(data: bytes) -> DiveMessage:
+    parts = data.decode(errors='replace').split("|")
+    padded = parts + [""] * (75 - len(parts))
+    return DiveMessage(*padded[0:74])
+
+
+def legacy_parse_update_event(msg: str) -> DiveMessage:
+    fields = msg.split("|")
+    padded = fields + [""] * (75 - len(fields))
+    return DiveMessage(*padded[0:74])
+
+
+def view_parse(data: bytes) -> DiveMessageView:
+    return DiveMessageView(data.decode(errors='replace').split("|", DIVE_MESSAGE_FIELD_COUNT))
+
+
+def read_fields(message):
+    for name in READ_FIELDS:
+        getattr(message, name)
+
+
+def make_update_message(records: int) -> str:
+    event = make_diver(1, False, awards=False).split("|")[:DIVE_MESSAGE_FIELD_COUNT - 1]
+    fields = [f"{r.rank}|{r.points}|{r.unknown}|{r.diver}|{r.start_position}|{r.club_code}" for r in make_rankings(records)]
+    return "|".join(event + fields) + "|^"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DiveMessage parsing micro-benchmark")
+    parser.add_argument("--runs", type=int, default=100000)
+    args = parser.parse_args()
+
+    datagram = make_diver(3, False, awards=True).encode()
+    update = make_update_message(40)
+    assert dataclasses.astuple(legacy_parse(datagram)) == tuple(view_parse(datagram))
+
+    cases = {
+        "REFEREE parse": (lambda: legacy_parse(datagram), lambda: view_parse(datagram)),
+        f"REFEREE parse + read {len(READ_FIELDS)} fields": (lambda: read_fields(legacy_parse(datagram)),
+                                                            lambda: read_fields(view_parse(datagram))),
+        "UPDATE event record (40 records)": (lambda: legacy_parse_update_event(update),
+                                             lambda: DiveMessageView(update.split("|")[:DIVE_MESSAGE_FIELD_COUNT])),
+    }
+
+    print(f"{'Case':<40}{'DiveMessage us':>16}{'view us':>10}{'speedup':>9}")
+    for name, (legacy, view) in cases.items():
+        legacy_us = min(timeit.repeat(legacy, number=args.runs, repeat=3)) / args.runs * 1e6
+        view_us = min(timeit.repeat(view, number=args.runs, repeat=3)) / args.runs * 1e6
+        print(f"{name:<40}{legacy_us:>16.2f}{view_us:>10.2f}{legacy_us / view_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
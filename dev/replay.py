@@ -0,0 +1,115 @@
+'''
+Replay of captured DiveRecorder traffic (see traffic_capture.py, "Capture DiveRecorder traffic" script setting).
+
+Feeds captured UDP datagrams through the script's UDP timer tick and captured XFER payloads into the rankings path,
+with the fake obspython module (dev/obspython.py). Virtual OBS clock always follows capture timestamps (so timers like
+auto-hide and rankings pages behave as on meet day), wall clock pacing is selected by --speed.
+
+Usage:
+    python dev/replay.py Captures/capture_20260101_100000.dvcap            # 1x (real time)
+    python dev/replay.py Captures/capture_20260101_100000.dvcap --speed 10 # 10x
+    python dev/replay.py Captures/capture_20260101_100000.dvcap --speed max
+'''
+import argparse
+import os
+import sys
+import time
+from collections import Counter, defaultdict
+
+DEV_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DEV_DIR))
+sys.path.insert(0, DEV_DIR)  # fake obspython must win over real one
+
+import obspython as obs  # noqa: E402 (fake)
+from benchmark import Bench  # noqa: E402
+from traffic_capture import read_capture, xfer_record_event, RECORD_UDP, RECORD_XFER  # noqa: E402
+
+
+def record_label(record) -> str:
+    if record.kind == RECORD_XFER:
+        return "XFER " + record.meta.split("|")[1]
+    return "UDP " + record.payload.split(b"|", 1)[0].decode(errors="replace")
+
+
+def replay(path: str, speed: float, verbose: bool):
+    records = list(read_capture(path))
+    if not records:
+        print("Capture is empty.")
+        return
+
+    obs.print_log = verbose
+    bench = Bench()
+    script = bench.script
+
+    # XFER payloads come from the capture, do not connect to DiveRecorder
+    script.fetch_update_file_async = lambda ip_address, message_file_name, event_ab: None
+
+    stats = defaultdict(Counter)
+    wall_start = time.perf_counter()
+    first_ns = records[0].timestamp_ns
+    virtual_ns = first_ns
+
+    def run_until(timestamp_ns, label):
+        # advance virtual clock (runs UDP ticks and other timers), attribute OBS work to the record fed before
+        nonlocal virtual_ns
+        obs.fake_reset_calls()
+        start = time.perf_counter_ns()
+        obs.fake_advance((timestamp_ns - virtual_ns) / 1e6)
+        if label:
+            stats[label]["wall_ns"] += time.perf_counter_ns() - start
+            stats[label]["obs_calls"] += sum(obs.fake_call_counts().values())
+        virtual_ns = timestamp_ns
+
+    label = None
+    for record in records:
+        if speed > 0:
+            delay = wall_start + (record.timestamp_ns - first_ns) / 1e9 / speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        run_until(record.timestamp_ns, label)
+
+        label = record_label(record)
+        stats[label]["count"] += 1
+
+        start = time.perf_counter_ns()
+        if record.kind == RECORD_UDP:
+            bench.socket.datagrams.append(record.payload)
+        elif record.kind == RECORD_XFER:
+            # into the event it was fetched for (selected event in older captures)
+            script.process_update_file_payload(record.payload, None, xfer_record_event(record))
+        stats[label]["wall_ns"] += time.perf_counter_ns() - start
+
+    # let last record and pending rankings be processed
+    run_until(virtual_ns + 1_000_000_000, label)
+
+    wall_s = time.perf_counter() - wall_start
+    capture_s = (records[-1].timestamp_ns - first_ns) / 1e9
+
+    script.script_unload()
+
+    print(f"Replayed {len(records)} records, capture duration {capture_s:.1f}s, wall time {wall_s:.2f}s "
+          f"({len(records) / wall_s if wall_s else 0:.0f} records/s)")
+    print(f"{'Record':<28}{'count':>8}{'OBS calls/rec':>15}{'wall ms/rec':>13}")
+    for label, counter in sorted(stats.items()):
+        count = counter["count"] or 1
+        print(f"{label:<28}{counter['count']:>8}{counter['obs_calls'] / count:>15.1f}{counter['wall_ns'] / count / 1e6:>13.3f}")
+
+    errors = [message for level, message in obs.log if level == obs.LOG_ERROR]
+    if errors:
+        print(f"{len(errors)} errors logged, first: {errors[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured DiveRecorder traffic through the script (runs without OBS)")
+    parser.add_argument("capture", help="capture file (.dvcap)")
+    parser.add_argument("--speed", default="1", help="replay speed multiplier or 'max' (default 1 = real time)")
+    parser.add_argument("--verbose", action="store_true", help="print script log")
+    args = parser.parse_args()
+
+    speed = 0.0 if args.speed == "max" else float(args.speed)
+    replay(args.capture, speed, args.verbose)
+
+
+if __name__ == "__main__":
+    main()
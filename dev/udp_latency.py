@@ -0,0 +1,111 @@
+'''
+UDP receive latency comparison: timer polling vs receiver thread ("UDP receive mode" script setting).
+
+Runs the script against the fake obspython module (dev/obspython.py) in real time: main thread plays OBS and runs
+timers every frame, sender thread sends REFEREE datagrams over loopback at random moments. Latency is measured from
+sendto() to the moment the script starts processing the message (process_udp_message) on the main thread.
+
+Usage:
+    python dev/udp_latency.py [--messages 50] [--fps 60]
+'''
+import argparse
+import os
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+
+DEV_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DEV_DIR))
+sys.path.insert(0, DEV_DIR)  # fake obspython must win over real one
+
+import obspython as obs  # noqa: E402 (fake)
+from benchmark import ROOT_DIR, SCENE_COLLECTION, make_diver  # noqa: E402
+from latency_trace import percentiles  # noqa: E402
+
+
+def measure(mode: str, messages: int, fps: int):
+    obs.fake_reset()
+    obs.fake_load_scene_collection(SCENE_COLLECTION)
+
+    import dive_recorder_overlays as script
+
+    # count main thread wakeups caused by UDP receiving (every call of polling, wake check and drain timer)
+    wakeups = [0]
+    original_callbacks = {}
+    for name in ("udp_timer_callback", "udp_wake_check_callback", "udp_drain_callback"):
+        callback = original_callbacks[name] = getattr(script, name)
+
+        def counted(callback=callback):
+            wakeups[0] += 1
+            callback()
+
+        setattr(script, name, counted)
+
+    settings = obs.obs_data_create()
+    script.script_defaults(settings)
+    obs.obs_data_set_string(settings, "rootDir", ROOT_DIR)
+    obs.obs_data_set_bool(settings, "overlays_enabled", True)
+    obs.obs_data_set_string(settings, "udp_receive_mode", mode)
+    script.script_load(settings)
+    script.script_update(settings)
+    obs.fake_advance(5000)
+    wakeups[0] = 0
+
+    sent_ns = {}
+    latencies_ms = []
+    process_udp_message = script.process_udp_message
+
+    def timed_process_udp_message(parts):
+        start_no = int(parts[7])
+        latencies_ms.append((time.perf_counter_ns() - sent_ns[start_no]) / 1e6)
+        process_udp_message(parts)
+
+    script.process_udp_message = timed_process_udp_message
+
+    def sender():
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        for no in range(1, messages + 1):
+            time.sleep(random.uniform(0.05, 0.3))
+            sent_ns[no] = time.perf_counter_ns()
+            sock.sendto(make_diver(no, False, awards=True).encode(), ("127.0.0.1", script.portClient))
+        sock.close()
+
+    sender_thread = threading.Thread(target=sender)
+    sender_thread.start()
+
+    # messages coalesced in the same tick (timer polling) are never processed, run until the last one had time to arrive
+    frame_s = 1 / fps
+    settle_until = None
+    while settle_until is None or (time.perf_counter() < settle_until and len(latencies_ms) < messages):
+        frame_start = time.perf_counter()
+        obs.fake_advance(frame_s * 1000)
+        time.sleep(max(0.0, frame_s - (time.perf_counter() - frame_start)))
+        if settle_until is None and not sender_thread.is_alive():
+            settle_until = time.perf_counter() + 1.0
+
+    script.script_unload()
+    script.process_udp_message = process_udp_message
+    for name, callback in original_callbacks.items():
+        setattr(script, name, callback)
+
+    p50, p95, p_max = percentiles(latencies_ms, (50, 95, 100))
+    print(f"{mode:<8}{len(latencies_ms):>6}{statistics.mean(latencies_ms):>10.1f}"
+          f"{p50:>10.1f}{p95:>10.1f}{p_max:>10.1f}{wakeups[0]:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare UDP receive latency of timer polling and receiver thread")
+    parser.add_argument("--messages", type=int, default=50, help="datagrams sent per mode")
+    parser.add_argument("--fps", type=int, default=60, help="simulated OBS frame rate")
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}{'msgs':>6}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'wakeups':>10}")
+    for mode in ("timer", "thread"):
+        measure(mode, args.messages, args.fps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+'''
+XFER (Update.txt) receive + parse benchmark: streaming pipeline (xfer_fetcher.py + update_parser.py) against
+the previous one (4 KB chunks joined, whole payload decoded, split and parsed at the end).
+
+Local TCP server plays DiveRecorder and sends Update.txt with given number of divers, throttled to given bandwidth.
+Reports time to first ranking record, total time (request to last record) and peak Python memory (tracemalloc).
+
+Usage:
+    python dev/xfer_benchmark.py [--divers 500] [--mbps 100] [--runs 5]
+'''
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+
+DEV_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DEV_DIR))
+sys.path.insert(0, DEV_DIR)  # fake obspython must win over real one
+
+from benchmark import make_diver, make_rankings  # noqa: E402
+from datatypes import DiveListRecord, DIVE_MESSAGE_FIELD_COUNT  # noqa: E402
+import xfer_fetcher  # noqa: E402
+from update_parser import UpdateFileParser  # noqa: E402
+
+SEGMENT = 1460
+
+
+def make_update_payload(divers: int) -> bytes:
+    event = make_diver(1, False, awards=False).split("|")[:DIVE_MESSAGE_FIELD_COUNT - 1]
+    fields = [f"{r.rank}|{r.points}|{r.unknown}|{r.diver}|{r.start_position}|{r.club_code}" for r in make_rankings(divers)]
+    return ("|".join(event + fields) + "|^").encode('utf-16le')
+
+
+def start_server(payload: bytes, mbps: float) -> int:
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    segment_s = SEGMENT * 8 / (mbps * 1e6)
+
+    def handle(conn):
+        with conn:
+            conn.recv(1024)
+            conn.sendall(len(payload).to_bytes(4, 'big'))
+            next_send = time.perf_counter()
+            for i in range(0, len(payload), SEGMENT):
+                conn.sendall(payload[i:i + SEGMENT])
+                next_send += segment_s
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def serve():
+        while True:
+            conn, _ = server.accept()
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server.getsockname()[1]
+
+
+# ---------- Previous pipeline
+def legacy_fetch(port: int, first_record_ns: list):
+    with socket.create_connection(("127.0.0.1", port)) as s:
+        s.sendall(b"XFER|Update.txt\n")
+        header = b''
+        while len(header) < 4:
+            header += s.recv(4 - len(header))
+        payload_len = int.from_bytes(header, 'big')
+        chunks = []
+        bytes_read = 0
+        while bytes_read < payload_len:
+            chunk = s.recv(min(4096, payload_len - bytes_read))
+            chunks.append(chunk)
+            bytes_read += len(chunk)
+
+    text = b''.join(chunks).decode('utf-16le')
+    hash(text)
+    fields = text.split("|")
+    padded = fields + [""] * (75 - len(fields))  # event record
+    remaining = fields[73:]
+    records = []
+    for i in range(0, len(remaining), 6):
+        chunk = remaining[i:i + 6]
+        if len(chunk) < 6:
+            break
+        rank_str, points_str, unknown, diver, start_pos_str, club_code = chunk
+        records.append(DiveListRecord(int(rank_str) if rank_str.strip() else 0, points_str.strip(), unknown.strip(),
+                                      diver.strip(), int(start_pos_str) if start_pos_str.strip() else 0, club_code.strip()))
+        if len(records) == 1:
+            first_record_ns.append(time.perf_counter_ns())
+    return records
+
+
+# ---------- Streaming pipeline
+class TimedParser(UpdateFileParser):
+    def __init__(self, first_record_ns: list):
+        super().__init__()
+        self.first_record_ns = first_record_ns
+
+    def feed(self, data):
+        records = super().feed(data)
+        if records and not self.first_record_ns:
+            self.first_record_ns.append(time.perf_counter_ns())
+        return records
+
+
+def streaming_fetch(port: int, first_record_ns: list):
+    with socket.create_connection(("127.0.0.1", port)) as s:
+        parser = TimedParser(first_record_ns)
+        xfer_fetcher._request(s, "Update.txt", lambda payload_len: parser)
+    return parser.records
+
+
+def measure(fetch, port: int, runs: int):
+    first_ms, total_ms, peak_kb = [], [], []
+    records = []
+    for _ in range(runs):
+        first_record_ns = []
+        tracemalloc.start()
+        start = time.perf_counter_ns()
+        records = fetch(port, first_record_ns)
+        end = time.perf_counter_ns()
+        peak_kb.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+        first_ms.append((first_record_ns[0] - start) / 1e6)
+        total_ms.append((end - start) / 1e6)
+    return min(first_ms), min(total_ms), min(peak_kb), records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XFER receive + parse benchmark, streaming vs previous pipeline")
+    parser.add_argument("--divers", type=int, default=500)
+    parser.add_argument("--mbps", type=float, default=100.0, help="simulated DiveRecorder link bandwidth")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = make_update_payload(args.divers)
+    port = start_server(payload, args.mbps)
+    print(f"Update.txt: {args.divers} divers, {len(payload) / 1024:.0f} KB, {args.mbps:g} Mbit/s")
+
+    results = {name: measure(fetch, port, args.runs) for name, fetch in (("previous", legacy_fetch), ("streaming", streaming_fetch))}
+    assert results["previous"][3] == results["streaming"][3], "parsers disagree"
+
+    print(f"{'Pipeline':<12}{'first record ms':>17}{'total ms':>10}{'peak KB':>10}")
+    for name, (first_ms, total_ms, peak_kb, _) in results.items():
+        print(f"{name:<12}{first_ms:>17.2f}{total_ms:>10.2f}{peak_kb:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
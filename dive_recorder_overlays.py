@@ -5,7 +5,7 @@ Version 1.0.0
 # Converted from divingoverlaysV4.0.0.lua (Andy)
 import typing
 
-from overlay_data import dvov_act_set_event_complete, dvov_act_single_event_referee_update, dvov_act_single_event_referee_update
+from overlay_data import dvov_act_set_event_complete, dvov_act_single_event_referee_update, referee_operation_name
 
 if typing.TYPE_CHECKING:
     import _obspython as obs  # full symbol set for IDE
@@ -15,20 +15,31 @@ else:
 import socket
 import threading
 import os
-from typing import List, Union
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple, Union
 
 # local imports
-from datatypes import DiveMessage, DiveListRecord
+from datatypes import DiveMessageView, DiveListRecord, split_dive_message
 from state_controls import dvov_state_on_message, dvov_state_set_event_complete
 from rankings import dvov_rank_set_divers
-from overlay_script_common import dvov_script_properties, dvov_script_defaults, dvov_script_update, dvov_script_load
-from obs_utils import log_info_if_debug
+from flag_pool import dvov_flag_pool_preload
+from overlay_script_common import dvov_script_properties, dvov_script_defaults, dvov_script_update, dvov_script_load, dvov_script_save, dvov_script_unload
+from obs_utils import log_info_if_debug, is_debug_logged, get_write_cache_stats, batch_updates, source_namespace, obs_operation, name_operation
+from traffic_capture import capture_udp_datagram, capture_xfer_payload, capture_is_active, dvov_capture_start, dvov_capture_stop
+from xfer_fetcher import FetchTiming, xfer_fetch_async, dvov_xfer_stop
+from state_mirror import is_mirror_follower
+from update_parser import UpdateFileParser, payload_digest, may_be_last_parsed_update, find_parsed_update, remember_parsed_update
+from event_state import (get_event_state, get_selected_event_state, is_selected_event, is_rendered_event, event_source_namespace, reset_event_metrics,
+                         event_metrics_summary)
+from latency_trace import (trace_begin, trace_mark, trace_end, trace_abort, trace_written, trace_received_ns, latency_summary,
+                           reset_latency_traces)
+from debug_log import log_error
 
 # ---------- Globals
 portClient = 58091  # main port for DR broadcast data
-tcp_port = 58291  # DiveRecorder listening TCP port
 
-last_message_text = ""
+last_message_parts: List[str] = []
 udp_polling_enabled = True
 
 # settings (populated via script_update)
@@ -38,9 +49,6 @@ debug = False
 activeId = 0
 id_ = 0
 
-# Update message hash to detect changes
-update_message_hash = ""
-
 # flag to indicate if rankings retrieval and update is enabled (script setting)
 rankings_enabled = False
 rankings_mode = False
@@ -50,27 +58,58 @@ event_complete = False
 udp_sock: Union[socket.socket, None] = None
 udp_lock = threading.Lock()
 
+# UDP receive modes (script setting):
+# - timer: non-blocking socket polled by OBS timer every UDP_POLL_INTERVAL_MS (adds up to 200 ms latency, wakes main thread 5x per second)
+# - thread: receiver thread blocks on socket, queues timestamped datagrams and sets wake flag. Wake check timer looks
+#   at the flag every UDP_WAKE_CHECK_INTERVAL_MS, processes what is queued and adds drain timer, which runs every OBS
+#   frame while messages keep coming and removes itself once nothing is queued
+# OBS timers can only be added on main thread (obs.timer_add attaches timer to the script running the current callback),
+# so background threads never add or remove timers, they only set the flag - wake check timer is the cheap main thread
+# path re-arming drain timer (first message of a burst waits up to 50 ms, main thread is woken 20x per second when idle).
+UDP_MODE_TIMER = "timer"
+UDP_MODE_THREAD = "thread"
+UDP_POLL_INTERVAL_MS = 200
+UDP_WAKE_CHECK_INTERVAL_MS = 50
+UDP_DRAIN_INTERVAL_MS = 1  # drain timer fires every OBS frame
+UDP_RECEIVER_TIMEOUT = 0.5  # seconds, receiver thread checks stop request this often
+
+udp_receive_mode = UDP_MODE_TIMER
+
+# (datagram, sender address, monotonic receive time ns), guarded by udp_lock
+udp_queue: Deque[Tuple[bytes, tuple, int]] = deque()
+udp_wake = threading.Event()  # set by background threads: queued datagrams or rankings to process
+udp_drain_armed = False  # drain timer added (main thread only)
+udp_receiver_thread: Union[threading.Thread, None] = None
+udp_receiver_stop = threading.Event()
+
+# Messages received in one tick (drain) are coalesced before processing: only newest message of these packet types
+# per event (A/B) is rendered, older ones are dropped. All other messages (AVIDEO, UPDATE, ...) are processed in order
+# and act as barriers - messages are never coalesced across them.
+COALESCED_PACKET_TYPES = ("REFEREE",)
+
+udp_messages_received = 0
+udp_messages_coalesced = 0
+udp_main_thread_ns = 0  # time spent in UDP timer/drain callbacks (receiving, parsing, rendering)
+
+# latency traces of rankings (latency_trace.py): receive time of last UPDATE message per event, stamps of rankings
+# waiting for main thread
+update_received_ns: Dict[str, int] = {}
+pending_rankings_trace: Union[List[Tuple[str, int]], None] = None
+
 # ------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 # ---------- Parsing and message processing ----------
 # ------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 
-# ---- parser helper: converts parts[] → DiveMessage ----
-def parse_dive_message(parts):
-    # ensure list has 75 so indexes 0..73 exist
-    padded = parts + [""] * (75 - len(parts))
-
-    # create the dataclass from indexes 0..73
-    return DiveMessage(
-        *padded[0:74]  # unpack first 74 elements (0..73)
-    )
-
-tcp_receive_timeout = 1.0  # seconds per recv
+# ---- parser helper: converts parts[] → DiveMessageView (read-only, same attributes as DiveMessage) ----
+def parse_dive_message(parts) -> DiveMessageView:
+    # missing fields read as "", fields after 0..73 are ignored
+    return DiveMessageView(parts)
 
 # ---- global variable to hold parsed structures ----
-referee_message: Union[DiveMessage, None] = None
+referee_message: Union[DiveMessageView, None] = None
 
 ranking_records: List[DiveListRecord] = []
-rankings_event_record: DiveMessage
+rankings_event_record: DiveMessageView
 
 # need to ensure thread-safe access to rankings_records
 ranking_records_lock: threading.Lock = threading.Lock()
@@ -81,214 +120,173 @@ pending_rankings_update = False
 # ---- parser helper: converts UPDATE message → List[RankingRecord] ----
 def parse_update_message(msg: str):
     """
-    Parse UPDATE message beginning at the given field index (1-based).
+    Parse UPDATE message text (ranking records start at field 74, see update_parser.py).
     Converts data into Record instances with correct types.
     """
+    parser = UpdateFileParser(debug)
+    parser.feed_text(msg)
+    parser.close()
 
-    start_field: int = 74
-    rec_size: int = 6
-
-    fields = msg.split("|")
-
-    # Parse event record from start of message (same as for REFEREE, but only meet/event info is relevant)
-    rankings_event_rec = parse_dive_message(fields)
-
-    # Convert to zero-based index
-    start_idx = start_field - 1
-
-    if start_idx >= len(fields):
-        return []
-
-    remaining = fields[start_idx:]
-    records = []
-    exception_count = 0
-
-    for i in range(0, len(remaining), rec_size):
-        chunk = remaining[i:i+rec_size]
-        if len(chunk) < rec_size:
-            break   # Incomplete last chunk → stop
-
-        rank_str, points_str, unknown, diver, start_pos_str, club_code = chunk
-
-        try:
-            record = DiveListRecord(
-                rank=int(rank_str) if rank_str.strip() else 0,
-                points=points_str.strip(),
-                unknown=unknown.strip(),
-                diver=diver.strip(),
-                start_position=int(start_pos_str) if start_pos_str.strip() else 0,
-                club_code=club_code.strip(),
-            )
-            records.append(record)
-            log_info_if_debug(debug, f"Parsed Record: {record}")
-
-        except Exception:
-            # If any conversion fails, skip this chunk safely
-            exception_count += 1
-            if exception_count <= 5:
-                obs.script_log(obs.LOG_WARNING, f"Failed to parse ranking record chunk: {chunk}")
-                continue
-            else:
-                obs.script_log(obs.LOG_WARNING, "Multiple parsing errors encountered; further errors will be suppressed.")
-                break
-
-    log_info_if_debug(debug, f"Finished parsing UPDATE message, total records: {len(records)}")
-
-    return records, rankings_event_rec
+    return parser.records, parser.event_record
 
 # --- Non-blocking fetch function ---
-def fetch_update_file_async(ip_address: str, message_file_name: str):
+def fetch_update_file_async(ip_address: str, message_file_name: str, event_ab: str):
     """
-    Starts a background thread to fetch the update file from DiveRecorder.
+    Requests fetch of the update file from DiveRecorder in background thread (repeated requests are coalesced,
+    see xfer_fetcher.py).
     """
-    thread = threading.Thread(target=_fetch_update_file, args=(ip_address, message_file_name))
-    thread.daemon = True  # thread will exit when OBS exits
-    thread.start()
+    xfer_fetch_async(ip_address, message_file_name,
+                     lambda data, timing, parser: _on_update_file_fetched(ip_address, message_file_name, event_ab, data, timing, parser),
+                     _new_update_file_parser)
+
+def _new_update_file_parser(payload_len: int) -> Union[UpdateFileParser, None]:
+    # payload of different length has changed - parse it while it is being received,
+    # otherwise it is most likely the same file again - receive it and check digest first
+    return None if may_be_last_parsed_update(payload_len) else UpdateFileParser(debug)
 
-# Initiate TCP connection to fetch file (most likely Update.txt)
-def _fetch_update_file(ip_address: str, message_file_name: str):
+def _on_update_file_fetched(ip_address: str, message_file_name: str, event_ab: str, data: bytearray, timing: FetchTiming,
+                            parser: Union[UpdateFileParser, None]):
     """
-    Connects to DiveRecorder TCP port, requests given remote file,
-    parses the response, and updates global rankings_records.
+    Called from fetch thread with XFER payload (Update.txt contents), parsed by parser while received (if any).
 
     ip_address: str - IP from UDP message
     message_file_name: str - file path received in UDP message (e.g., Update.txt)
+    event_ab: str - event (a/b) of UDP message
     """
+    log_info_if_debug(debug, "Fetched %s from %s: %d bytes in %.1f ms (generation %d, %s connection)", message_file_name, ip_address,
+                      timing.payload_len, timing.duration_ms, timing.generation, "reused" if timing.reused_connection else "new")
 
-    def recv_exact(sock, n):
-        buf = b''
-        while len(buf) < n:
-            chunk = sock.recv(n - len(buf))
-            if not chunk:
-                raise Exception("Connection closed early")
-            buf += chunk
-        return buf
-
-    global tcp_port, rankings_records, rankings_event_record, tcp_receive_timeout
-
-    try:
-        HOST = ip_address
-        PORT = tcp_port
-
-        log_info_if_debug(debug, f"Initiating TCP connection to {ip_address}:{tcp_port} for file {message_file_name}")
-
-        with socket.create_connection((HOST, PORT)) as s:
-            request_text = f"XFER|{message_file_name}\n"
-            s.sendall(request_text.encode('utf-8'))
-
-            s.settimeout(tcp_receive_timeout)
-
-            # Step 1: read the 4-byte header
-            header = recv_exact(s, 4)
-
-            # interpret length of payload (adjust endianness as needed)
-            payload_len = int.from_bytes(header, 'big')  # or 'little'
-            log_info_if_debug(debug, f"Payload length from header: {payload_len}")
+    capture_xfer_payload(ip_address, message_file_name, event_ab, data)
 
-            # Step 2: read the full payload
-            chunks = []
-            bytes_read = 0
-            while bytes_read < payload_len:
-                chunk = s.recv(min(4096, payload_len - bytes_read))
-                if not chunk:
-                    raise Exception("Connection closed before full message received")
-                chunks.append(chunk)
-                bytes_read += len(chunk)
+    process_update_file_payload(data, parser, event_ab)
 
-            # flush remaining bytes until remote closes
-            try:
-                while True:
-                    if not s.recv(1024):
-                        break
-            except:
-                pass
+def process_update_file_payload(data, parser: Union[UpdateFileParser, None] = None, event_ab: Union[str, None] = None):
+    """
+    Stores rankings of the event (selected one if None) if XFER payload (Update.txt contents) changed and flags them
+    for main thread processing if the event is selected.
+    Called from fetch thread with payload parsed while received (or from replay of captured traffic - parsed here).
+    """
+    global rankings_records, rankings_event_record, pending_rankings_update
 
-            s.settimeout(None)
+    state = get_event_state(event_ab) if event_ab is not None else get_selected_event_state()
 
-        data = b''.join(chunks)
+    # check if contents have changed (raw bytes, before decoding) and skip events if same
+    digest = payload_digest(data)
 
-        # Step 3: decode UTF-16LE text (skip BOM if needed)
-        message_file_contents = data.decode('utf-16le')
-        log_info_if_debug(debug, f"Message File Contents:\n{message_file_contents}")
+    update = find_parsed_update(data, digest)
+    if update is not None and update.digest == state.rankings_digest:
+        log_info_if_debug(debug, "UPDATE message unchanged (%d bytes).", len(data))
+        return
 
-        # check if contents have changed and skip parsing/events if same
-        global update_message_hash
+    if update is None:
+        log_info_if_debug(debug, "NEW UPDATE Message! (%d bytes)", len(data))
 
-        log_info_if_debug(debug, "Calculating UPDATE message hash.")
+        if parser is None:
+            parser = UpdateFileParser(debug)
+            parser.feed(data)
+            parser.close()
+        update = remember_parsed_update(data, digest, parser)
+    else:
+        # parsed before script was reloaded
+        log_info_if_debug(debug, "UPDATE message unchanged since script reload, reusing parsed records.")
 
-        current_hash = hash(message_file_contents)
+    store_rankings_update(state.event_ab, update.digest, update.records, update.event_record)
 
-        if current_hash != update_message_hash:
-            update_message_hash = current_hash
+def store_rankings_update(event_ab: str, digest: bytes, records: List[DiveListRecord], event_record: DiveMessageView):
+    """
+    Stores parsed rankings of the event and flags them for main thread processing if the event is selected.
+    Called from fetch thread.
+    """
+    global rankings_records, rankings_event_record, pending_rankings_update, pending_rankings_trace
 
-            log_info_if_debug(debug, "NEW UPDATE Message!")
+    state = get_event_state(event_ab)
 
-            parsed_records, parsed_event_record = parse_update_message(message_file_contents)
+    # Update shared data with minimal lock time
+    with ranking_records_lock:
+        if digest == state.rankings_digest:
+            return
+        state.rankings_digest = digest
+        state.rankings_records = records
+        state.rankings_event_record = event_record
 
-            # Update shared data with minimal lock time
-            global pending_rankings_update
-            with ranking_records_lock:
-                rankings_records = parsed_records
-                rankings_event_record = parsed_event_record
-                pending_rankings_update = True
-            obs.script_log(obs.LOG_INFO, "Rankings data updated, flagged for main thread processing.")
+        if not is_selected_event(state.event_ab):
+            log_info_if_debug(debug, "Rankings of event %s stored (event not selected).", state.event_ab.upper())
+            return
 
-        return True
+        rankings_records = records
+        rankings_event_record = event_record
+        pending_rankings_update = True
+        received_ns = update_received_ns.get(state.event_ab)
+        pending_rankings_trace = [("receive", received_ns), ("fetch", time.monotonic_ns())] if received_ns else None
+    obs.script_log(obs.LOG_INFO, "Rankings data updated, flagged for main thread processing.")
 
-    except Exception as e:
-        obs.script_log(obs.LOG_ERROR, f"Failed to fetch update file from {ip_address}:{tcp_port} - {e}")
-        return False
+    wake_main_thread()
 
 # ---------- Process incoming UDP messages ----------
-def process_udp_message(k: str):
-    global synchro, resultK, referee_message
+def process_udp_message(parts: List[str]):
+    # parts: message split into fields (split_dive_message)
+    global resultK, referee_message
 
     log_info_if_debug(debug, "process_udp_message()")
 
-    if not k:
-        return
-
-    # Split message
-    parts = k.split("|")
-    if parts and parts[-1].endswith("\r"):
-        parts[-1] = parts[-1][:-1]
     resultK = parts
+    if parts[0] != "REFEREE":
+        name_operation(parts[0])  # REFEREE is named by message kind below
 
-    if parts:
-        log_info_if_debug(debug, f"UDP message: {parts}")
+    if is_debug_logged(debug):
+        log_info_if_debug(debug, "UDP message: %s", parts)
 
     # --- parse into dataclass ---
     if (parts[0] == "REFEREE"):
         referee_message = parse_dive_message(parts)
-        synchro = (referee_message.synchro_event == "True" and referee_message.event_ab == "a")
+        trace_mark("parse")
 
-        dvov_state_on_message(referee_message)
-        dvov_act_single_event_referee_update(referee_message, synchro)
+        # kept for both events, rendered if event is selected (or always in dual mode, into its own sources)
+        state = get_event_state(referee_message.event_ab)
+        state.referee_message = referee_message
+        state.synchro = referee_message.synchro_event == "True"
+        state.event_complete = False
+        name_operation(referee_operation_name(referee_message, state.synchro))
 
-        dvov_state_set_event_complete(False)
+        selected = is_selected_event(state.event_ab)
+        if selected:
+            dvov_state_on_message(referee_message)
+        if is_rendered_event(state.event_ab):
+            with source_namespace(event_source_namespace(state.event_ab)):
+                dvov_act_single_event_referee_update(referee_message, state.synchro)
+        if selected:
+            dvov_state_set_event_complete(False)
 
 
     elif parts[0] == "UPDATE" and rankings_enabled:
         referee_message = None
+        trace_mark("parse")
+        update_received_ns[get_event_state(parts[1]).event_ab] = trace_received_ns()
 
-        if rankings_enabled:
-            # Example: UPDATE|a|DIVING_CONTUPER|1|192.168.1.1|C:\ProgramData\MDT\DiveRecorder\Xfer\Update.txt|^
-            if len(parts) >= 6:
-                ip_addr = parts[4]
+        # Example: UPDATE|a|DIVING_CONTUPER|1|192.168.1.1|C:\ProgramData\MDT\DiveRecorder\Xfer\Update.txt|^
+        if len(parts) >= 6:
+            ip_addr = parts[4]
 
-                dive_recorder_message_filename = os.path.basename(parts[5])  # just the filename, e.g.
-                if dive_recorder_message_filename == "Update.txt":
-                    fetch_update_file_async(ip_addr, dive_recorder_message_filename)
-                else:
-                    obs.script_log(obs.LOG_WARNING, f"Received unrecognized remote file reference: {dive_recorder_message_filename}")
+            dive_recorder_message_filename = os.path.basename(parts[5])  # just the filename, e.g.
+            if dive_recorder_message_filename == "Update.txt":
+                fetch_update_file_async(ip_addr, dive_recorder_message_filename, parts[1])
+            else:
+                obs.script_log(obs.LOG_WARNING, f"Received unrecognized remote file reference: {dive_recorder_message_filename}")
 
     elif parts[0] == "AVIDEO":
+        trace_mark("parse")
         # AVIDEO|a|EMEA300365|1|ENDOFEVENT|^
         if len(parts) >= 5:
             if parts[4] == "ENDOFEVENT":
-                log_info_if_debug(debug, "AVIDEO ENDOFEVENT received, marking event complete.")
-                dvov_act_set_event_complete(True)
-                dvov_state_set_event_complete(True)
+                log_info_if_debug(debug, "AVIDEO ENDOFEVENT received, marking event %s complete.", parts[1].upper())
+                state = get_event_state(parts[1])
+                state.event_complete = True
+
+                if is_rendered_event(state.event_ab):
+                    with source_namespace(event_source_namespace(state.event_ab)):
+                        dvov_act_set_event_complete(True)
+                if is_selected_event(state.event_ab):
+                    dvov_state_set_event_complete(True)
 
     elif parts[0] == "AWARD":
         # TODO: dive recorder sends AWARD(s) message after each judge score is entered. So it is possible to implement "live" display of scores after a dive
@@ -298,8 +296,7 @@ def process_udp_message(k: str):
 
 #---------- UDP polling (called on OBS timer) ----------
 def udp_timer_callback():
-    global id_, activeId, udp_sock, last_message_text
-    global pending_rankings_update, rankings_records, rankings_event_record
+    global id_, activeId, udp_main_thread_ns
 
     # If script reloaded, stop old timer
     if id_ < activeId:
@@ -309,17 +306,48 @@ def udp_timer_callback():
             pass
         return
 
+    start_ns = time.perf_counter_ns()
+    write_hits_before, write_misses_before = get_write_cache_stats()
+    coalesced_before = udp_messages_coalesced
+
+    # all source writes made during this tick are applied at once at the end of it
+    with obs_operation("UDP tick"), batch_updates():
+        process_pending_rankings_update()
+        messages_processed = poll_udp_socket()
+    trace_written()
+    udp_main_thread_ns += time.perf_counter_ns() - start_ns
+
+    if messages_processed and is_debug_logged(debug):
+        write_hits, write_misses = get_write_cache_stats()
+        log_info_if_debug(debug, "UDP tick (%d messages, %d coalesced) OBS writes: %d applied, %d skipped (unchanged)", messages_processed,
+                          udp_messages_coalesced - coalesced_before, write_misses - write_misses_before, write_hits - write_hits_before)
+
+
+def process_pending_rankings_update():
+    global pending_rankings_update, pending_rankings_trace
+
     # Process pending rankings update on main thread (thread-safe for OBS API)
     if pending_rankings_update:
+        name_operation("rankings")
+        if pending_rankings_trace:
+            trace_begin("Update.txt", pending_rankings_trace + [("dequeue", time.monotonic_ns())])
+        pending_rankings_trace = None
         try:
             log_info_if_debug(debug, "Processing rankings on main thread...")
             dvov_rank_set_divers(rankings_records, rankings_event_record)
+            dvov_flag_pool_preload(rankings_records)
             pending_rankings_update = False
+            trace_end()
         except Exception as e:
-            obs.script_log(obs.LOG_ERROR, f"Error processing rankings: {e}")
+            log_error("Error processing rankings: %s", e)
             pending_rankings_update = False
+            trace_abort()
 
-    # Non-blocking socket recv
+
+def poll_udp_socket() -> int:
+    datagrams = []
+
+    # Non-blocking socket recv - read everything queued, then process as one batch
     try:
         while True:
             try:
@@ -327,23 +355,269 @@ def udp_timer_callback():
                     obs.script_log(obs.LOG_ERROR, "UDP socket is not initialized.")
                     break
                 data, addr = udp_sock.recvfrom(8192)
+                datagrams.append((data, addr, time.monotonic_ns()))  # read time, waiting in socket buffer is not seen
             except BlockingIOError:
                 break
 
-            if data:
-                text = data.decode(errors='replace')
+    except Exception as e:
+        log_error("UDP polling error: %s", e)
 
-                # compare to last message to avoid duplicate processing
-                # process only if different from last or an UPDATE message (UPDATE is always the same, so we force process)
-                if last_message_text != text or text.startswith("UPDATE|"):
-                    last_message_text = text
+    return process_udp_datagrams(datagrams)
 
-                    log_info_if_debug(debug, f"UDP Message Text: {text}")
 
-                    process_udp_message(text)
+def process_udp_datagrams(datagrams: List[Tuple[bytes, tuple, int]]) -> int:
+    """
+    Processes datagrams (data, sender address, monotonic receive time ns) received since last tick on main thread.
+    Returns number of processed messages (coalesced and duplicate messages are not counted).
+    """
+    dequeued_ns = time.monotonic_ns()
+    messages = []
+    for data, addr, received_ns in datagrams:
+        if not data:
+            continue
+        capture_udp_datagram(data, addr)
+        messages.append((split_dive_message(data.decode(errors='replace')), received_ns))
 
-    except Exception as e:
-        obs.script_log(obs.LOG_ERROR, f"UDP polling error: {e}")
+    return process_udp_messages(messages, dequeued_ns)
+
+
+def process_udp_messages(messages: List[Tuple[List[str], int]], dequeued_ns: int = 0) -> int:
+    """
+    Processes messages (fields, monotonic receive time ns) received since last tick. Returns number of processed
+    messages.
+    """
+    global last_message_parts, udp_messages_received
+
+    if not dequeued_ns:
+        dequeued_ns = time.monotonic_ns()
+
+    # mirror follower shows state of primary instance (state_mirror.py)
+    if is_mirror_follower():
+        return 0
+
+    udp_messages_received += len(messages)
+    count_event_bursts(messages)
+
+    messages_processed = 0
+    for parts, received_ns in coalesce_udp_messages(messages):
+        # compare to last message to avoid duplicate processing
+        # process only if different from last or an UPDATE message (UPDATE is always the same, so we force process)
+        if last_message_parts != parts or parts[0] == "UPDATE":
+            last_message_parts = parts
+
+            if is_debug_logged(debug):
+                log_info_if_debug(debug, "UDP Message Text: %s", "|".join(parts))
+
+            # event latency (event metrics) is the trace's total, completed when the tick's writes are applied
+            state = get_event_state(message_event(parts))
+            trace_begin(parts[0], [("receive", received_ns), ("dequeue", dequeued_ns)], state.event_ab)
+            try:
+                process_udp_message(parts)
+                messages_processed += 1
+                state.metrics.record(received_ns)
+                trace_end()
+            except Exception as e:
+                log_error("UDP message processing error: %s (message: %s)", e, parts)
+                trace_abort()
+
+    return messages_processed
+
+
+def coalesce_udp_messages(messages: List[Tuple[List[str], int]]) -> List[Tuple[List[str], int]]:
+    """
+    Latest wins: drops (fields, receive time) message if newer message of the same (packet type, event A/B) follows it
+    with no ordering-sensitive message in between. Order of remaining messages is kept.
+    """
+    global udp_messages_coalesced
+
+    if len(messages) < 2:
+        return messages
+
+    kept = []
+    newer_keys = set()
+    for message in reversed(messages):
+        parts = message[0]
+        if parts[0] in COALESCED_PACKET_TYPES:
+            key = (parts[0], message_event(parts))
+            if key in newer_keys:
+                udp_messages_coalesced += 1
+                get_event_state(key[1]).metrics.coalesced += 1
+                continue
+            newer_keys.add(key)
+        else:
+            newer_keys.clear()  # barrier
+        kept.append(message)
+
+    kept.reverse()
+    return kept
+
+
+def message_event(parts: List[str]) -> str:
+    # event A/B is field 2 of every DiveRecorder message
+    return parts[1] if len(parts) > 1 else ""
+
+
+def count_event_bursts(messages: List[Tuple[List[str], int]]):
+    # more than one message of the same event in one tick
+    if len(messages) < 2:
+        return
+    per_event = {}
+    for parts, _ in messages:
+        state = get_event_state(message_event(parts))
+        per_event[state.event_ab] = per_event.get(state.event_ab, 0) + 1
+    for event_ab, count in per_event.items():
+        if count > 1:
+            get_event_state(event_ab).metrics.bursts += 1
+
+
+#---------- UDP receiver thread ----------
+def udp_receiver_thread_main(sock: socket.socket, stop_event: threading.Event):
+    sock.settimeout(UDP_RECEIVER_TIMEOUT)
+
+    while not stop_event.is_set():
+        try:
+            data, addr = sock.recvfrom(8192)
+        except socket.timeout:
+            continue
+        except OSError as e:
+            if stop_event.is_set():
+                break  # socket closed on unload
+            log_error("UDP receiver error: %s", e)
+            stop_event.wait(UDP_RECEIVER_TIMEOUT)
+            continue
+
+        received_ns = time.monotonic_ns()
+        with udp_lock:
+            if stop_event.is_set():
+                break  # receiving stopped meanwhile, queue is cleared already
+            udp_queue.append((data, addr, received_ns))
+        wake_main_thread()
+
+
+def wake_main_thread():
+    """
+    Called from receiver/fetch threads: makes main thread process queued datagrams and pending rankings update on next
+    frame. Only sets flag for wake check/drain timer, safe on any thread. In timer mode nothing to do - polling timer
+    picks them up.
+    """
+    udp_wake.set()
+
+
+def udp_wake_check_callback():
+    global udp_drain_armed
+
+    # If script reloaded, stop old timer
+    if id_ < activeId:
+        try:
+            obs.remove_current_callback()
+        except Exception:
+            pass
+        return
+
+    if not udp_wake.is_set():
+        return
+
+    drain_udp_queue()
+    # more messages of the burst are processed on the next frames
+    if not udp_drain_armed:
+        udp_drain_armed = True
+        obs.timer_add(udp_drain_callback, UDP_DRAIN_INTERVAL_MS)
+
+
+def udp_drain_callback():
+    global udp_drain_armed
+
+    # If script reloaded or nothing queued since last frame, stop timer (wake check timer adds it again)
+    if id_ < activeId or not udp_wake.is_set():
+        udp_drain_armed = False
+        try:
+            obs.remove_current_callback()
+        except Exception:
+            pass
+        return
+
+    drain_udp_queue()
+
+
+def drain_udp_queue():
+    # processes datagrams queued by receiver thread and pending rankings update
+    global udp_main_thread_ns
+
+    # cleared before taking queued work, wakeups made meanwhile are seen by the next frame
+    udp_wake.clear()
+
+    start_ns = time.perf_counter_ns()
+    write_hits_before, write_misses_before = get_write_cache_stats()
+    coalesced_before = udp_messages_coalesced
+
+    with udp_lock:
+        queued = list(udp_queue)
+        udp_queue.clear()
+
+    # oldest datagram waited longest
+    max_wait_ns = time.monotonic_ns() - queued[0][2] if queued else 0
+
+    # all source writes made during this tick are applied at once at the end of it
+    with obs_operation("UDP tick"), batch_updates():
+        process_pending_rankings_update()
+        messages_processed = process_udp_datagrams(queued)
+    trace_written()
+    udp_main_thread_ns += time.perf_counter_ns() - start_ns
+
+    if messages_processed and is_debug_logged(debug):
+        write_hits, write_misses = get_write_cache_stats()
+        log_info_if_debug(debug, "UDP drain (%d messages, %d coalesced, max queue wait %.1f ms) OBS writes: %d applied, %d skipped (unchanged)",
+                          messages_processed, udp_messages_coalesced - coalesced_before, max_wait_ns / 1e6,
+                          write_misses - write_misses_before, write_hits - write_hits_before)
+
+
+def start_udp_receiver_thread():
+    global udp_receiver_thread, udp_receiver_stop
+
+    if udp_sock is None:
+        obs.script_log(obs.LOG_ERROR, "UDP socket is not initialized.")
+        return
+
+    udp_receiver_stop = threading.Event()
+    udp_receiver_thread = threading.Thread(target=udp_receiver_thread_main, args=(udp_sock, udp_receiver_stop), name="DiveRecorder UDP receiver")
+    udp_receiver_thread.daemon = True  # thread will exit when OBS exits
+    udp_receiver_thread.start()
+
+
+def stop_udp_receiving():
+    global udp_receiver_thread, udp_drain_armed
+
+    try:
+        obs.timer_remove(udp_timer_callback)
+    except Exception:
+        pass
+    try:
+        obs.timer_remove(udp_wake_check_callback)
+    except Exception:
+        pass
+    try:
+        obs.timer_remove(udp_drain_callback)
+    except Exception:
+        pass
+    udp_drain_armed = False
+
+    if udp_receiver_thread is not None:
+        # not joined - main thread would wait up to UDP_RECEIVER_TIMEOUT. Thread's socket is closed instead (new one is
+        # opened when needed), thread exits on its next wakeup without taking anything from the new socket
+        udp_receiver_stop.set()
+        close_udp_socket()
+        udp_receiver_thread = None
+
+    with udp_lock:
+        udp_queue.clear()
+    udp_wake.clear()
+
+    # timer mode polls non-blocking socket
+    if udp_sock is not None:
+        try:
+            udp_sock.setblocking(False)
+        except OSError:
+            pass
 
 
 # ---------- OBS script lifecycle ----------
@@ -360,6 +634,12 @@ def script_properties():
 
     obs.obs_properties_add_bool(props, "udp_polling_enabled", "Enable UDP Polling")
 
+    mode_list = obs.obs_properties_add_list(props, "udp_receive_mode", "UDP receive mode", obs.OBS_COMBO_TYPE_LIST, obs.OBS_COMBO_FORMAT_STRING)
+    obs.obs_property_list_add_string(mode_list, "Timer polling (200 ms)", UDP_MODE_TIMER)
+    obs.obs_property_list_add_string(mode_list, "Receiver thread (lowest latency)", UDP_MODE_THREAD)
+
+    obs.obs_properties_add_bool(props, "capture_enabled", "Capture DiveRecorder traffic (Captures folder)")
+
     return props
 
 
@@ -367,11 +647,13 @@ def script_defaults(settings):
     log_info_if_debug(debug, "------------------------------ script_defaults() called")
 
     obs.obs_data_set_default_bool(settings, "udp_polling_enabled", True)
+    obs.obs_data_set_default_string(settings, "udp_receive_mode", UDP_MODE_TIMER)
+    obs.obs_data_set_default_bool(settings, "capture_enabled", False)
 
     dvov_script_defaults(settings)
 
 def script_update(settings):
-    global udp_polling_enabled, debug, activeId, rankings_enabled
+    global udp_polling_enabled, udp_receive_mode, debug, activeId, rankings_enabled
     log_info_if_debug(debug, "------------------------------ script_update() called")
 
     dvov_script_update(settings)
@@ -379,28 +661,31 @@ def script_update(settings):
     debug = obs.obs_data_get_bool(settings, "debug")
     rankings_enabled = obs.obs_data_get_bool(settings, "rankings_enabled")
 
+    update_traffic_capture(settings)
+
     # mostly for debugging
     new_state = obs.obs_data_get_bool(settings, "udp_polling_enabled")
+    new_mode = obs.obs_data_get_string(settings, "udp_receive_mode")
 
     # No change? Do nothing.
-    if new_state == udp_polling_enabled:
+    if new_state == udp_polling_enabled and new_mode == udp_receive_mode:
         return
 
+    stop_udp_receiving()
+
     udp_polling_enabled = new_state
+    udp_receive_mode = new_mode
 
     if udp_polling_enabled:
         init()
-        obs.script_log(obs.LOG_INFO, "UDP polling ENABLED")
+        obs.script_log(obs.LOG_INFO, f"UDP polling ENABLED ({udp_receive_mode})")
     else:
-        try:
-            obs.timer_remove(udp_timer_callback)
-        except Exception:
-            pass
         obs.script_log(obs.LOG_INFO, "UDP polling DISABLED")
 
 
 def script_load(settings):
-    global udp_polling_enabled, udp_sock, activeId, id_, rankings_enabled, debug
+    global udp_polling_enabled, udp_receive_mode, activeId, id_, rankings_enabled, debug
+    global udp_messages_received, udp_messages_coalesced, udp_main_thread_ns
     log_info_if_debug(debug, "------------------------------ script_update() called")
 
     dvov_script_load(settings)
@@ -410,37 +695,84 @@ def script_load(settings):
     debug = obs.obs_data_get_bool(settings, "debug")
     rankings_enabled = obs.obs_data_get_bool(settings, "rankings_enabled")
 
-    # create and bind UDP socket (non-blocking)
-    try:
-        udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        udp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        udp_sock.setblocking(False)
-        # bind to all interfaces on portClient
-        udp_sock.bind(("", portClient))
-        obs.script_log(obs.LOG_INFO, f"Listening on UDP {portClient}")
-    except Exception as e:
-        obs.script_log(obs.LOG_ERROR, f"Failed to bind UDP socket: {e}")
-        udp_sock = None
+    udp_messages_received = 0
+    udp_messages_coalesced = 0
+    udp_main_thread_ns = 0
+    reset_event_metrics()
+    reset_latency_traces()
 
-    # Start UDP polling via obs timer
+    update_traffic_capture(settings)
+
+    open_udp_socket()
+
+    # Start UDP polling via obs timer or receiver thread
     udp_polling_enabled = obs.obs_data_get_bool(settings, "udp_polling_enabled")
+    udp_receive_mode = obs.obs_data_get_string(settings, "udp_receive_mode")
 
     if udp_polling_enabled:
         init()
-        obs.script_log(obs.LOG_INFO, "UDP polling ENABLED at script load")
+        obs.script_log(obs.LOG_INFO, f"UDP polling ENABLED at script load ({udp_receive_mode})")
     else:
         obs.script_log(obs.LOG_INFO, "UDP polling DISABLED at script load")
 
 
-def script_unload():
-    global udp_sock
+def script_save(settings):
+    dvov_script_save(settings)
+
 
+def script_unload():
     # cleanup
     try:
         obs.remove_current_callback()
     except Exception:
         pass
-    if udp_sock:
+
+    # stop receiver thread before closing its socket
+    udp_receiver_stop.set()
+    stop_udp_receiving()
+
+    close_udp_socket()
+
+    dvov_xfer_stop()
+    dvov_capture_stop()
+
+    if udp_messages_received:
+        obs.script_log(obs.LOG_INFO, f"UDP messages: {udp_messages_received} received, {udp_messages_coalesced} coalesced (not rendered, newer message for the same event in the same tick), "
+                                     f"main thread {udp_main_thread_ns / udp_messages_received / 1e3:.0f} us per message")
+    for line in event_metrics_summary() + latency_summary():
+        obs.script_log(obs.LOG_INFO, line)
+
+    dvov_script_unload()
+
+def update_traffic_capture(settings):
+    # start/stop capture of DiveRecorder traffic according to settings
+    capture_enabled = obs.obs_data_get_bool(settings, "capture_enabled")
+
+    if capture_enabled and not capture_is_active():
+        try:
+            dvov_capture_start(obs.obs_data_get_string(settings, "rootDir"))
+        except OSError as e:
+            obs.script_log(obs.LOG_ERROR, f"Failed to start traffic capture: {e}")
+    elif not capture_enabled and capture_is_active():
+        dvov_capture_stop()
+
+def open_udp_socket():
+    # create and bind UDP socket (non-blocking)
+    global udp_sock
+    try:
+        udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        udp_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        udp_sock.setblocking(False)
+        # bind to all interfaces on portClient
+        udp_sock.bind(("", portClient))
+        obs.script_log(obs.LOG_INFO, f"Listening on UDP {portClient}")
+    except Exception as e:
+        obs.script_log(obs.LOG_ERROR, f"Failed to bind UDP socket: {e}")
+        udp_sock = None
+
+def close_udp_socket():
+    global udp_sock
+    if udp_sock is not None:
         try:
             udp_sock.close()
         except Exception:
@@ -448,11 +780,18 @@ def script_unload():
         udp_sock = None
 
 def init():
-    # increase activeId and start timer loop
+    # increase activeId and start timer loop (or receiver thread)
     global activeId, id_
     log_info_if_debug(debug, "init()")
 
     activeId += 1
     id_ = activeId
-    obs.timer_add(udp_timer_callback, 200)
+    if udp_sock is None:
+        open_udp_socket()
+    if udp_receive_mode == UDP_MODE_THREAD:
+        start_udp_receiver_thread()
+        # added here on main thread - background threads only set udp_wake
+        obs.timer_add(udp_wake_check_callback, UDP_WAKE_CHECK_INTERVAL_MS)
+    else:
+        obs.timer_add(udp_timer_callback, UDP_POLL_INTERVAL_MS)
     obs.script_log(obs.LOG_INFO, f"Listening on UDP ports. Re-start ID: {id_}")
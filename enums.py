@@ -13,6 +13,7 @@ class EventInfo(StrEnum):
 class TVBannerGrp(StrEnum):
     GroupName = "TVBanner"
     Flag = "Flag"
+    FlagPreload = "Flag Preload"  # hidden companion of Flag (flag_pool.py)
     Total = "Total"
     Position = "Position_Rank"
     Diver = "Diver"
@@ -51,6 +52,8 @@ class MainBoardGrp(StrEnum):
     GroupName = "MainBoard"
     Flag1 = "Flag1"
     Flag2 = "Flag2"
+    Flag1Preload = "Flag1 Preload"
+    Flag2Preload = "Flag2 Preload"
     Diver1 = "Diver1"
     Diver2 = "Diver2"
 
@@ -72,6 +75,11 @@ class SynchroLabelsBoardGrp(StrEnum):
 class RankingsSrc(StrEnum):
     LinePrefix = "ListLine "
     BoardLinePrefix = "BoardListLine "
+    # nested scenes with the lines, one per bank of rankings_banks.py - the shown bank is visible
+    LinesA = "Rnk_Lines A"
+    LinesB = "Rnk_Lines B"
+    BoardLinesA = "Rnk_BoardLines A"
+    BoardLinesB = "Rnk_BoardLines B"
     NamePrefix = "Rnk_Name "
     RankPrefix = "Rnk_Rank "
     TeamPrefix = "Rnk_Team "
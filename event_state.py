@@ -0,0 +1,116 @@
+'''
+State of DiveRecorder events A and B.
+
+DiveRecorder can run two events at once, every message carries its event (A/B) in field 2. State of both events
+is kept here - last REFEREE message, event completion, rankings (Update.txt) and per-event metrics - so messages
+of the event that is not selected are stored instead of dropped, and switching events (F4) shows the other event's
+latest data at once.
+
+Dual mode ("Event B sources suffix" setting): both events are rendered at the same time. Event A is rendered
+into the regular sources, event B into sources named the same plus the suffix (e.g. "Diver1 B" for suffix " B"),
+typically copy of the board scenes for the second board (made by the user, not in the shipped scene collection).
+Only REFEREE message sources and event completion are rendered per event. Rankings, overlay auto-hide and
+state controls exist once and stay with event A in dual mode, shown in the regular sources too (F4 does not switch
+events then), so everything in the regular sources is event A.
+'''
+from dataclasses import dataclass, field
+from typing import Dict, List, Union
+
+from datatypes import DiveListRecord, DiveMessageView
+from latency_trace import event_latency_ms
+
+EVENT_A = "a"
+EVENT_B = "b"
+
+
+@dataclass
+class EventMetrics:
+    messages: int = 0       # messages rendered
+    coalesced: int = 0      # messages dropped, newer message of the same event arrived in the same tick
+    bursts: int = 0         # ticks with more than one message of the event
+    _first_ns: int = 0
+    _last_ns: int = 0
+
+    def record(self, received_ns: int):
+        """Message received at received_ns (time.monotonic_ns) was processed (latency is traced by latency_trace.py)."""
+        self.messages += 1
+        if not self._first_ns:
+            self._first_ns = received_ns
+        self._last_ns = received_ns
+
+    def messages_per_minute(self) -> float:
+        duration_s = (self._last_ns - self._first_ns) / 1e9
+        return self.messages * 60 / duration_s if duration_s > 0 else 0.0
+
+    def summary(self, latency_ms: List[float]) -> str:
+        p50, p95, p_max = latency_ms
+        return (f"{self.messages} messages ({self.messages_per_minute():.1f}/min), {self.coalesced} coalesced, {self.bursts} bursts, "
+                f"latency p50 {p50:.1f} ms, p95 {p95:.1f} ms, max {p_max:.1f} ms")
+
+
+@dataclass
+class EventState:
+    event_ab: str
+    referee_message: Union[DiveMessageView, None] = None
+    synchro: bool = False
+    event_complete: bool = False
+    rankings_records: List[DiveListRecord] = field(default_factory=list)
+    rankings_event_record: Union[DiveMessageView, None] = None
+    rankings_digest: bytes = b""  # digest of Update.txt payload last passed to rankings (see update_parser.py)
+    metrics: EventMetrics = field(default_factory=EventMetrics)
+
+
+event_states: Dict[str, EventState] = {EVENT_A: EventState(EVENT_A), EVENT_B: EventState(EVENT_B)}
+selected_event = EVENT_A
+event_b_suffix = ""  # not empty - dual mode
+
+
+def get_event_state(event_ab: str) -> EventState:
+    # anything but "b" is event A (as DiveRecorder field is lower case "a"/"b")
+    return event_states[EVENT_B if event_ab == EVENT_B else EVENT_A]
+
+
+def get_selected_event() -> str:
+    # event rankings, auto-hide and state controls follow - always event A in dual mode
+    return EVENT_A if is_dual_mode() else selected_event
+
+
+def get_selected_event_state() -> EventState:
+    return event_states[get_selected_event()]
+
+
+def is_selected_event(event_ab: str) -> bool:
+    return get_event_state(event_ab).event_ab == get_selected_event()
+
+
+def is_dual_mode() -> bool:
+    return event_b_suffix != ""
+
+
+def is_rendered_event(event_ab: str) -> bool:
+    return is_dual_mode() or is_selected_event(event_ab)
+
+
+def event_source_namespace(event_ab: str) -> str:
+    """Suffix of source names the event is rendered into."""
+    return event_b_suffix if is_dual_mode() and get_event_state(event_ab).event_ab == EVENT_B else ""
+
+
+def select_event(event_ab: str):
+    global selected_event
+    selected_event = get_event_state(event_ab).event_ab
+
+
+def set_event_b_suffix(suffix: str):
+    global event_b_suffix
+    event_b_suffix = suffix
+
+
+def reset_event_metrics():
+    for state in event_states.values():
+        state.metrics = EventMetrics()
+
+
+def event_metrics_summary() -> List[str]:
+    return [f"Event {state.event_ab.upper()}: {state.metrics.summary(event_latency_ms(state.event_ab))}"
+            for state in event_states.values() if state.metrics.messages]
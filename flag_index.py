@@ -0,0 +1,142 @@
+'''
+Flag image lookup for team codes (Media/Flags).
+
+Folder is scanned once into index of lower-case file name (without extension) -> path, so resolving team code
+is a dict hit. Matching is case-insensitive ("kpm" finds KPM.png, "AD" finds ad.png), "_" and "-" are interchangeable
+("GB_ENG" finds gb-eng.png) and codes can be mapped to other file names in optional Media/Flags/aliases.txt:
+
+    # team code = flag file name (without .png)
+    LTU = lt
+    KAU = Kaunas
+
+Folder is rescanned when its modification time changes (checked at most every FLAG_INDEX_CHECK_INTERVAL seconds).
+Codes without flag get Default.png, each such code is logged once.
+'''
+import typing
+
+if typing.TYPE_CHECKING:
+    import _obspython as obs  # full symbol set for IDE
+else:
+    import obspython as obs   # real runtime module
+
+import os
+import time
+from typing import Dict
+
+from obs_utils import log_info_if_debug
+
+FLAG_FILE_EXT = ".png"
+FLAG_DEFAULT_NAME = "Default"
+FLAG_ALIASES_FILE = "aliases.txt"
+FLAG_INDEX_CHECK_INTERVAL = 10.0  # seconds
+
+_folder = ""
+_folder_mtime = None
+_next_check = 0.0
+_files: Dict[str, str] = {}      # normalized file name -> path
+_resolved: Dict[str, str] = {}   # team code as received -> path (misses included, so they are logged once)
+_default_path = ""
+debug = False
+
+
+def _normalize(name: str) -> str:
+    return name.strip().lower().replace("_", "-")
+
+
+def dvov_flags_set_folder(folder: str, debug_enabled: bool = False):
+    global _folder, debug
+
+    debug = debug_enabled
+    if folder != _folder:
+        _folder = folder
+        rebuild_flag_index()
+
+
+def rebuild_flag_index():
+    global _folder_mtime, _next_check, _default_path
+
+    _files.clear()
+    _resolved.clear()
+    _next_check = time.monotonic() + FLAG_INDEX_CHECK_INTERVAL
+
+    try:
+        _folder_mtime = os.stat(_folder).st_mtime
+        entries = list(os.scandir(_folder))
+    except OSError as e:
+        _folder_mtime = None
+        _default_path = os.path.join(_folder, FLAG_DEFAULT_NAME + FLAG_FILE_EXT)
+        obs.script_log(obs.LOG_WARNING, f"Flags folder not available: {_folder} ({e})")
+        return
+
+    for entry in entries:
+        stem, ext = os.path.splitext(entry.name)
+        if ext.lower() == FLAG_FILE_EXT and entry.is_file():
+            _files[_normalize(stem)] = entry.path
+
+    _default_path = _files.get(_normalize(FLAG_DEFAULT_NAME), os.path.join(_folder, FLAG_DEFAULT_NAME + FLAG_FILE_EXT))
+
+    aliases = _load_aliases(os.path.join(_folder, FLAG_ALIASES_FILE))
+    for code, name in aliases.items():
+        path = _files.get(_normalize(name))
+        if path is None:
+            obs.script_log(obs.LOG_WARNING, f"Flag alias {code} = {name}: no {name}{FLAG_FILE_EXT} in {_folder}")
+        else:
+            _files[_normalize(code)] = path
+
+    log_info_if_debug(debug, "Flag index: %d codes (%d aliases) in %s", len(_files), len(aliases), _folder)
+
+
+def _load_aliases(path: str) -> Dict[str, str]:
+    aliases = {}
+    try:
+        with open(path, encoding="utf-8-sig") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if "=" in line:
+                    code, name = line.split("=", 1)
+                    if code.strip() and name.strip():
+                        aliases[code.strip()] = name.strip()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        obs.script_log(obs.LOG_WARNING, f"Cannot read flag aliases {path}: {e}")
+    return aliases
+
+
+def _check_folder_changed():
+    global _next_check
+
+    now = time.monotonic()
+    if now < _next_check:
+        return
+    _next_check = now + FLAG_INDEX_CHECK_INTERVAL
+
+    try:
+        mtime = os.stat(_folder).st_mtime
+    except OSError:
+        mtime = None
+    if mtime != _folder_mtime:
+        log_info_if_debug(debug, "Flags folder changed, rebuilding flag index")
+        rebuild_flag_index()
+
+
+def get_flag_path(team_code: str) -> str:
+    """
+    Returns path of flag for team code, Default.png if there's none, "" for empty code.
+    """
+    _check_folder_changed()
+
+    path = _resolved.get(team_code)
+    if path is not None:
+        return path
+
+    if not team_code or team_code.strip() == "":
+        path = ""
+    else:
+        path = _files.get(_normalize(team_code))
+        if path is None:
+            path = _default_path
+            obs.script_log(obs.LOG_WARNING, f"No flag for team code '{team_code}' in {_folder}, using {FLAG_DEFAULT_NAME}{FLAG_FILE_EXT}")
+
+    _resolved[team_code] = path
+    return path
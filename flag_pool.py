@@ -0,0 +1,234 @@
+'''
+Preloaded flag of the next diver (optional, "Preload next diver's flag from start list" setting).
+
+Setting file of image source makes OBS decode the image when the diver changes - the flag is blank until it is loaded.
+Every flag slot (Flag, Flag1, Flag2) has companion image source in the scene collection (Flag Preload, Flag1 Preload,
+Flag2 Preload - hidden item right above the slot item, same layout). One of the two shows current flag, the other one
+gets flag of the next diver in start list order (Update.txt) while hidden. When the diver who comes is the expected one,
+diver change only swaps visibility of the two sources; otherwise file is set to the source shown, as without preload.
+
+Both sources are regular ones from the scene collection, nothing is added to the user's scenes - whichever of them is
+visible when the collection is saved shows a valid flag. Collections without companion sources (imported before
+they were added) keep setting file of the slot source. Image sources must not unload when hidden - "unload" is turned
+off for both sources when the slot is first used.
+
+Only the next diver's flag is preloaded, not every team of the start list: a flag can only be shown without loading by
+an image source that is a scene item at the slot's position, so the whole start list would need an item per team in
+every slot. The number of teams is not known when the scene collection is made, and items created by the script would
+be saved into the user's collection. The next diver is known from the start order, so one companion per slot covers
+the diver changes that follow the start list. Event B sources (dual mode) are not preloaded - rankings, and so the
+start order, stay with event A in dual mode (see event_state.py).
+'''
+import typing
+
+if typing.TYPE_CHECKING:
+    import _obspython as obs  # full symbol set for IDE
+else:
+    import obspython as obs   # real runtime module
+
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+from datatypes import DiveListRecord
+from enums import MainBoardGrp, TVBannerGrp
+from flag_index import get_flag_path
+from obs_utils import (get_cached_source, get_scene_items, log_info_if_debug, traced_operation, write_source_file,
+                       write_source_visibility)
+from state_mirror import mirror_override
+
+FLAG_COMPANIONS = {
+    TVBannerGrp.Flag: TVBannerGrp.FlagPreload,
+    MainBoardGrp.Flag1: MainBoardGrp.Flag1Preload,
+    MainBoardGrp.Flag2: MainBoardGrp.Flag2Preload,
+}
+FLAG_PRELOAD_DELAY_MS = 500  # next diver's flag is loaded this long after diver change
+
+enabled = False
+debug = False
+
+_start_order: List[Tuple[int, str]] = []   # (start position, flag path) of start list divers
+_current_start_no: Union[int, None] = None
+_front: Dict[str, str] = {}                # slot -> source showing its flag (slot source or companion), slots in use
+_files: Dict[str, str] = {}                # source -> flag file set by the preload
+_missing: Set[str] = set()                 # slots without companion source in scene collection
+_preload_armed = False
+
+
+def dvov_flag_pool_preload(records: Iterable[DiveListRecord]):
+    """
+    Remembers start order of the event (rankings records), flag of the diver after the current one is preloaded.
+    """
+    global _start_order
+
+    if not enabled:
+        return
+    _start_order = sorted((record.start_position, get_flag_path(record.club_code)) for record in records)
+    _arm_preload()
+
+
+def preload_next_flag(start_no: str):
+    """Current diver changed (start number from REFEREE message), flag of the next one is preloaded after a while."""
+    global _current_start_no
+
+    if not enabled:
+        return
+    try:
+        start_position = int(start_no)
+    except ValueError:
+        return
+    if start_position != _current_start_no:
+        _current_start_no = start_position
+        _arm_preload()
+
+
+def show_pooled_flag(slot: str, path: str) -> bool:
+    """
+    Shows flag in slot - by swapping to the companion source if it has the flag preloaded, otherwise by setting file
+    of the source shown. Returns False if slot has no companion source - caller sets file of the slot source.
+    """
+    if not enabled:
+        return False
+    front = _front.get(slot) or _activate(slot)
+    if front is None:
+        return False
+
+    back = _back_source(slot, front)
+    if _files.get(front) != path:
+        if path and _files.get(back) == path:
+            write_source_visibility(back, True)
+            write_source_visibility(front, False)
+            _front[slot] = back
+        else:
+            _set_file(front, path)
+    mirror_override(slot, {"file": path, "visible": True})  # followers show the flag in the slot source itself
+    return True
+
+
+def _activate(slot: str) -> Union[str, None]:
+    companion = FLAG_COMPANIONS.get(slot)
+    if companion is None or slot in _missing:
+        return None
+    if not (get_scene_items(slot) and get_scene_items(companion)):
+        _missing.add(slot)
+        log_info_if_debug(debug, "Flag preload: no %s source in scenes, flag file is set to %s", companion, slot)
+        return None
+
+    for name in (slot, companion):
+        _keep_loaded(name)
+    write_source_visibility(companion, False)
+    write_source_visibility(slot, True)
+    mirror_override(companion, {"visible": False})
+    _front[slot] = slot
+    return slot
+
+
+def _keep_loaded(source_name: str):
+    # image of hidden source is decoded only with "Unload image when not showing" off
+    source = get_cached_source(source_name)
+    if source is None:
+        return
+    settings = obs.obs_data_create()
+    obs.obs_data_set_bool(settings, "unload", False)
+    obs.obs_source_update(source, settings)
+    obs.obs_data_release(settings)
+
+
+def _back_source(slot: str, front: str) -> str:
+    return FLAG_COMPANIONS[slot] if front == slot else slot
+
+
+def _set_file(source_name: str, path: str):
+    write_source_file(source_name, path)
+    _files[source_name] = path
+
+
+def _next_flag_path() -> Union[str, None]:
+    if _current_start_no is None or not _start_order:
+        return None
+    # first diver of the start list follows the last one (next round)
+    return next((path for position, path in _start_order if position > _current_start_no), _start_order[0][1])
+
+
+@traced_operation("flag preload")
+def _preload_next_flag():
+    global _preload_armed
+
+    obs.timer_remove(_preload_next_flag)
+    _preload_armed = False
+
+    path = _next_flag_path()
+    if not (enabled and path):
+        return
+    for slot, front in _front.items():
+        back = _back_source(slot, front)
+        if _files.get(back) != path:
+            _set_file(back, path)
+
+
+def _arm_preload():
+    # not in the same update as the diver change - source just hidden must not get the next flag before it is hidden
+    global _preload_armed
+
+    if _preload_armed:
+        obs.timer_remove(_preload_next_flag)
+    obs.timer_add(_preload_next_flag, FLAG_PRELOAD_DELAY_MS)
+    _preload_armed = True
+
+
+def _disarm_preload():
+    global _preload_armed
+
+    if _preload_armed:
+        obs.timer_remove(_preload_next_flag)
+        _preload_armed = False
+
+
+def release_flag_pool():
+    # slots show their flag in the slot source itself again
+    for slot, front in _front.items():
+        companion = FLAG_COMPANIONS[slot]
+        if front != slot:
+            write_source_file(slot, _files.get(front, ""))
+        write_source_visibility(slot, True)
+        write_source_visibility(companion, False)
+        mirror_override(slot, None)
+        mirror_override(companion, None)
+    _forget_flag_pool()
+
+
+def _forget_flag_pool():
+    global _start_order, _current_start_no
+
+    _disarm_preload()
+    _front.clear()
+    _files.clear()
+    _missing.clear()
+    _start_order = []
+    _current_start_no = None
+
+
+# ---------------------------
+# Lifecycle (called from overlay_script_common)
+# ---------------------------
+def _on_frontend_event(event):
+    if event == obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGING:
+        # sources are going away, slots of the next collection are looked up again
+        _forget_flag_pool()
+
+
+def dvov_flag_pool_script_update(settings):
+    global enabled, debug
+
+    debug = obs.obs_data_get_bool(settings, "debug")
+    enabled = obs.obs_data_get_bool(settings, "flag_pool_enabled")
+    if not enabled and (_front or _start_order):
+        release_flag_pool()
+
+
+def dvov_flag_pool_script_load(settings):
+    dvov_flag_pool_script_update(settings)
+    obs.obs_frontend_add_event_callback(_on_frontend_event)
+
+
+def dvov_flag_pool_script_unload():
+    obs.obs_frontend_remove_event_callback(_on_frontend_event)
+    release_flag_pool()
@@ -0,0 +1,123 @@
+'''
+End-to-end latency tracing of DiveRecorder messages, from datagram receive to the last OBS source write.
+
+Every processed message gets a trace - monotonic timestamps (time.monotonic_ns) of the steps it went through:
+    receive   datagram read from socket (by timer poll or receiver thread)
+    dequeue   main thread took it for processing
+    parse     fields parsed (decoded and split, DiveMessage for REFEREE), includes earlier messages of the same tick
+    state     script state updated and source writes made (batched)
+    write     tick's batched source writes applied to OBS
+Rankings (Update.txt) are traced from the UPDATE message that announced them: receive, fetch (fetched and parsed),
+dequeue, state, write.
+
+Duration of each step (time since the previous stamp) and total are kept in rolling windows per packet type and
+stage, summary shows p50/p95/p99. Totals of DiveRecorder messages are kept per event (A/B) as well - event metrics
+(event_state.py) show them. All functions are called on main thread.
+'''
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple, Union
+
+LATENCY_TRACE_SAMPLES = 500  # durations kept per packet type and stage
+TOTAL_STAGE = "total"
+
+Stamps = List[Tuple[str, int]]  # (stage, monotonic ns)
+
+Trace = Tuple[str, str, Stamps]  # (packet type, event A/B or "", stamps)
+
+_current: Union[Trace, None] = None  # trace of message being processed
+_unwritten: List[Trace] = []         # traces waiting for the tick's source writes to be applied
+_durations_ms: Dict[str, Dict[str, Deque[float]]] = {}  # packet type -> stage -> durations
+_event_totals_ms: Dict[str, Deque[float]] = {}          # event A/B -> total durations
+
+
+def trace_begin(packet_type: str, stamps: Stamps, event_ab: str = ""):
+    """Starts trace of message processed now, stamps so far (at least "receive") given by caller."""
+    global _current
+    _current = (packet_type, event_ab, stamps)
+
+
+def trace_mark(stage: str):
+    """Stamps current step of message being processed (no-op when there is none)."""
+    if _current is not None:
+        _current[2].append((stage, time.monotonic_ns()))
+
+
+def trace_received_ns() -> int:
+    """Receive time of message being processed, 0 when there is none."""
+    return _current[2][0][1] if _current is not None else 0
+
+
+def trace_end():
+    """Message processed (state updated), its writes are applied with the tick."""
+    global _current
+    if _current is None:
+        return
+    trace_mark("state")
+    _unwritten.append(_current)
+    _current = None
+
+
+def trace_abort():
+    global _current
+    _current = None
+
+
+def trace_written():
+    """Called after tick's batched source writes were applied - completes traces of the tick."""
+    if not _unwritten:
+        return
+    done_ns = time.monotonic_ns()
+    for packet_type, event_ab, stamps in _unwritten:
+        stamps.append(("write", done_ns))
+        stages = _durations_ms.get(packet_type)
+        if stages is None:
+            stages = _durations_ms[packet_type] = {}
+        for (_, previous_ns), (stage, stamp_ns) in zip(stamps, stamps[1:]):
+            _add_duration(stages, stage, (stamp_ns - previous_ns) / 1e6)
+        total_ms = (done_ns - stamps[0][1]) / 1e6
+        _add_duration(stages, TOTAL_STAGE, total_ms)
+        if event_ab:
+            _add_duration(_event_totals_ms, event_ab, total_ms)
+    _unwritten.clear()
+
+
+def _add_duration(windows: Dict[str, Deque[float]], key: str, duration_ms: float):
+    durations = windows.get(key)
+    if durations is None:
+        durations = windows[key] = deque(maxlen=LATENCY_TRACE_SAMPLES)
+    durations.append(duration_ms)
+
+
+def percentiles(values, ps=(50, 95, 99)) -> List[float]:
+    """Nearest-rank percentiles of values (0 for none), p 100 is the maximum."""
+    ordered = sorted(values)
+    if not ordered:
+        return [0.0 for _ in ps]
+    return [ordered[max(0, math.ceil(len(ordered) * p / 100) - 1)] for p in ps]
+
+
+def event_latency_ms(event_ab: str, ps=(50, 95, 100)) -> List[float]:
+    """Percentiles of total latency (receive to source writes applied) of event's messages."""
+    return percentiles(_event_totals_ms.get(event_ab, ()), ps)
+
+
+def latency_summary() -> List[str]:
+    """One line per packet type: p50/p95/p99 in ms of each stage and total."""
+    lines = []
+    for packet_type, stages in _durations_ms.items():
+        parts = []
+        for stage, durations in stages.items():
+            p50, p95, p99 = percentiles(durations)
+            parts.append(f"{stage} {p50:.1f}/{p95:.1f}/{p99:.1f}")
+        lines.append(f"Latency {packet_type} (last {len(stages[TOTAL_STAGE])}, p50/p95/p99 ms): {', '.join(parts)}")
+    return lines
+
+
+def reset_latency_traces():
+    global _current
+    _current = None
+    _unwritten.clear()
+    _durations_ms.clear()
+    _event_totals_ms.clear()
@@ -1,11 +1,193 @@
+import functools
 import typing
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple, Union
 
+import debug_log
+from debug_log import log_event
 
 if typing.TYPE_CHECKING:
     import _obspython as obs  # full symbol set for IDE
 else:
     import obspython as obs   # real runtime module
 
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# --------- Source reference cache
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Source name -> strong source reference (or None if source doesn't exist).
+# obs_get_source_by_name searches all sources under OBS source lock, so helpers below look up sources here instead.
+# Cache is kept correct by OBS source signals (create/remove/destroy/rename) and released on script unload.
+# Signals can be emitted from non-main threads, hence the lock.
+_source_cache: Dict[str, object] = {}
+_source_cache_lock = threading.Lock()
+_source_signals_connected = False
+
+def get_cached_source(source_name):
+    """
+    Returns source reference for given name or None if source doesn't exist.
+    Reference is owned by the cache - DO NOT release it.
+    """
+    with _source_cache_lock:
+        if source_name in _source_cache:
+            return _source_cache[source_name]
+
+    src = obs.obs_get_source_by_name(source_name)
+
+    with _source_cache_lock:
+        if source_name in _source_cache:
+            # filled by another thread in the meantime, keep existing reference
+            existing = _source_cache[source_name]
+        else:
+            _source_cache[source_name] = src
+            return src
+
+    if src is not None:
+        obs.obs_source_release(src)
+    return existing
+
+
+def invalidate_cached_source(*source_names):
+    released = []
+    with _source_cache_lock:
+        for name in source_names:
+            src = _source_cache.pop(name, None)
+            if src is not None:
+                released.append(src)
+
+    # release outside the lock - releasing last reference emits source_destroy, which calls back into the cache
+    for src in released:
+        obs.obs_source_release(src)
+
+
+def clear_source_cache():
+    with _source_cache_lock:
+        released = [src for src in _source_cache.values() if src is not None]
+        _source_cache.clear()
+    _missing_sources_warned.clear()
+
+    for src in released:
+        obs.obs_source_release(src)
+
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# --------- Shadow state of written values
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Source name -> {property: last value written by the script}, properties: "text", "file", "color", "visible".
+# Writing the same value again is dropped (no obs_source_update/obs_sceneitem_set_visible call).
+# Entries are dropped when source is (re)created/removed/renamed, visibility entries also when scene items change
+# or when item visibility is changed outside the script (e.g. by Advanced Scene Switcher macro).
+_written_values: Dict[str, Dict[str, object]] = {}
+
+write_cache_hits = 0    # writes skipped
+write_cache_misses = 0  # writes passed to OBS
+
+def _is_already_written(source_name, prop, value) -> bool:
+    global write_cache_hits, write_cache_misses
+
+    written = _written_values.get(source_name)
+    if written is not None and written.get(prop) == value:
+        write_cache_hits += 1
+        return True
+
+    write_cache_misses += 1
+    return False
+
+
+def _remember_written(source_name, prop, value):
+    _written_values.setdefault(source_name, {})[prop] = value
+
+
+def get_written_value(source_name, prop):
+    written = _written_values.get(source_name)
+    return written.get(prop) if written is not None else None
+
+
+def get_written_values() -> Dict[str, Dict[str, object]]:
+    # copy, e.g. initial state of the mirror (state_mirror.py)
+    return {name: dict(written) for name, written in _written_values.items()}
+
+
+def forget_written_values(*source_names):
+    for name in source_names:
+        _written_values.pop(name, None)
+
+
+def forget_written_visibility():
+    for written in _written_values.values():
+        written.pop("visible", None)
+
+
+def clear_write_cache():
+    _written_values.clear()
+
+
+def get_write_cache_stats():
+    """Returns (hits, misses) - number of writes skipped/passed to OBS since script load."""
+    return write_cache_hits, write_cache_misses
+
+
+def _on_source_created(calldata):
+    source = obs.calldata_source(calldata, "source")
+    name = obs.obs_source_get_name(source)
+
+    # source might have been cached as missing
+    with _source_cache_lock:
+        if name in _source_cache and _source_cache[name] is None:
+            del _source_cache[name]
+
+    # recreated source starts with its own settings, not with what we wrote to the old one
+    forget_written_values(name)
+
+
+def _on_source_removed(calldata):
+    source = obs.calldata_source(calldata, "source")
+    name = obs.obs_source_get_name(source)
+    invalidate_cached_source(name)
+    forget_written_values(name)
+
+
+def _on_source_renamed(calldata):
+    prev_name = obs.calldata_string(calldata, "prev_name")
+    new_name = obs.calldata_string(calldata, "new_name")
+    invalidate_cached_source(prev_name, new_name)
+    forget_written_values(prev_name, new_name)
+
+
+_SOURCE_SIGNALS = [
+    ("source_create", _on_source_created),
+    ("source_remove", _on_source_removed),
+    ("source_destroy", _on_source_removed),
+    ("source_rename", _on_source_renamed),
+]
+
+def connect_source_signals():
+    global _source_signals_connected
+    if _source_signals_connected:
+        return
+
+    handler = obs.obs_get_signal_handler()
+    for signal, callback in _SOURCE_SIGNALS:
+        obs.signal_handler_connect(handler, signal, callback)
+    _source_signals_connected = True
+
+
+def disconnect_source_signals():
+    global _source_signals_connected
+    if not _source_signals_connected:
+        return
+
+    handler = obs.obs_get_signal_handler()
+    for signal, callback in _SOURCE_SIGNALS:
+        obs.signal_handler_disconnect(handler, signal, callback)
+    _source_signals_connected = False
+
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# --------- Scenes
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+
 def get_scene(scene_name):
     src = obs.obs_get_source_by_name(scene_name)
     if not src:
@@ -46,62 +228,578 @@ def get_all_scene_names():
 
     return scene_names
 
-def set_source_visibility(name, visible):
-    scene_items_to_set = []
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# --------- Scene item index
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Source name -> all scene items showing that source (in every scene, incl. items nested in groups).
+# Items hold a reference (obs_sceneitem_addref) until the index is invalidated.
+# Index is rebuilt lazily on first use after frontend scene collection/scene list change or after items were added/removed
+# in any of the indexed scenes/groups (scene signals only mark the index dirty - they can fire on any thread).
+_scene_item_index: Dict[str, List[object]] = {}
+_scene_item_index_dirty = True
+_indexed_scene_sources: List[object] = []  # scenes and groups we hold references to and listen on for item changes
 
-    # Step 1: Collect scene items to set
-    for scene_name in get_all_scene_names():
-        scene, scene_src = get_scene(scene_name)
-        if not scene:
+def _on_scene_items_changed(calldata):
+    global _scene_item_index_dirty
+    _scene_item_index_dirty = True
+
+
+def _on_scene_item_visible(calldata):
+    # our own writes remember the value before setting it, so only changes made outside the script get here as a mismatch
+    item = obs.calldata_sceneitem(calldata, "item")
+    name = obs.obs_source_get_name(obs.obs_sceneitem_get_source(item))
+    if get_written_value(name, "visible") != obs.calldata_bool(calldata, "visible"):
+        written = _written_values.get(name)
+        if written is not None:
+            written.pop("visible", None)
+
+
+_SCENE_ITEM_SIGNALS = [
+    ("item_add", _on_scene_items_changed),
+    ("item_remove", _on_scene_items_changed),
+    ("item_visible", _on_scene_item_visible),
+]
+
+
+def _release_scene_item_index():
+    global _scene_item_index_dirty
+
+    for items in _scene_item_index.values():
+        for item in items:
+            obs.obs_sceneitem_release(item)
+    _scene_item_index.clear()
+
+    for scene_source in _indexed_scene_sources:
+        handler = obs.obs_source_get_signal_handler(scene_source)
+        for signal, callback in _SCENE_ITEM_SIGNALS:
+            obs.signal_handler_disconnect(handler, signal, callback)
+        obs.obs_source_release(scene_source)
+    _indexed_scene_sources.clear()
+
+    _scene_item_index_dirty = True
+
+
+def _watch_scene_source(scene_source):
+    # scene_source must be a reference owned by the index
+    _indexed_scene_sources.append(scene_source)
+    handler = obs.obs_source_get_signal_handler(scene_source)
+    for signal, callback in _SCENE_ITEM_SIGNALS:
+        obs.signal_handler_connect(handler, signal, callback)
+
+
+def _index_items(items, indexed_groups):
+    for item in items:
+        source = obs.obs_sceneitem_get_source(item)
+        name = obs.obs_source_get_name(source)
+
+        obs.obs_sceneitem_addref(item)
+        _scene_item_index.setdefault(name, []).append(item)
+
+        # same group can be referenced from several scenes, index its children only once
+        if obs.obs_sceneitem_is_group(item) and name not in indexed_groups:
+            indexed_groups.add(name)
+            _watch_scene_source(obs.obs_source_get_ref(source))
+
+            group_items = obs.obs_sceneitem_group_enum_items(item)
+            _index_items(group_items, indexed_groups)
+            obs.sceneitem_list_release(group_items)
+
+
+def rebuild_scene_item_index():
+    global _scene_item_index_dirty
+
+    _release_scene_item_index()
+    _scene_item_index_dirty = False
+
+    # new items might have different visibility than the ones we wrote to
+    forget_written_visibility()
+
+    scenes = obs.obs_frontend_get_scenes()
+    if not scenes:
+        return
+
+    indexed_groups = set()
+    for scene_source in scenes:
+        # keep the reference returned by obs_frontend_get_scenes, it is released with the index
+        _watch_scene_source(scene_source)
+
+        scene = obs.obs_scene_from_source(scene_source)
+        if scene is None:
             continue
 
-        item = find_scene_item(scene, name)
-        if item:
-            scene_items_to_set.append((scene_name, item))
+        items = obs.obs_scene_enum_items(scene)
+        _index_items(items, indexed_groups)
+        obs.sceneitem_list_release(items)
 
-        obs.obs_source_release(scene_src)
 
-    for scene_name, item in scene_items_to_set:
+def invalidate_scene_item_index():
+    global _scene_item_index_dirty
+    _scene_item_index_dirty = True
+
+
+def get_scene_items(source_name):
+    """
+    Returns all scene items (incl. nested in groups) for given source name.
+    Items are owned by the index - DO NOT release them.
+    """
+    if _scene_item_index_dirty:
+        rebuild_scene_item_index()
+    return _scene_item_index.get(source_name, ())
+
+
+def set_source_visibility(name, visible):
+    write_source_visibility(_namespaced(name), visible)
+
+
+def write_source_visibility(name, visible):
+    # name already namespaced (compiled plans, see source_plans.py)
+    if _batch_depth > 0:
+        _batch_visibility[name] = visible
+        return
+    _apply_source_visibility(name, visible)
+    _notify_applied()
+
+
+def _apply_source_visibility(name, visible):
+    items = get_scene_items(name)  # first - rebuilding the index forgets written visibility
+    if _is_already_written(name, "visible", visible):
+        return
+
+    # remember before setting, item_visible signal is emitted while setting
+    _remember_written(name, "visible", visible)
+    for item in items:
         obs.obs_sceneitem_set_visible(item, visible)
+    _notify_write(name, "visible", visible)
+
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# --------- Frontend events and obs_utils lifecycle (called from overlay_script_common)
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+def _on_frontend_event(event):
+    if event in (obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGED,
+                 obs.OBS_FRONTEND_EVENT_SCENE_LIST_CHANGED,
+                 obs.OBS_FRONTEND_EVENT_FINISHED_LOADING):
+        invalidate_scene_item_index()
+
+    elif event in (obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CLEANUP,
+                   obs.OBS_FRONTEND_EVENT_EXIT):
+        # scene collection is about to be destroyed - do not keep its sources/items alive
+        _release_scene_item_index()
+        clear_source_cache()
+        clear_write_cache()
+
+
+def dvov_utils_script_update(settings):
+    set_obs_call_tracing(obs.obs_data_get_bool(settings, "obs_call_trace_enabled"),
+                         parse_call_budgets(obs.obs_data_get_string(settings, "obs_call_budgets")))
+
+
+def dvov_utils_script_load():
+    reset_obs_call_stats()
+    connect_source_signals()
+    obs.obs_frontend_add_event_callback(_on_frontend_event)
+    invalidate_scene_item_index()
+
+
+def dvov_utils_script_unload():
+    global _batch_depth
+    for line in obs_call_summary():
+        _obs_module.script_log(_obs_module.LOG_INFO, line)
+    _batch_depth = 0
+    _batch_settings.clear()
+    _batch_visibility.clear()
+
+    obs.obs_frontend_remove_event_callback(_on_frontend_event)
+    _release_scene_item_index()
+
+    disconnect_source_signals()
+    clear_source_cache()
+    clear_write_cache()
+    set_obs_call_tracing(False)
+
+
+def is_debug_logged(debug_enabled) -> bool:
+    # guard for debug messages costly to build
+    return debug_enabled or debug_log.recording
+
+
+def log_info_if_debug(debug_enabled, message, *args):
+    """
+    Written to OBS log if debug_enabled, recorded to debug log ring buffer (debug_log.py) if debug_enabled or recording
+    is on, returns at once otherwise. Message is %-format of args, formatted only when written.
+    """
+    if debug_enabled or debug_log.recording:
+        log_event(obs.LOG_INFO, message, args, debug_enabled)
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# --------- Update batching
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Within a batch, source writes are collected (source name -> {property: value}, source name -> visibility) and only
+# the final value of each is applied when the outermost batch ends: one obs_source_update per source, one visibility
+# change per source. E.g. REFEREE message hides/clears everything and then shows/sets real values - with batching
+# nothing flickers and text is not re-rendered twice.
+# Batches are used on main thread only (timer callbacks, hotkeys).
+_batch_depth = 0
+_batch_settings: Dict[str, Dict[str, object]] = {}
+_batch_visibility: Dict[str, bool] = {}
+
+def begin_batch():
+    global _batch_depth
+    _batch_depth += 1
+
+
+def end_batch():
+    global _batch_depth
+    _batch_depth -= 1
+    if _batch_depth == 0:
+        flush_batch()
+
+
+def flush_batch():
+    # take pending writes first, applying them must not add to the batch being flushed
+    pending_settings = dict(_batch_settings)
+    pending_visibility = dict(_batch_visibility)
+    _batch_settings.clear()
+    _batch_visibility.clear()
+
+    for source_name, values in pending_settings.items():
+        _apply_source_settings(source_name, values)
+
+    for name, visible in pending_visibility.items():
+        _apply_source_visibility(name, visible)
+
+    _notify_applied()
+
+
+@contextmanager
+def batch_updates():
+    begin_batch()
+    try:
+        yield
+    finally:
+        end_batch()
+
+
+def batched(callback, operation: str = ""):
+    """
+    Wraps callback (e.g. hotkey handler) so all source writes it makes are applied at once when it returns.
+    It is one operation for OBS call tracing, named operation or after the callback.
+    """
+    @functools.wraps(callback)
+    def batched_callback(*args, **kwargs):
+        with obs_operation(operation or callback.__name__), batch_updates():
+            return callback(*args, **kwargs)
+    return batched_callback
+
+
+def _get_current_value(source_name, prop):
+    # value pending in current batch or last written one
+    pending = _batch_settings.get(source_name)
+    if pending is not None and prop in pending:
+        return pending[prop]
+    return get_written_value(source_name, prop)
+
+
+def _write_source_setting(source_name, prop, value):
+    if _batch_depth > 0:
+        _batch_settings.setdefault(source_name, {})[prop] = value
+        return
+    _apply_source_settings(source_name, {prop: value})
+    _notify_applied()
+
+
+def _apply_source_settings(source_name, values: Dict[str, object]):
+    changed = {prop: value for prop, value in values.items() if not _is_already_written(source_name, prop, value)}
+    if not changed:
+        return
+
+    src = get_cached_source(source_name)
+    if src is None:
+        _warn_source_not_found(source_name)
+        return
+
+    settings = obs.obs_data_create()
+    for prop, value in changed.items():
+        if isinstance(value, str):
+            obs.obs_data_set_string(settings, prop, value)
+        else:
+            obs.obs_data_set_int(settings, prop, value)
+    obs.obs_source_update(src, settings)
+    obs.obs_data_release(settings)
+
+    for prop, value in changed.items():
+        _remember_written(source_name, prop, value)
+        _notify_write(source_name, prop, value)
+
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# --------- Write listener
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Gets every write applied to OBS - on_write(source name, property, value) with the same properties as written values
+# above - and on_applied() when the batch (or single write outside of batch) was applied. Used by state mirror
+# (state_mirror.py). Main thread only.
+_write_listener: Union[Tuple[Callable[[str, str, object], None], Callable[[], None]], None] = None
+
+def set_write_listener(on_write: Union[Callable[[str, str, object], None], None], on_applied: Union[Callable[[], None], None] = None):
+    global _write_listener
+    _write_listener = (on_write, on_applied) if on_write is not None else None
+
+
+def _notify_write(source_name, prop, value):
+    if _write_listener is not None:
+        _write_listener[0](source_name, prop, value)
+
+
+def _notify_applied():
+    if _write_listener is not None:
+        _write_listener[1]()
+
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# --------- OBS call tracing and budgets
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# When enabled ("Trace OBS calls" setting), module name obs in this file is replaced by a proxy which counts and times
+# every OBS call made here (source updates, visibility, lookups, logging). Calls are attributed to the operation in
+# progress on main thread - obs_operation(name) around UDP ticks, hotkeys and page flips, including batched writes
+# applied at its end - and an operation making more calls than its budget ("OBS call budgets" setting, e.g.
+# "REFEREE awards=55, htk_4=140") is logged. When disabled, obs is the module itself and operations cost one check.
+OBS_CALLS_NO_OPERATION = "(no operation)"
+
+_obs_module = obs
+_call_budgets: Dict[str, int] = {}
+_call_stats: Dict[str, Dict[str, List[int]]] = {}  # operation -> OBS function -> [calls, ns]
+_operation_stats: Dict[str, List[int]] = {}        # operation -> [times, calls, max calls, over budget]
+
+
+class _Operation:
+    __slots__ = ("name", "names", "thread", "calls")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.names: List[str] = []  # what was processed, e.g. packet types of UDP tick
+        self.thread = threading.get_ident()
+        self.calls: Dict[str, List[int]] = {}
+
+    def label(self) -> str:
+        return "+".join(self.names) if self.names else self.name
+
+
+_operation: Union[_Operation, None] = None
+
+
+class _TracedObs:
+    """Stands in for obspython module in this file while tracing."""
+    def __init__(self, module):
+        self._module = module
+
+    def __getattr__(self, name):
+        value = getattr(self._module, name)
+        if callable(value):
+            value = _traced_call(name, value)
+        setattr(self, name, value)  # next lookups do not get here
+        return value
+
+
+def _traced_call(name: str, function):
+    def traced(*args, **kwargs):
+        start_ns = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _record_call(name, time.perf_counter_ns() - start_ns)
+    return traced
+
+
+def _record_call(name: str, duration_ns: int):
+    if _operation is not None and _operation.thread == threading.get_ident():
+        calls = _operation.calls
+    else:
+        calls = _call_stats.setdefault(OBS_CALLS_NO_OPERATION, {})
+    stats = calls.get(name)
+    if stats is None:
+        stats = calls[name] = [0, 0]
+    stats[0] += 1
+    stats[1] += duration_ns
+
+
+def is_obs_call_tracing() -> bool:
+    return obs is not _obs_module
+
+
+def set_obs_call_tracing(enabled: bool, budgets: Union[Dict[str, int], None] = None):
+    global obs
+    _call_budgets.clear()
+    _call_budgets.update(budgets or {})
+    if enabled != is_obs_call_tracing():
+        obs = _TracedObs(_obs_module) if enabled else _obs_module
+
+
+def parse_call_budgets(text: str) -> Dict[str, int]:
+    """ "REFEREE awards=55, htk_4=140" -> {"REFEREE awards": 55, "htk_4": 140} """
+    budgets = {}
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        name, _, calls = item.rpartition("=")
+        try:
+            budgets[name.strip()] = int(calls)
+        except ValueError:
+            _obs_module.script_log(_obs_module.LOG_WARNING, f"Invalid OBS call budget: {item.strip()}")
+    return budgets
+
+
+@contextmanager
+def obs_operation(name: str):
+    """OBS calls made inside are attributed to operation name (nested operations belong to the outermost one)."""
+    global _operation
+    if _operation is not None or not is_obs_call_tracing():
+        yield
+        return
+
+    _operation = operation = _Operation(name)
+    try:
+        yield
+    finally:
+        _operation = None
+        _finish_operation(operation)
+
+
+def name_operation(name: str):
+    """Names what operation in progress processes (e.g. packet type), label is the names joined by "+"."""
+    if _operation is not None and name not in _operation.names:
+        _operation.names.append(name)
+
+
+def traced_operation(name: str):
+    """Decorator: callback (e.g. timer callback) is one operation."""
+    def decorator(callback):
+        @functools.wraps(callback)
+        def operation_callback(*args, **kwargs):
+            with obs_operation(name):
+                return callback(*args, **kwargs)
+        return operation_callback
+    return decorator
+
+
+def _finish_operation(operation: _Operation):
+    if not operation.calls and not operation.names:
+        return  # e.g. empty UDP tick
+    label = operation.label()
+
+    stats = _call_stats.setdefault(label, {})
+    for name, (calls, duration_ns) in operation.calls.items():
+        total = stats.setdefault(name, [0, 0])
+        total[0] += calls
+        total[1] += duration_ns
+
+    calls = sum(calls for calls, _ in operation.calls.values())
+    operation_stats = _operation_stats.setdefault(label, [0, 0, 0, 0])
+    operation_stats[0] += 1
+    operation_stats[1] += calls
+    operation_stats[2] = max(operation_stats[2], calls)
+
+    budget = _call_budgets.get(label)
+    if budget is not None and calls > budget:
+        operation_stats[3] += 1
+        top = sorted(operation.calls.items(), key=lambda item: -item[1][0])[:3]
+        _obs_module.script_log(_obs_module.LOG_WARNING, f"OBS call budget exceeded: {label} made {calls} calls (budget {budget}), "
+                                                        f"most: {', '.join(f'{name} {calls}' for name, (calls, _) in top)}")
+
+
+def obs_call_summary() -> List[str]:
+    """Per operation: times done, average/max OBS calls, budget, then the most called OBS functions (calls and ms per operation)."""
+    lines = []
+    for label, stats in _call_stats.items():
+        times, calls, max_calls, over_budget = _operation_stats.get(label, (0, 0, 0, 0))
+        per = max(times, 1)
+        budget = f", budget {_call_budgets[label]} exceeded {over_budget}x" if label in _call_budgets else ""
+        top = sorted(stats.items(), key=lambda item: -item[1][0])[:5]
+        functions = ", ".join(f"{name} {calls / per:.1f} ({duration_ns / per / 1e6:.2f} ms)" for name, (calls, duration_ns) in top)
+        head = f"{times}x, {calls / per:.1f} calls avg, max {max_calls}{budget}" if times else "total"
+        lines.append(f"OBS calls {label}: {head}; {functions}")
+    return lines
+
+
+def reset_obs_call_stats():
+    _call_stats.clear()
+    _operation_stats.clear()
+
+
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# --------- Source namespace
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# Within source_namespace(suffix), helpers below write to sources named source_name + suffix (e.g. second board
+# showing event B, see event_state.py). Used on main thread only.
+_source_namespace = ""
+
+@contextmanager
+def source_namespace(suffix: str):
+    global _source_namespace
+    previous = _source_namespace
+    _source_namespace = suffix
+    try:
+        yield
+    finally:
+        _source_namespace = previous
+
+
+def get_source_namespace() -> str:
+    return _source_namespace
+
+
+def _namespaced(source_name):
+    return f"{source_name}{_source_namespace}" if _source_namespace else source_name
+
+
+def namespaced_source_name(source_name) -> str:
+    # name helpers below write to in current namespace, for write_source_* (compiled plans, see source_plans.py)
+    return _namespaced(source_name)
+
+
+_missing_sources_warned = set()
+
+def _warn_source_not_found(source_name):
+    # once per source until sources change, missing source would be reported on every message otherwise
+    if source_name not in _missing_sources_warned:
+        _missing_sources_warned.add(source_name)
+        obs.script_log(obs.LOG_WARNING, f"Source not found: {source_name}")
 
-def log_info_if_debug(debug_enabled, message):
-    if debug_enabled:
-        obs.script_log(obs.LOG_INFO, message)
 
 # ---------- Helpers for OBS source updates ----------
 def get_source_string(source_name):
-    src = obs.obs_get_source_by_name(source_name)
+    source_name = _namespaced(source_name)
+    # text written by the script is the current text, no need to read it back from OBS
+    text = _get_current_value(source_name, "text")
+    if text is not None:
+        return text
+
+    src = get_cached_source(source_name)
     if src is not None:
         settings = obs.obs_source_get_settings(src)
         text = obs.obs_data_get_string(settings, "text")
         obs.obs_data_release(settings)
-        obs.obs_source_release(src)
+        _remember_written(source_name, "text", text)
         return text
     else:
-        obs.script_log(obs.LOG_WARNING, f"Source not found: {source_name}")
+        _warn_source_not_found(source_name)
         return ""
 
 def set_source_string(source_name, text):
-    src = obs.obs_get_source_by_name(source_name)
-    if src is not None:
-        settings = obs.obs_data_create()
-        obs.obs_data_set_string(settings, "text", text)
-        obs.obs_source_update(src, settings)
-        obs.obs_data_release(settings)
-        obs.obs_source_release(src)
-    else:
-        obs.script_log(obs.LOG_WARNING, f"Source not found: {source_name}")
+    _write_source_setting(_namespaced(source_name), "text", text)
 
 def set_source_file(source_name, file_path):
-    src = obs.obs_get_source_by_name(source_name)
-    if src is not None:
-        settings = obs.obs_data_create()
-        obs.obs_data_set_string(settings, "file", file_path)
-        obs.obs_source_update(src, settings)
-        obs.obs_data_release(settings)
-        obs.obs_source_release(src)
-    else:
-        obs.script_log(obs.LOG_WARNING, f"Source not found (file): {source_name}")
+    _write_source_setting(_namespaced(source_name), "file", file_path)
+
+def write_source_string(source_name, text):
+    # source name already namespaced (namespaced_source_name)
+    _write_source_setting(source_name, "text", text)
+
+def write_source_file(source_name, file_path):
+    _write_source_setting(source_name, "file", file_path)
+
+def set_source_value(source_name, prop, value):
+    # raw property as in written values (e.g. received from primary instance, see state_mirror.py)
+    _write_source_setting(_namespaced(source_name), prop, value)
 
 def set_color_source_alpha(source_name, alpha):
     """
@@ -110,20 +808,24 @@ def set_color_source_alpha(source_name, alpha):
     This is used as hack to hide/show sources inside source groups.
     Python OBS API does not work in setting source visibility directly inside groups.
     """
-    source = obs.obs_get_source_by_name(source_name)
-    if source is None:
-        obs.script_log(obs.LOG_WARNING, f"Source not found: {source_name}")
-        return
-
-    settings = obs.obs_source_get_settings(source)
-
-    # Read current ABGR (0xAABBGGRR)
-    current_abgr = obs.obs_data_get_int(settings, "color")
+    source_name = _namespaced(source_name)
 
     # Clamp alpha
     if alpha < 0: alpha = 0
     if alpha > 255: alpha = 255
 
+    # Current ABGR (0xAABBGGRR) - read it from the source only if we haven't written it ourselves
+    current_abgr = _get_current_value(source_name, "color")
+    if current_abgr is None:
+        source = get_cached_source(source_name)
+        if source is None:
+            _warn_source_not_found(source_name)
+            return
+
+        settings = obs.obs_source_get_settings(source)
+        current_abgr = obs.obs_data_get_int(settings, "color")
+        obs.obs_data_release(settings)
+
     # Mask out OLD alpha (upper 8 bits)
     rgb = current_abgr & 0x00FFFFFF  # keep BB GG RR
 
@@ -131,11 +833,7 @@ def set_color_source_alpha(source_name, alpha):
     new_abgr = (alpha << 24) | rgb
 
     # Write back
-    obs.obs_data_set_int(settings, "color", new_abgr)
-    obs.obs_source_update(source, settings)
-
-    obs.obs_data_release(settings)
-    obs.obs_source_release(source)
+    _write_source_setting(source_name, "color", new_abgr)
 
 def rgb_to_bgr(rgb):
     r = (rgb >> 16) & 0xFF
@@ -151,13 +849,7 @@ def set_color_source_color(source_name, rgb):
     # Force full alpha channel
     argb = 0xFF000000 | (bgr & 0x00FFFFFF)
 
-    source = obs.obs_get_source_by_name(source_name)
-    if source is not None:
-        settings = obs.obs_data_create()
-        obs.obs_data_set_int(settings, "color", argb)
-        obs.obs_source_update(source, settings)
-        obs.obs_data_release(settings)
-        obs.obs_source_release(source)
+    _write_source_setting(_namespaced(source_name), "color", argb)
 
 
 def set_filter_path(source_name, filter_name, setting_name, new_path):
@@ -201,11 +893,7 @@ def set_vlc_playlist(source_name, folder_path):
         obs.obs_source_release(src)
 
 def is_source_available(source_name) -> bool:
-    src = obs.obs_get_source_by_name(source_name)
-    if src:
-        obs.obs_source_release(src)
-        return True
-    return False
+    return get_cached_source(_namespaced(source_name)) is not None
 
 def center_score(score_str: str, width: int = 3) -> str:
     """
@@ -6,17 +6,22 @@ else:
     import obspython as obs   # real runtime module
 
 from datatypes import DiveMessage
-from obs_utils import center_score, set_filter_path, set_source_string, set_source_file, set_source_visibility, log_info_if_debug, set_vlc_playlist, is_source_available
+from flag_index import get_flag_path, dvov_flags_set_folder
+from flag_pool import preload_next_flag, show_pooled_flag
+from obs_utils import (center_score, set_filter_path, set_source_string, set_source_visibility, log_info_if_debug, set_vlc_playlist, is_source_available,
+                       get_source_namespace, namespaced_source_name, write_source_file, write_source_visibility)
+from source_plans import Binding, SourcePlan, apply_plan, compile_plan, field, fixed
 from enums import (DiveInfoBoardGrp, EventInfo, IndividualAwards, InstantReplaySrc, JudgeAwardsBoardGrp, MainBoardGrp, SynchroLabelsBoardGrp,
                    TVBannerGrp, SynchroAwards, SynchroLabelsGrp, DiveInfoGrp, AwardsCommonGrp)
 
 import os
+from functools import partial
+from typing import Dict, List, NamedTuple
 
 flagLoc = ""
 rootDir = ""
 debug = False
-event_name = ""
-event_ab_is_a = True  # default to Event A
+event_names = {}  # source namespace -> name of event rendered into it (see event_state.py)
 overlays_enabled = True
 
 set_source_props_retries = 0
@@ -38,6 +43,17 @@ penaltyText = {
     "4": "Arm position (Max 4½ points)"
 }
 
+def set_flag(source_name: str, file_path: str):
+    write_flag(namespaced_source_name(source_name), file_path)
+
+
+def write_flag(source_name: str, file_path: str):
+    # preloaded flag is shown by swapping to its companion source, otherwise file is set to the flag source shown
+    # (preload is made for regular flag sources only, not for event B ones; source name is already namespaced)
+    if get_source_namespace() or not show_pooled_flag(source_name, file_path):
+        write_source_file(source_name, file_path)
+
+
 def clear_data():
     # Clear all sources to blank or default state (e.g. hide judge awards, clear flags, etc.)
     set_source_string(EventInfo.Info, " ")
@@ -47,12 +63,12 @@ def clear_data():
 
 
     set_source_string(TVBannerGrp.Diver, " ")
-    set_source_file(TVBannerGrp.Flag, "")
+    set_flag(TVBannerGrp.Flag, "")
     set_source_string(TVBannerGrp.Position, " ")
     set_source_string(TVBannerGrp.Total, " ")
 
-    set_source_file(MainBoardGrp.Flag1, "")
-    set_source_file(MainBoardGrp.Flag2, "")
+    set_flag(MainBoardGrp.Flag1, "")
+    set_flag(MainBoardGrp.Flag2, "")
     set_source_string(MainBoardGrp.Diver1, " ")
     set_source_string(MainBoardGrp.Diver2, " ")
 
@@ -84,31 +100,8 @@ def clear_data():
     set_source_visibility(DiveInfoBoardGrp.GroupName, False)
 
 
-def set_synchro_judge_number(count_judges: int):
-    # overlay synchro judge awards and labels visibility
-    set_source_visibility(SynchroLabelsGrp.GroupName, (count_judges > 0))
-    set_source_visibility(SynchroAwards.JudgesGrp11, (count_judges == 11))
-    set_source_visibility(SynchroAwards.JudgesGrp9, (count_judges == 9))
-    set_source_visibility(SynchroAwards.JudgesGrp7, (count_judges == 7))
-    set_source_visibility(SynchroAwards.JudgesGrp5, (count_judges == 5))
-
-    # setting Synchro Labels in Board visibility
-    set_source_visibility(SynchroLabelsBoardGrp.GroupName, (count_judges > 0))
-    set_source_visibility(JudgeAwardsBoardGrp.GroupName, (count_judges > 0))
-
-
-def set_individual_judge_number(count_judges: int):
-    log_info_if_debug(debug, f"Setting individual judge number: {count_judges}")
-    # overlay individual judge scores visibility
-    set_source_visibility(IndividualAwards.JudgesGrp7, (count_judges == 7))
-    set_source_visibility(IndividualAwards.JudgesGrp5, (count_judges == 5))
-    set_source_visibility(IndividualAwards.JudgesGrp3, (count_judges == 3))
-
-    # board judge scores visibility (visibility of irrelevant score fields is managed by emptying the text)
-    set_source_visibility(JudgeAwardsBoardGrp.GroupName, (count_judges > 0))
-
-
 def dvov_act_set_event_complete(is_event_complete: bool):
+    event_name = event_names.get(get_source_namespace(), "")
     if is_event_complete:
         set_source_string(EventInfo.Info, f" {event_name} \n Completed")
         set_source_string(EventInfo.DiverNo, " ")
@@ -119,10 +112,7 @@ def dvov_act_set_event_complete(is_event_complete: bool):
         set_source_string(EventInfo.RoundNo, " ")
 
 
-def dvov_act_set_event_ab(event_is_a: bool):
-    global event_ab_is_a
-    event_ab_is_a = event_is_a
-
+def dvov_act_clear_event():
     # event changed, all data is invalid
     clear_data()
 
@@ -132,187 +122,195 @@ def dvov_act_set_display_enabled(enabled: bool):
     overlays_enabled = enabled
 
 
-def dvov_act_single_event_referee_update(msg: DiveMessage, synchro: bool):
-    global event_name
+#----------------------------------------------------------
+# REFEREE message -> sources binding table (see source_plans.py)
+#----------------------------------------------------------
+class RefereePlanKey(NamedTuple):
+    synchro: bool
+    awards: bool            # awards (J1 not blank) or pre-dive info
+    judges: int             # judge awards shown for this number of judges, 0 - judge groups hidden
+    overlays_enabled: bool
+    namespace: str          # source namespace the plan is compiled for
 
-    log_info_if_debug(debug, f"start single_update(), Message Type: {msg.packet_id}")
 
-    if msg.packet_id != "REFEREE":
-        return
-
-    # Not "our" event, ignore message (e.g. if Event A message received but currently displaying Event B)
-    if (event_ab_is_a and msg.event_ab != "a") or (not event_ab_is_a and msg.event_ab != "b"):
-        return
+def _always(key: RefereePlanKey) -> bool:
+    return True
 
-    #----------------------------------------------------------
-    # Event info
-    #----------------------------------------------------------
-    event_name = msg.long_event_name
+def _synchro(key: RefereePlanKey) -> bool:
+    return key.synchro
 
-    diverLabel = "Divers" if synchro else "Diver"
+def _individual(key: RefereePlanKey) -> bool:
+    return not key.synchro
 
-    diverNo = f"{diverLabel} {msg.start_no}/{msg.divers_in_event} "
-    roundNo = f"Round {msg.round}/{msg.rounds_in_event} "
-    event_info = (
-        f" {event_name} \n "
-        f" {diverNo}"
-        f" {roundNo}"
-    )
+def _awards(key: RefereePlanKey) -> bool:
+    return key.awards
 
-    set_source_string(EventInfo.Info, event_info)
-    set_source_string(EventInfo.Title, event_name)
-    set_source_string(EventInfo.DiverNo, diverNo)
-    set_source_string(EventInfo.RoundNo, roundNo)
+def _pre_dive(key: RefereePlanKey) -> bool:
+    return not key.awards
 
-    #----------------------------------------------------------
-    # Flag
-    #----------------------------------------------------------
-    def get_flag_path(team_code):
-        if not team_code or team_code.strip() == "":
-            return ""
+def _synchro_awards(key: RefereePlanKey) -> bool:
+    return key.synchro and key.awards
 
-        flag_file = os.path.join(flagLoc, team_code + ".png")
+def _individual_awards(key: RefereePlanKey) -> bool:
+    return not key.synchro and key.awards
 
-        log_info_if_debug(debug, f"Flag file path: {flag_file}")
 
-        if not os.path.isfile(flag_file):
-            folder = os.path.dirname(flag_file)
-            flag_file = os.path.join(folder, "Default.png")
+def _rjust3(text: str) -> str:
+    # Ensure rank/start number is 3 characters wide for display alignment (text source is buggy with alignment)
+    return text.rjust(3)
 
-        log_info_if_debug(debug, f"Flag file path FINAL: {flag_file}")
+def _event_diver_no(msg: DiveMessage, label: str) -> str:
+    return f"{label} {msg.start_no}/{msg.divers_in_event} "
 
-        return flag_file
+def _event_round_no(msg: DiveMessage) -> str:
+    return f"Round {msg.round}/{msg.rounds_in_event} "
 
-    set_source_file(TVBannerGrp.Flag, get_flag_path(msg.d1_team_code))
-    set_source_file(MainBoardGrp.Flag1, get_flag_path(msg.d1_team_code))
-    set_source_file(MainBoardGrp.Flag2, get_flag_path(msg.d2_team_code))
+def _event_info(msg: DiveMessage, label: str) -> str:
+    return f" {msg.long_event_name} \n  {_event_diver_no(msg, label)} {_event_round_no(msg)}"
 
-    #----------------------------------------------------------
-    # Diver name
-    #----------------------------------------------------------
-    if synchro:
-        displayName = (
-            f"{msg.d1_first_name} {msg.d1_family_name} + "
+def _synchro_display_name(msg: DiveMessage) -> str:
+    return (f"{msg.d1_first_name} {msg.d1_family_name} + "
             f"{msg.d2_first_name} {msg.d2_family_name} "
-            f"{msg.d1_team_code}/{msg.d2_team_code}"
-        )
-        set_source_string(MainBoardGrp.Diver1, f"{msg.d1_first_name} {msg.d1_family_name} - {msg.d1_team_code}")
-        set_source_string(MainBoardGrp.Diver2, f"{msg.d2_first_name} {msg.d2_family_name} - {msg.d2_team_code}")
-    else:
-        displayName = msg.d1_full_name_team
-        set_source_string(MainBoardGrp.Diver1, displayName)
-        set_source_string(MainBoardGrp.Diver2, " ")
+            f"{msg.d1_team_code}/{msg.d2_team_code}")
+
+def _synchro_diver1(msg: DiveMessage) -> str:
+    return f"{msg.d1_first_name} {msg.d1_family_name} - {msg.d1_team_code}"
+
+def _synchro_diver2(msg: DiveMessage) -> str:
+    return f"{msg.d2_first_name} {msg.d2_family_name} - {msg.d2_team_code}"
+
+def _penalty_text(penalty_code: str) -> str:
+    return penaltyText.get(penalty_code, " ")
+
+def _dive_number(msg: DiveMessage) -> str:
+    return f"{msg.dive_no}{msg.pos_code}"
+
+def _board_text(board: str) -> str:
+    return f"{board}m" if board else " "
+
+def _dive_description(msg: DiveMessage) -> str:
+    return f"{msg.dive_description}, {positionText.get(msg.pos_code, '')}"
+
+
+def _judge_bindings(when, source_prefix: str, first_judge: int, count: int, formatter) -> List[Binding]:
+    # source_prefix1..count <- J<first_judge>.., formatted
+    return [Binding(when, f"{source_prefix}{i}", field(f"j{first_judge + i - 1}", formatter)) for i in range(1, count + 1)]
+
+def _static_text(when, source_name: str, text: str) -> Binding:
+    return Binding(when, source_name, fixed(text), static=True)
+
+def _visible(when, group_name: str, visible) -> Binding:
+    return Binding(when, group_name, visible, write_source_visibility, static=True)
+
+
+REFEREE_BINDINGS: List[Binding] = [
+    # ----- Event info
+    Binding(_synchro,    EventInfo.Info,    partial(_event_info, label="Divers")),
+    Binding(_individual, EventInfo.Info,    partial(_event_info, label="Diver")),
+    Binding(_always,     EventInfo.Title,   field("long_event_name")),
+    Binding(_synchro,    EventInfo.DiverNo, partial(_event_diver_no, label="Divers")),
+    Binding(_individual, EventInfo.DiverNo, partial(_event_diver_no, label="Diver")),
+    Binding(_always,     EventInfo.RoundNo, _event_round_no),
+
+    # ----- Flag
+    Binding(_always, TVBannerGrp.Flag,   field("d1_team_code", get_flag_path), write_flag),
+    Binding(_always, MainBoardGrp.Flag1, field("d1_team_code", get_flag_path), write_flag),
+    Binding(_always, MainBoardGrp.Flag2, field("d2_team_code", get_flag_path), write_flag),
+
+    # ----- Diver name
+    Binding(_synchro,    TVBannerGrp.Diver,   _synchro_display_name),
+    Binding(_synchro,    MainBoardGrp.Diver1, _synchro_diver1),
+    Binding(_synchro,    MainBoardGrp.Diver2, _synchro_diver2),
+    Binding(_individual, TVBannerGrp.Diver,   field("d1_full_name_team")),
+    Binding(_individual, MainBoardGrp.Diver1, field("d1_full_name_team")),
+    _static_text(_individual, MainBoardGrp.Diver2, " "),
+
+    # ----- Awards: rank, points, penalty, total
+    Binding(_awards, TVBannerGrp.Position,    field("rank", _rjust3)),
+    Binding(_awards, AwardsCommonGrp.Points,  field("points")),
+    Binding(_awards, AwardsCommonGrp.Penalty, field("penalty_code", _penalty_text)),
+    _static_text(_pre_dive, AwardsCommonGrp.Penalty, ""),
+    Binding(_always, TVBannerGrp.Total,       field("total")),  # pre-dive: total points for the next diver
+
+    # ----- Awards: synchro Execution judges JE1..JE6, JOE1..JOE6 and Synchro judges JS1..JS5, JOS1..JOS5
+    *_judge_bindings(_synchro_awards, SynchroAwards.JudgeExecPrefix,         1, 6, _rjust3),
+    *_judge_bindings(_synchro_awards, JudgeAwardsBoardGrp.JExecPrefix,       1, 6, center_score),
+    *_judge_bindings(_synchro_awards, SynchroAwards.JudgeSynchroPrefix,      7, 5, _rjust3),
+    *_judge_bindings(_synchro_awards, JudgeAwardsBoardGrp.JSynchroPrefix,    7, 5, center_score),
+
+    # ----- Awards: individual Execution judges JE1..JE7, JOE1..JOE7, synchro ones cleared
+    *_judge_bindings(_individual_awards, IndividualAwards.JudgePrefix,       1, 7, _rjust3),
+    *_judge_bindings(_individual_awards, JudgeAwardsBoardGrp.JExecPrefix,    1, 7, center_score),
+    *[_static_text(_individual_awards, f"{SynchroAwards.JudgeSynchroPrefix}{i}", "  ") for i in range(1, 6)],
+    *[_static_text(_individual_awards, f"{JudgeAwardsBoardGrp.JSynchroPrefix}{i}", "  ") for i in range(1, 6)],
+
+    # ----- Pre dive info
+    Binding(_pre_dive, TVBannerGrp.Position,     field("start_no", _rjust3)),
+    Binding(_pre_dive, DiveInfoGrp.Number,       _dive_number),
+    Binding(_pre_dive, DiveInfoGrp.Difficulty,   field("dd")),
+    Binding(_pre_dive, DiveInfoGrp.Board,        field("board", _board_text)),
+    Binding(_pre_dive, DiveInfoGrp.Description,  _dive_description),
+
+    # ----- Visibility: awards or pre-dive info (shown only if overlays are enabled, hidden anyway)
+    # TODO: Consider moving show/hide logics to state_controls and only keep source updates here in overlay_data
+    _visible(lambda key: key.awards or key.overlays_enabled,     DiveInfoGrp.GroupName,      lambda key: not key.awards),
+    _visible(lambda key: key.awards or key.overlays_enabled,     DiveInfoBoardGrp.GroupName, lambda key: not key.awards),
+    _visible(lambda key: not key.awards or key.overlays_enabled, AwardsCommonGrp.GroupName,  lambda key: key.awards),
+
+    # ----- Visibility: overlay and board judge awards and synchro labels for the number of judges
+    _visible(_always, SynchroLabelsGrp.GroupName,      lambda key: key.synchro and key.judges > 0),
+    _visible(_always, SynchroAwards.JudgesGrp11,       lambda key: key.synchro and key.judges == 11),
+    _visible(_always, SynchroAwards.JudgesGrp9,        lambda key: key.synchro and key.judges == 9),
+    _visible(_always, SynchroAwards.JudgesGrp7,        lambda key: key.synchro and key.judges == 7),
+    _visible(_always, SynchroAwards.JudgesGrp5,        lambda key: key.synchro and key.judges == 5),
+    _visible(_always, SynchroLabelsBoardGrp.GroupName, lambda key: key.synchro and key.judges > 0),
+    _visible(_always, IndividualAwards.JudgesGrp7,     lambda key: not key.synchro and key.judges == 7),
+    _visible(_always, IndividualAwards.JudgesGrp5,     lambda key: not key.synchro and key.judges == 5),
+    _visible(_always, IndividualAwards.JudgesGrp3,     lambda key: not key.synchro and key.judges == 3),
+    # board judge scores (visibility of irrelevant score fields is managed by emptying the text)
+    _visible(_always, JudgeAwardsBoardGrp.GroupName,   lambda key: key.judges > 0),
+]
+
+_referee_plans: Dict[RefereePlanKey, SourcePlan] = {}
+
+
+def get_referee_plan(key: RefereePlanKey) -> SourcePlan:
+    plan = _referee_plans.get(key)
+    if plan is None:
+        plan = _referee_plans[key] = compile_plan(REFEREE_BINDINGS, key)
+        log_info_if_debug(debug, "REFEREE plan compiled for %s: %d writes", key, len(plan.message_writes) + len(plan.static_writes))
+    return plan
+
+
+def referee_awards_present(msg: DiveMessage) -> bool:
+    # Awards exist if J1 is not blank
+    return msg.j1.strip() != ""
 
-    set_source_string(TVBannerGrp.Diver, displayName)
 
-    #----------------------------------------------------------
-    # Awards?
-    # Awards exist if J1 is not blank
-    #----------------------------------------------------------
-    awards_present = (msg.j1.strip() != "")
-
-    log_info_if_debug(debug, f"J1 contents: [{msg.j1}]")
-
-    set_source_string(AwardsCommonGrp.Penalty, "")
-
-    # always hide synchro labels initially
-    set_synchro_judge_number(0)
-    set_individual_judge_number(0)
-
-    if awards_present:
-        # on awards, hide pre-dive info
-        set_source_visibility(DiveInfoGrp.GroupName, False)
-        set_source_visibility(DiveInfoBoardGrp.GroupName, False)
-
-        # ----- Rank
-        # Ensure rank is 3 characters wide for display alignment (text source is buggy with alignment)
-        rank = msg.rank
-        rank = rank.rjust(3)
-        set_source_string(TVBannerGrp.Position, rank)
-
-        # ----- Judge lists -----
-        count_j =  int(msg.number_of_judges)
-
-        if synchro:
-            # Populate Execution Judge sources JE1..JE6, JOE1..JOE6
-            judge_values = [
-                    msg.j1, msg.j2, msg.j3, msg.j4, msg.j5, msg.j6
-                ]
-
-            for i, val in enumerate(judge_values, start=1):
-                set_source_string(f"{SynchroAwards.JudgeExecPrefix}{i}", val.rjust(3))
-                set_source_string(f"{JudgeAwardsBoardGrp.JExecPrefix}{i}", center_score(val))
-
-            # Populate Synchro Judge sources JS1..JS5, JOS1..JOS5
-            judge_values = [
-                    msg.j7, msg.j8, msg.j9, msg.j10, msg.j11
-                ]
-
-            for i, val in enumerate(judge_values, start=1):
-                set_source_string(f"{SynchroAwards.JudgeSynchroPrefix}{i}", val.rjust(3))
-                set_source_string(f"{JudgeAwardsBoardGrp.JSynchroPrefix}{i}", center_score(val))
-
-        else:
-            # Fill in Execution judge values for overlay and board JE1..JE7, JOE1..JOE7
-            judge_values = [
-                    msg.j1, msg.j2, msg.j3, msg.j4, msg.j5, msg.j6, msg.j7
-                ]
-
-            for i, val in enumerate(judge_values, start=1):
-                set_source_string(f"{IndividualAwards.JudgePrefix}{i}", val.rjust(3))
-                set_source_string(f"{JudgeAwardsBoardGrp.JExecPrefix}{i}", center_score(val))
-
-            # Clear JS1..JS5, JOS1..JOS5
-            clear_values = ["  "] * 5
-            for i, val in enumerate(clear_values, start=1):
-                set_source_string(f"{SynchroAwards.JudgeSynchroPrefix}{i}", val)
-                set_source_string(f"{JudgeAwardsBoardGrp.JSynchroPrefix}{i}", val)
-
-        # Penalty text
-        penalty = penaltyText.get(msg.penalty_code, " ")
-
-        set_source_string(AwardsCommonGrp.Points, msg.points)
-        set_source_string(AwardsCommonGrp.Penalty, penalty)
-        set_source_string(TVBannerGrp.Total, msg.total)
-
-        # show awards sources
-        if overlays_enabled:
-            set_source_visibility(AwardsCommonGrp.GroupName, True)
-
-            if synchro:
-                set_synchro_judge_number(count_j)
-            else:
-                set_individual_judge_number(count_j)
-    else:
-        #------------------------------------------------------
-        # Pre dive info
-        #------------------------------------------------------
-        set_source_visibility(AwardsCommonGrp.GroupName, False)
-        set_source_visibility(JudgeAwardsBoardGrp.GroupName, False)
-        set_source_visibility(SynchroLabelsBoardGrp.GroupName, False)
+def referee_operation_name(msg: DiveMessage, synchro: bool) -> str:
+    # OBS call tracing label (obs_utils.py) - pre-dive and awards messages make different number of calls
+    return f"REFEREE {'synchro ' if synchro else ''}{'awards' if referee_awards_present(msg) else 'pre-dive'}"
+
+
+def dvov_act_single_event_referee_update(msg: DiveMessage, synchro: bool):
+    # caller decides which event is rendered and into which sources (see event_state.py)
+    log_info_if_debug(debug, "start single_update(), Message Type: %s", msg.packet_id)
 
-        # ----- Start No
-        # Ensure start number is 3 characters wide for display alignment (text source is buggy with alignment)
-        start_no = msg.start_no
-        start_no = start_no.rjust(3)
+    if msg.packet_id != "REFEREE":
+        return
 
-        set_source_string(TVBannerGrp.Position, start_no)
-        log_info_if_debug(debug, "Pre-dive info branch")
-        position = positionText.get(msg.pos_code, "")
+    namespace = get_source_namespace()
+    event_names[namespace] = msg.long_event_name
 
-        # set Total points for the next diver
-        set_source_string(TVBannerGrp.Total, msg.total)
+    awards_present = referee_awards_present(msg)
+    log_info_if_debug(debug, "J1 contents: [%s]", msg.j1)
 
-        # Fill in dive info
-        set_source_string(DiveInfoGrp.Number, f"{msg.dive_no}{msg.pos_code}")
-        set_source_string(DiveInfoGrp.Difficulty, msg.dd)
-        set_source_string(DiveInfoGrp.Board, f"{msg.board}m" if msg.board else " ")
-        set_source_string(DiveInfoGrp.Description, f"{msg.dive_description}, {position}")
+    # judge awards are shown only if overlays are enabled
+    judges = int(msg.number_of_judges) if awards_present and overlays_enabled else 0
 
-        # TODO: Consider moving show/hide logics to state_controls and only keep source updates here in overlay_data
-        if overlays_enabled:
-            set_source_visibility(DiveInfoGrp.GroupName, True)
-            set_source_visibility(DiveInfoBoardGrp.GroupName, True)
+    apply_plan(get_referee_plan(RefereePlanKey(synchro, awards_present, judges, overlays_enabled, namespace)), msg)
+    if not namespace:
+        preload_next_flag(msg.start_no)
 
 
 def set_source_paths():
@@ -361,7 +359,8 @@ def dvov_act_script_update(settings):
 
     debug = obs.obs_data_get_bool(settings, "debug")
     rootDir = obs.obs_data_get_string(settings, "rootDir")
-    flagLoc = os.path.join(rootDir, "Media\\Flags")
+    flagLoc = os.path.join(rootDir, "Media", "Flags")
+    dvov_flags_set_folder(flagLoc, debug)
 
     # need to do this by timer, because on script load, sources aren't available yet
     obs.timer_add(set_source_paths, 3000)
@@ -7,9 +7,23 @@ if typing.TYPE_CHECKING:
 else:
     import obspython as obs   # real runtime module
 
-from state_controls import dvov_state_script_properties, dvov_state_script_defaults, dvov_state_script_update, dvov_state_script_load, dvov_status_register_hotkeys_force
+from state_controls import dvov_state_script_properties, dvov_state_script_defaults, dvov_state_script_update, dvov_state_script_load, dvov_state_script_unload, dvov_state_script_save, dvov_status_register_hotkeys_force
 from overlay_data import dvov_act_script_update, dvov_act_script_load #, dvov_act_script_properties, dvov_act_script_defaults
-from rankings import dvov_rank_add_properties, dvov_rank_script_defaults, dvov_rank_script_update, dvov_rank_script_load, dvov_rank_register_hotkeys, on_rankings_hotkey_stop
+from rankings import dvov_rank_add_properties, dvov_rank_script_defaults, dvov_rank_script_update, dvov_rank_script_load, dvov_rank_script_unload, dvov_rank_register_hotkeys, dvov_rank_script_save, on_rankings_hotkey_stop
+from obs_utils import dvov_utils_script_update, dvov_utils_script_load, dvov_utils_script_unload
+from flag_pool import dvov_flag_pool_script_update, dvov_flag_pool_script_load, dvov_flag_pool_script_unload
+from state_mirror import dvov_mirror_script_properties, dvov_mirror_script_defaults, dvov_mirror_script_update, dvov_mirror_script_load, dvov_mirror_script_unload
+from script_profiler import dvov_profiler_script_update, dvov_profiler_script_unload
+from debug_log import dvov_debug_log_script_update, dvov_debug_log_script_unload
+
+# OBS calls made through obs_utils per operation (see obs_utils.py), operation making more is logged as a warning.
+# Measured maximum of each operation within an event plus ~15% (dev/benchmark.py with tracing): REFEREE pre-dive 77,
+# awards 49, synchro pre-dive 91, synchro awards 59, AVIDEO 16, page flip 20, page prefetch 96, F4 119. First message
+# after scene collection load (scene item index is built) or after switch between individual and synchro event goes
+# over once, so does first prefetch into rankings bank B. Page flip goes over when the page is written in the flip
+# itself: rankings changed after prefetch, or scene collection without bank B (rankings_banks.py).
+OBS_CALL_BUDGETS_DEFAULT = ("REFEREE pre-dive=90, REFEREE awards=55, REFEREE synchro pre-dive=105, REFEREE synchro awards=70, "
+                            "AVIDEO=20, page flip=25, page prefetch=110, htk_4=140")
 
 # ---------- OBS script lifecycle ----------
 def dvov_script_properties(props):
@@ -21,7 +35,14 @@ def dvov_script_properties(props):
 
     dvov_rank_add_properties(props)
 
+    obs.obs_properties_add_bool(props, "flag_pool_enabled", "Preload next diver's flag from start list")
+
+    dvov_mirror_script_properties(props)
+
     obs.obs_properties_add_bool(props, "debug", "Show debug data in Log file")
+    obs.obs_properties_add_bool(props, "debug_log_recording", "Record debug events for Dump Debug Log (also with debug off)")
+    obs.obs_properties_add_bool(props, "obs_call_trace_enabled", "Trace OBS calls (per operation, summary in Log file)")
+    obs.obs_properties_add_text(props, "obs_call_budgets", "OBS call budgets (operation=calls, ...)", obs.OBS_TEXT_DEFAULT)
 
     return props
 
@@ -34,25 +55,55 @@ def dvov_script_defaults(settings):
     # dvov_act_script_defaults(settings)
     dvov_rank_script_defaults(settings)
     dvov_state_script_defaults(settings)
+    dvov_mirror_script_defaults(settings)
 
     obs.obs_data_set_default_bool(settings, "debug", False)
+    obs.obs_data_set_default_bool(settings, "debug_log_recording", False)
     obs.obs_data_set_default_bool(settings, "rankings_enabled", True)
+    obs.obs_data_set_default_bool(settings, "flag_pool_enabled", False)
+    obs.obs_data_set_default_bool(settings, "obs_call_trace_enabled", False)
+    obs.obs_data_set_default_string(settings, "obs_call_budgets", OBS_CALL_BUDGETS_DEFAULT)
 
 
 def dvov_script_update(settings):
+    dvov_utils_script_update(settings)
     dvov_rank_script_update(settings)
     dvov_state_script_update(settings)
     dvov_act_script_update(settings)
+    dvov_flag_pool_script_update(settings)
+    dvov_mirror_script_update(settings)
+    dvov_profiler_script_update(settings)
+    dvov_debug_log_script_update(settings)
 
 
 def dvov_script_load(settings):
-    dvov_status_register_hotkeys_force()
+    dvov_utils_script_load()
+
+    dvov_status_register_hotkeys_force(settings)
     dvov_rank_register_hotkeys(settings)
 
     dvov_rank_script_load(settings)
     dvov_state_script_load(settings)
     dvov_act_script_load(settings)
+    dvov_flag_pool_script_load(settings)
+    dvov_mirror_script_load(settings)
+
+def dvov_script_save(settings):
+    # hotkey bindings without forced default
+    dvov_state_script_save(settings)
+    dvov_rank_script_save(settings)
 
 def dvov_script_unload():
+    dvov_profiler_script_unload()
+    dvov_mirror_script_unload()
     on_rankings_hotkey_stop(True)
+    dvov_rank_script_unload()
+    dvov_state_script_unload()
+    dvov_flag_pool_script_unload()
+
+    # release cached OBS references last - nothing should touch sources after this
+    dvov_utils_script_unload()
+
+    # debug log queued so far written, writer thread stopped
+    dvov_debug_log_script_unload()
 
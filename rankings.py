@@ -6,10 +6,13 @@ if typing.TYPE_CHECKING:
 else:
     import obspython as obs   # real runtime module
 
-from typing import List
+from dataclasses import dataclass, field
+from typing import List, Tuple, Union
 from datatypes import DiveListRecord, DiveMessage
 from enums import RankingsSrc, EventMode
-from obs_utils import get_source_string, set_source_string, set_source_visibility, log_info_if_debug, set_color_source_color, set_color_source_alpha
+from obs_utils import get_source_string, set_source_string, set_source_visibility, log_info_if_debug, set_color_source_color, set_color_source_alpha, batched, batch_updates, traced_operation
+import rankings_banks
+from rankings_banks import BANK_A, BANK_B, line_group_names, line_source_names, front_bank, back_bank, swap_banks, has_back_bank, show_bank, forget_banks
 
 # ------------------------------------------------------------------------------------------------------------------------------------------------------------------
 # --------- Rankings handling
@@ -18,6 +21,8 @@ RANKINGS_MAX_LINES = 10  # max number of lines supported in the scene
 
 rankings_no_lines_per_page = RANKINGS_MAX_LINES
 rankings_page_display_duration = 10  # seconds per page
+rankings_double_buffer = True  # next page is written into hidden bank of lines (rankings_banks.py)
+RANKINGS_PREFETCH_DELAY_MS = 500  # next page is prefetched this long after page flip
 
 ranking_rec_working_copy: List[DiveListRecord] = []
 rankings_event_rec_working_copy: DiveMessage
@@ -37,11 +42,55 @@ show_guests = False
 _current_page = 0
 _total_pages = 0
 _timer_active = False
+_prefetch_armed = False
+_prefetched_page: Union[int, None] = None  # page written into back bank, None if back bank content is not valid
 
 _hotkey_start_id = None
 _hotkey_stop_id = None
 
-event_ab_is_a = True  # default to event A
+
+# ---------------------------
+# Diff of successive record lists (Update.txt is fetched after every dive, usually only few rows change)
+# ---------------------------
+@dataclass
+class RankingsDiff:
+    changed: List[DiveListRecord] = field(default_factory=list)    # same diver, different rank/points/club
+    inserted: List[DiveListRecord] = field(default_factory=list)
+    removed: List[DiveListRecord] = field(default_factory=list)
+    reordered: List[DiveListRecord] = field(default_factory=list)  # relative order to other divers changed
+
+    def is_empty(self) -> bool:
+        return not (self.changed or self.inserted or self.removed or self.reordered)
+
+    def __str__(self):
+        return f"{len(self.changed)} changed, {len(self.inserted)} inserted, {len(self.removed)} removed, {len(self.reordered)} reordered"
+
+
+def _record_key(record: DiveListRecord):
+    return (record.start_position, record.diver)
+
+
+def diff_rankings(old: List[DiveListRecord], new: List[DiveListRecord]) -> RankingsDiff:
+    diff = RankingsDiff()
+
+    old_by_key = {_record_key(r): r for r in old}
+    new_keys = {_record_key(r) for r in new}
+
+    diff.removed = [r for key, r in old_by_key.items() if key not in new_keys]
+
+    for record in new:
+        prev = old_by_key.get(_record_key(record))
+        if prev is None:
+            diff.inserted.append(record)
+        elif prev != record:
+            diff.changed.append(record)
+
+    # order of divers present in both lists
+    old_order = [_record_key(r) for r in old if _record_key(r) in new_keys]
+    new_common = [r for r in new if _record_key(r) in old_by_key]
+    diff.reordered = [r for key, r in zip(old_order, new_common) if key != _record_key(r)]
+
+    return diff
 
 def clear_data():
     log_info_if_debug(debug, "Clearing ranking data from sources...")
@@ -50,14 +99,14 @@ def clear_data():
     set_source_string(RankingsSrc.HeaderEvent, " ")
     set_source_string(RankingsSrc.HeaderListType, " ")
 
+    banks = (BANK_A, BANK_B) if _double_buffered() else (front_bank(),)
     for i in range(RANKINGS_MAX_LINES):
-        set_source_visibility(f"{RankingsSrc.LinePrefix}{i+1}", False)
-        set_source_visibility(f"{RankingsSrc.BoardLinePrefix}{i+1}", False)
+        for bank in banks:
+            _set_line_visible(i + 1, False, bank)
+            for name in line_source_names(i + 1, bank):
+                set_source_string(name, " ")
 
-        set_source_string(f"{RankingsSrc.RankPrefix}{i+1}", " ")
-        set_source_string(f"{RankingsSrc.NamePrefix}{i+1}", " ")
-        set_source_string(f"{RankingsSrc.TeamPrefix}{i+1}", " ")
-        set_source_string(f"{RankingsSrc.ScorePrefix}{i+1}", " ")
+    _invalidate_prefetch()
 
 
 def dvov_rank_set_mode(eventMode: EventMode):
@@ -68,10 +117,7 @@ def dvov_rank_set_mode(eventMode: EventMode):
     reset_pagination()
 
 
-def dvov_rank_set_event_ab(event_is_a: bool):
-    global event_ab_is_a
-    event_ab_is_a = event_is_a
-
+def dvov_rank_clear_event():
     # event changed, all data is invalid
     ranking_rec_working_copy.clear()
     clear_data()
@@ -94,6 +140,8 @@ def sort_list():
 def dvov_rank_set_divers(records: List[DiveListRecord], event_record: DiveMessage):
     global ranking_rec_working_copy, rankings_event_rec_working_copy
 
+    previous_records = ranking_rec_working_copy
+
     if show_guests:
         ranking_rec_working_copy = records.copy()
     else:
@@ -104,20 +152,77 @@ def dvov_rank_set_divers(records: List[DiveListRecord], event_record: DiveMessag
                     ranking_rec_working_copy.append(record)
             except (TypeError, ValueError):
                 continue
+
+    # Same event still being cycled - update only what changed on displayed page, keep page position
+    same_event = (
+        _timer_active and previous_records and ranking_rec_working_copy and
+        rankings_event_rec_working_copy.meet_title == event_record.meet_title and
+        rankings_event_rec_working_copy.long_event_name == event_record.long_event_name
+    )
     rankings_event_rec_working_copy = event_record
 
+    if same_event:
+        sort_list()
+        diff = diff_rankings(previous_records, ranking_rec_working_copy)
+        log_info_if_debug(debug, "Set Divers event: %d divers, %s.", len(ranking_rec_working_copy), diff)
+
+        if not diff.is_empty():
+            update_displayed_page(previous_records)
+            _invalidate_prefetch()
+        return
+
     clear_data()
     reset_pagination()
 
-    log_info_if_debug(debug, f"Set Divers event: Got ranking records for {len(ranking_rec_working_copy)} divers.")
+    log_info_if_debug(debug, "Set Divers event: Got ranking records for %d divers.", len(ranking_rec_working_copy))
 
 
-def show_rank_line (diver: DiveListRecord, disp_no: int):
-    # use rank or start position based on mode
+def update_displayed_page(previous_records: List[DiveListRecord]):
+    """
+    Repaints lines of currently displayed page which show different record than before the update.
+    Current page is kept (or last page is shown, if list got shorter).
+    """
+    global _current_page, _total_pages
+
+    _total_pages = (len(ranking_rec_working_copy) + rankings_no_lines_per_page - 1) // rankings_no_lines_per_page
+    _current_page = min(_current_page, _total_pages - 1)
+
+    start = _current_page * rankings_no_lines_per_page
+    old_chunk = previous_records[start:start + rankings_no_lines_per_page]
+    new_chunk = ranking_rec_working_copy[start:start + rankings_no_lines_per_page]
+
+    repainted = 0
+    for i in range(rankings_no_lines_per_page):
+        disp_no = i + 1
+        if i < len(new_chunk):
+            if i >= len(old_chunk) or old_chunk[i] != new_chunk[i]:
+                show_rank_line(new_chunk[i], disp_no)
+                repainted += 1
+        elif i < len(old_chunk):
+            _set_line_visible(disp_no, False)
+            repainted += 1
+
+    log_info_if_debug(debug, "Page %d of %d: %d lines repainted", _current_page + 1, _total_pages, repainted)
+
+
+def _shows_score() -> bool:
+    return EventMode.Rankings == mode or EventMode.Event == mode
+
 
-    # Determine what the new values should be
+def _double_buffered() -> bool:
+    return rankings_double_buffer and has_back_bank()
+
+
+def _set_line_visible(disp_no: int, visible: bool, bank: Union[int, None] = None):
+    for name in line_group_names(disp_no, front_bank() if bank is None else bank):
+        set_source_visibility(name, visible)
+
+
+def rank_line_values(diver: DiveListRecord) -> Tuple[str, str, str, str, bool]:
+    """(rank, diver name, club code, score, is guest) shown in the line, depends on mode."""
+    # use rank or start position based on mode
     is_guest = False
-    if EventMode.Rankings == mode or EventMode.Event == mode:
+    if _shows_score():
         rank_value = int(diver.rank)
         if rank_value < 0 and show_guests:
             rank = str(abs(rank_value))
@@ -127,66 +232,52 @@ def show_rank_line (diver: DiveListRecord, disp_no: int):
         else:
             rank = "G"
         score = diver.points
-
-        # Show points background and points for rankings/event mode
-        set_source_visibility(RankingsSrc.ScoreBackground, True)
-        set_source_visibility(f"{RankingsSrc.ScorePrefix}{disp_no}", True)
     else:
         rank = str(diver.start_position)
         score = " "
 
-        # Hide points background and points for start list mode
-        set_source_visibility(RankingsSrc.ScoreBackground, False)
-        set_source_visibility(f"{RankingsSrc.ScorePrefix}{disp_no}", False)
+    return rank, diver.diver, diver.club_code, score, is_guest
 
 
-    diver_name = diver.diver
-    club_code = diver.club_code
+def _line_differs(names: Tuple[str, str, str, str], values: Tuple[str, str, str, str, bool]) -> bool:
+    # compare with current values of sources
+    return any(get_source_string(name) != value for name, value in zip(names, values[:4]))
 
-    # Get current values from sources
-    prev_rank = get_source_string(f"{RankingsSrc.RankPrefix}{disp_no}")
-    prev_diver_name = get_source_string(f"{RankingsSrc.NamePrefix}{disp_no}")
-    prev_club_code = get_source_string(f"{RankingsSrc.TeamPrefix}{disp_no}")
-    prev_score = get_source_string(f"{RankingsSrc.ScorePrefix}{disp_no}")
 
-    # Check if any data changed
-    data_changed = (
-        rank != prev_rank or
-        diver_name != prev_diver_name or
-        club_code != prev_club_code or
-        score != prev_score
-    )
+def _write_rank_line(names: Tuple[str, str, str, str], values: Tuple[str, str, str, str, bool]):
+    for name, value in zip(names, values[:4]):
+        set_source_string(name, value)
+
+    # Set text color to grey for guest divers, normal color (white) for regular divers
+    color = 0x9a9a9a if values[4] else 0xffffff
+    for name in names:
+        set_color_source_color(name, color)
+
+
+def _show_line_sources(names: Tuple[str, str, str, str], show_score: bool):
+    for name in names[:3]:
+        set_source_visibility(name, True)
+    set_source_visibility(names[3], show_score)
+
+
+def show_rank_line (diver: DiveListRecord, disp_no: int):
+    names = line_source_names(disp_no, front_bank())
+    values = rank_line_values(diver)
+
+    # Show points background and points for rankings/event mode, hide them for start list mode
+    show_score = _shows_score()
+    set_source_visibility(RankingsSrc.ScoreBackground, show_score)
+    _show_line_sources(names, show_score)
 
     # Only update if data changed
-    if data_changed:
-        set_source_visibility(f"{RankingsSrc.LinePrefix}{disp_no}", False)
-        set_source_visibility(f"{RankingsSrc.BoardLinePrefix}{disp_no}", False)
-
-        set_source_string(f"{RankingsSrc.RankPrefix}{disp_no}", rank)
-        set_source_string(f"{RankingsSrc.NamePrefix}{disp_no}", diver_name)
-        set_source_string(f"{RankingsSrc.TeamPrefix}{disp_no}", club_code)
-        set_source_string(f"{RankingsSrc.ScorePrefix}{disp_no}", score)
-
-        # Set text color to grey for guest divers, normal color for regular divers
-        if is_guest:
-            grey_color = 0x9a9a9a
-            set_color_source_color(f"{RankingsSrc.RankPrefix}{disp_no}", grey_color)
-            set_color_source_color(f"{RankingsSrc.NamePrefix}{disp_no}", grey_color)
-            set_color_source_color(f"{RankingsSrc.TeamPrefix}{disp_no}", grey_color)
-            set_color_source_color(f"{RankingsSrc.ScorePrefix}{disp_no}", grey_color)
-        else:
-            # Reset to default color (white) for non-guest divers
-            white_color = 0xffffff
-            set_color_source_color(f"{RankingsSrc.RankPrefix}{disp_no}", white_color)
-            set_color_source_color(f"{RankingsSrc.NamePrefix}{disp_no}", white_color)
-            set_color_source_color(f"{RankingsSrc.TeamPrefix}{disp_no}", white_color)
-            set_color_source_color(f"{RankingsSrc.ScorePrefix}{disp_no}", white_color)
+    if _line_differs(names, values):
+        _set_line_visible(disp_no, False)
+        _write_rank_line(names, values)
 
     # set sources to visible even if data didn't change - e.g. first page contained 8 divers, next 3,
     # so when we get back to first page, last 5 lines will have unchanged data but will be invisible
-    if diver_name.strip() != "":  # just a precaution to avoid showing empty lines if diver name is empty (it shouldn't be, but just in case)
-        set_source_visibility(f"{RankingsSrc.LinePrefix}{disp_no}", True)
-        set_source_visibility(f"{RankingsSrc.BoardLinePrefix}{disp_no}", True)
+    if diver.diver.strip() != "":  # just a precaution to avoid showing empty lines if diver name is empty (it shouldn't be, but just in case)
+        _set_line_visible(disp_no, True)
 
 # ---------------------------
 # Pagination (show each page)
@@ -204,9 +295,83 @@ def show_page(ranking_rec: List[DiveListRecord], rankings_event_rec: DiveMessage
             diver = chunk[i]
             show_rank_line(diver, disp_no)
         else:
-            log_info_if_debug(debug, f"Clearing line {i+1} for page {page_index+1} (line not used on this page)")
-            set_source_visibility(f"{RankingsSrc.LinePrefix}{i + 1}", False)
-            set_source_visibility(f"{RankingsSrc.BoardLinePrefix}{i + 1}", False)
+            log_info_if_debug(debug, "Clearing line %d for page %d (line not used on this page)", i + 1, page_index + 1)
+            _set_line_visible(disp_no, False)
+
+
+# ---------------------------
+# Double buffering - next page is written into hidden bank of lines during display period,
+# page flip only switches visibility of the two banks
+# ---------------------------
+def _page_chunk(page_index: int) -> List[DiveListRecord]:
+    start = page_index * rankings_no_lines_per_page
+    return ranking_rec_working_copy[start:start + rankings_no_lines_per_page]
+
+
+def _write_back_page(page_index: int):
+    global _prefetched_page
+
+    bank = back_bank()
+    chunk = _page_chunk(page_index)
+    show_score = _shows_score()
+    with batch_updates():
+        for i in range(rankings_no_lines_per_page):
+            disp_no = i + 1
+            if i >= len(chunk):
+                _set_line_visible(disp_no, False, bank)
+                continue
+            names = line_source_names(disp_no, bank)
+            values = rank_line_values(chunk[i])
+            _show_line_sources(names, show_score)
+            if _line_differs(names, values):
+                _write_rank_line(names, values)
+            _set_line_visible(disp_no, chunk[i].diver.strip() != "", bank)
+    _prefetched_page = page_index
+
+
+@traced_operation("page prefetch")
+def _prefetch_next_page():
+    global _prefetch_armed
+
+    obs.timer_remove(_prefetch_next_page)
+    _prefetch_armed = False
+
+    if not (_timer_active and _double_buffered() and _total_pages > 1):
+        return
+
+    next_page = (_current_page + 1) % _total_pages
+    if _prefetched_page != next_page:
+        _write_back_page(next_page)
+        log_info_if_debug(debug, "Prefetched page %d of %d", next_page + 1, _total_pages)
+
+
+def _arm_prefetch():
+    global _prefetch_armed
+
+    if _prefetch_armed:
+        obs.timer_remove(_prefetch_next_page)
+        _prefetch_armed = False
+    if not (_timer_active and _double_buffered() and _total_pages > 1):
+        return
+
+    obs.timer_add(_prefetch_next_page, min(RANKINGS_PREFETCH_DELAY_MS, int(rankings_page_display_duration * 500)))
+    _prefetch_armed = True
+
+
+def _invalidate_prefetch():
+    global _prefetched_page
+    _prefetched_page = None
+    _arm_prefetch()
+
+
+def _show_bank_a():
+    # double buffering turned off - current page is shown by bank A again
+    if front_bank() == BANK_A:
+        return
+    with batch_updates():
+        if _current_page < _total_pages:
+            _write_back_page(_current_page)
+        show_bank(BANK_A)
 
 # ---------------------------
 # Pagination control
@@ -221,11 +386,13 @@ def start_pagination():
     log_info_if_debug(debug, "Starting pagination...")
 
     sort_list()
+    if has_back_bank():
+        show_bank(front_bank())  # collection may have been saved with the other bank shown
 
     _current_page = 0
     _total_pages = (len(ranking_rec_working_copy) + rankings_no_lines_per_page - 1) // rankings_no_lines_per_page
 
-    log_info_if_debug(debug, f"Starting continuous cycling: {_total_pages} pages")
+    log_info_if_debug(debug, "Starting continuous cycling: %d pages", _total_pages)
 
     show_page(ranking_rec_working_copy, rankings_event_rec_working_copy, _current_page)
 
@@ -234,7 +401,10 @@ def start_pagination():
         obs.timer_add(_advance_page, int(rankings_page_display_duration * 1000))
         _timer_active = True
 
+    _invalidate_prefetch()
 
+
+@traced_operation("page flip")
 def _advance_page():
     global _current_page, _total_pages, ranking_rec_working_copy, rankings_event_rec_working_copy
 
@@ -254,9 +424,20 @@ def _advance_page():
             log_info_if_debug(debug, "No divers loaded after reload.")
 
     _current_page = next_page
-    log_info_if_debug(debug, f"Advancing to page {_current_page + 1} of {_total_pages}")
+    log_info_if_debug(debug, "Advancing to page %d of %d", _current_page + 1, _total_pages)
+
+    if _double_buffered() and _total_pages > 1:
+        # page is already in hidden bank (unless data changed after prefetch) - swap banks
+        with batch_updates():
+            if _prefetched_page != _current_page:
+                _write_back_page(_current_page)
+            swap_banks()
+        _invalidate_prefetch()
+        return
 
-    show_page(ranking_rec_working_copy, rankings_event_rec_working_copy, _current_page)
+    # whole page is applied at once, lines are not repainted one by one
+    with batch_updates():
+        show_page(ranking_rec_working_copy, rankings_event_rec_working_copy, _current_page)
 
 
 def stop_pagination():
@@ -264,6 +445,7 @@ def stop_pagination():
     if _timer_active:
         obs.timer_remove(_advance_page)
         _timer_active = False
+    _arm_prefetch()  # removes pending prefetch
     log_info_if_debug(debug, "Stopped pagination.")
 
 
@@ -295,29 +477,61 @@ def dvov_rank_add_properties(props):
     obs.obs_properties_add_int(props, "rnk_num_per_page", "Rankings: Divers per page", 1, RANKINGS_MAX_LINES, 1)
     obs.obs_properties_add_int(props, "rnk_display_duration", "Rankings: Seconds per page", 1, 20, 1)
     obs.obs_properties_add_bool(props, "rnk_show_guests", "Rankings: Show Guests")
+    obs.obs_properties_add_bool(props, "rnk_double_buffer", "Rankings: Prepare next page in background")
 
 
 def dvov_rank_script_defaults(settings):
     obs.obs_data_set_default_int(settings, "rnk_num_per_page", 8)
     obs.obs_data_set_default_int(settings, "rnk_display_duration", 10)
     obs.obs_data_set_default_bool(settings, "rnk_show_guests", False)
+    obs.obs_data_set_default_bool(settings, "rnk_double_buffer", True)
 
 
 def dvov_rank_script_update(settings):
     # Rankings settings
-    global debug, rankings_no_lines_per_page, rankings_page_display_duration, root_dir, show_guests
+    global debug, rankings_no_lines_per_page, rankings_page_display_duration, root_dir, show_guests, rankings_double_buffer
 
     debug = obs.obs_data_get_bool(settings, "debug")
     rankings_no_lines_per_page = obs.obs_data_get_int(settings, "rnk_num_per_page")
     rankings_page_display_duration = obs.obs_data_get_int(settings, "rnk_display_duration")
     show_guests = obs.obs_data_get_bool(settings, "rnk_show_guests")
+    rankings_double_buffer = obs.obs_data_get_bool(settings, "rnk_double_buffer")
+    rankings_banks.debug = debug
+
+    if not rankings_double_buffer:
+        _show_bank_a()
+        _invalidate_prefetch()
 
     # Set Header picture source files
     root_dir = obs.obs_data_get_string(settings, "rootDir")
 
 
+def _on_frontend_event(event):
+    if event in (obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGING,
+                 obs.OBS_FRONTEND_EVENT_EXIT):
+        # banks of the next collection are looked up again
+        forget_banks()
+        _invalidate_prefetch()
+
+
 def dvov_rank_script_load(settings):
     dvov_rank_script_update(settings)
+    obs.obs_frontend_add_event_callback(_on_frontend_event)
+
+
+def dvov_rank_script_unload():
+    obs.obs_frontend_remove_event_callback(_on_frontend_event)
+    forget_banks()
+
+
+def dvov_rank_script_save(settings):
+    # bindings are loaded from script settings by dvov_rank_register_hotkeys
+    for setting_name, hotkey_id in (("rankings.start", _hotkey_start_id), ("rankings.stop", _hotkey_stop_id)):
+        if hotkey_id is None:
+            continue
+        arr = obs.obs_hotkey_save(hotkey_id)
+        obs.obs_data_set_array(settings, setting_name, arr)
+        obs.obs_data_array_release(arr)
 
 
 def dvov_rank_register_hotkeys(settings):
@@ -326,14 +540,14 @@ def dvov_rank_register_hotkeys(settings):
 
     # Register start hotkey
     _hotkey_start_id = obs.obs_hotkey_register_frontend(
-        "rankings.start", "Start Rankings Cycle", on_rankings_hotkey_start)
+        "rankings.start", "Start Rankings Cycle", batched(on_rankings_hotkey_start))
     arr = obs.obs_data_get_array(settings, "rankings.start")
     obs.obs_hotkey_load(_hotkey_start_id, arr)
     obs.obs_data_array_release(arr)
 
     # Register stop hotkey
     _hotkey_stop_id = obs.obs_hotkey_register_frontend(
-        "rankings.stop", "Stop Rankings Cycle", on_rankings_hotkey_stop)
+        "rankings.stop", "Stop Rankings Cycle", batched(on_rankings_hotkey_stop))
     arr = obs.obs_data_get_array(settings, "rankings.stop")
     obs.obs_hotkey_load(_hotkey_stop_id, arr)
     obs.obs_data_array_release(arr)
\ No newline at end of file
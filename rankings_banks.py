@@ -0,0 +1,102 @@
+'''
+Two banks of rankings lines (double buffering of rankings pages).
+
+Both banks are in the scene collection. Bank A are the ListLine N / BoardListLine N groups with the Rnk_Rank/Rnk_Name/
+Rnk_Team/Rnk_Score sources, in nested scenes Rnk_Lines A (item of OverlayRankings) and Rnk_BoardLines A (item of
+BoardRankings). Bank B is a copy of them with " [B]" suffix in the names of groups and text sources, same layout, in
+Rnk_Lines B and Rnk_BoardLines B - sibling items of the bank A scenes. Gradients and score background are shared.
+While one bank is shown, next page is written into the other one. Page flip shows the nested scene of the back bank
+and hides the one of the front bank: two obs_sceneitem_set_visible calls per parent scene, no source updates.
+
+Nothing is created at runtime, whatever OBS saves is a valid state (the bank shown is set again when rankings start).
+Collections without the bank scenes (imported before they were added) show pages with bank A lines only.
+'''
+import functools
+from typing import Tuple, Union
+
+from enums import RankingsSrc
+from obs_utils import get_scene_items, log_info_if_debug, set_source_visibility
+
+RANKINGS_BANK_LINES = 10  # lines in the scene (rankings.RANKINGS_MAX_LINES)
+RANKINGS_BANK_B_SUFFIX = " [B]"
+LINE_TEXT_PREFIXES = (RankingsSrc.RankPrefix, RankingsSrc.NamePrefix, RankingsSrc.TeamPrefix, RankingsSrc.ScorePrefix)
+LINE_GROUP_PREFIXES = (RankingsSrc.LinePrefix, RankingsSrc.BoardLinePrefix)
+
+BANK_A = 0
+BANK_B = 1
+BANK_SCENES = {
+    BANK_A: (RankingsSrc.LinesA, RankingsSrc.BoardLinesA),
+    BANK_B: (RankingsSrc.LinesB, RankingsSrc.BoardLinesB),
+}
+
+debug = False
+
+_front_bank = BANK_A
+_back_bank: Union[bool, None] = None  # bank B in scene collection, None - not looked up since collection changed
+
+
+def _suffix(bank: int) -> str:
+    return RANKINGS_BANK_B_SUFFIX if bank == BANK_B else ""
+
+
+@functools.lru_cache(maxsize=None)
+def line_source_names(disp_no: int, bank: int) -> Tuple[str, str, str, str]:
+    """(rank, name, team, score) text sources of line disp_no in bank."""
+    return tuple(f"{prefix}{disp_no}{_suffix(bank)}" for prefix in LINE_TEXT_PREFIXES)
+
+
+@functools.lru_cache(maxsize=None)
+def line_group_names(disp_no: int, bank: int) -> Tuple[str, str]:
+    """(overlay, board) groups of line disp_no in bank."""
+    return tuple(f"{prefix}{disp_no}{_suffix(bank)}" for prefix in LINE_GROUP_PREFIXES)
+
+
+def front_bank() -> int:
+    return _front_bank
+
+
+def back_bank() -> int:
+    return BANK_B if _front_bank == BANK_A else BANK_A
+
+
+def has_back_bank() -> bool:
+    """
+    True if the scene collection has both bank scenes and all bank B lines.
+    """
+    global _back_bank
+
+    if _back_bank is None:
+        names = [*BANK_SCENES[BANK_A], *BANK_SCENES[BANK_B]]
+        for disp_no in range(1, RANKINGS_BANK_LINES + 1):
+            names.extend(line_group_names(disp_no, BANK_B))
+            names.extend(line_source_names(disp_no, BANK_B))
+        missing = [name for name in names if not get_scene_items(name)]
+        _back_bank = not missing
+        log_info_if_debug(debug, "Rankings bank B: %s", f"no {missing[0]} source in scenes, single bank" if missing else "found")
+    return _back_bank
+
+
+def show_bank(bank: int):
+    """
+    Shows lines of bank and hides lines of the other one, bank becomes front bank.
+    """
+    global _front_bank
+
+    other = BANK_B if bank == BANK_A else BANK_A
+    for name in BANK_SCENES[other]:
+        set_source_visibility(name, False)
+    for name in BANK_SCENES[bank]:
+        set_source_visibility(name, True)
+    _front_bank = bank
+
+
+def swap_banks():
+    show_bank(back_bank())
+
+
+def forget_banks():
+    # scene collection changes or script unloads - bank B is looked up again, bank A shown when rankings start
+    global _back_bank, _front_bank
+
+    _back_bank = None
+    _front_bank = BANK_A
@@ -0,0 +1,138 @@
+'''
+Sampling profiler of the script inside OBS, started/stopped by hotkey ("Start/Stop Profiling").
+
+While running, sampler thread looks at Python stacks of all threads every PROFILE_SAMPLE_INTERVAL_S. OBS threads only
+have Python stack while they run script code (timer callbacks, hotkey handlers, frontend events), so idle time is not
+sampled; fetch threads (Update.txt) are sampled while they live. Script threads that mostly wait on sockets/pipes
+(PROFILE_IDLE_THREADS) are skipped. Sample whose innermost frame is at a blocking call (socket receive/connect, select,
+sleep, lock wait - PROFILE_IDLE_CALLS, matched in the source line) gets "[idle]" as its leaf: C calls have no Python
+frame, so time a fetch thread waits for DiveRecorder would show as hot code of the function waiting.
+On stop, samples are written to <root dir>/profile_YYYYmmdd_HHMMSS.collapsed in collapsed stack format (one line per
+distinct stack: "thread;outer function;...;inner function count"), ready for flamegraph.pl or speedscope.
+When profiler is off there is no sampler thread and nothing is hooked.
+'''
+import typing
+
+if typing.TYPE_CHECKING:
+    import _obspython as obs  # full symbol set for IDE
+else:
+    import obspython as obs   # real runtime module
+
+import linecache
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Tuple, Union
+
+PROFILE_SAMPLE_INTERVAL_S = 0.005
+PROFILE_FILE_EXT = ".collapsed"
+PROFILE_THREAD_NAME = "DiveRecorder profiler"
+PROFILE_IDLE_THREADS = (PROFILE_THREAD_NAME, "DiveRecorder UDP receiver", "Mirror ",
+                        "DiveRecorder log writer")
+PROFILE_IDLE_CALLS = ("recv(", "recv_into(", "recvfrom(", "accept(", "connect(", "create_connection(", "select(", "poll(",
+                      "sleep(", "acquire(")
+PROFILE_IDLE_LABEL = "[idle]"
+
+root_dir = ""
+
+_sampler: Union[threading.Thread, None] = None
+_stop: Union[threading.Event, None] = None
+_samples: Counter = Counter()
+_started = 0.0
+_waiting_lines: Dict[Tuple[str, int], bool] = {}  # (file, line) -> line makes blocking call
+
+
+def is_profiling() -> bool:
+    return _sampler is not None
+
+
+def start_profiling():
+    global _sampler, _stop, _started
+    if _sampler is not None:
+        return
+
+    _samples.clear()
+    _started = time.time()
+    _stop = threading.Event()
+    _sampler = threading.Thread(target=_sampler_main, args=(_stop,), name=PROFILE_THREAD_NAME)
+    _sampler.daemon = True  # thread will exit when OBS exits
+    _sampler.start()
+    obs.script_log(obs.LOG_INFO, "Profiling started.")
+
+
+def stop_profiling() -> str:
+    """Stops profiling, writes collected samples, returns path of the profile file ("" if nothing written)."""
+    global _sampler, _stop
+    if _sampler is None:
+        return ""
+
+    _stop.set()
+    _sampler.join()
+    _sampler = None
+    _stop = None
+
+    if not _samples:
+        obs.script_log(obs.LOG_INFO, "Profiling stopped, no script code was running.")
+        return ""
+
+    path = os.path.join(root_dir, time.strftime("profile_%Y%m%d_%H%M%S", time.localtime(_started)) + PROFILE_FILE_EXT)
+    try:
+        with open(path, "w", encoding="utf-8") as profile_file:
+            for stack, count in _samples.most_common():
+                profile_file.write(f"{stack} {count}\n")
+    except OSError as e:
+        obs.script_log(obs.LOG_ERROR, f"Failed to write profile {path}: {e}")
+        return ""
+
+    obs.script_log(obs.LOG_INFO, f"Profiling stopped: {sum(_samples.values())} samples ({time.time() - _started:.0f} s) written to {path}")
+    _samples.clear()
+    return path
+
+
+def toggle_profiling():
+    if is_profiling():
+        stop_profiling()
+    else:
+        start_profiling()
+
+
+def _sampler_main(stop: threading.Event):
+    own_ident = threading.get_ident()
+    while not stop.wait(PROFILE_SAMPLE_INTERVAL_S):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            name = names.get(ident, "OBS")
+            if ident == own_ident or name.startswith(PROFILE_IDLE_THREADS):
+                continue
+            _samples[_collapse(name, frame)] += 1
+
+
+def _is_waiting(frame) -> bool:
+    key = (frame.f_code.co_filename, frame.f_lineno)
+    waiting = _waiting_lines.get(key)
+    if waiting is None:
+        line = linecache.getline(*key)
+        waiting = _waiting_lines[key] = any(call in line for call in PROFILE_IDLE_CALLS)
+    return waiting
+
+
+def _collapse(thread_name: str, frame) -> str:
+    stack = [PROFILE_IDLE_LABEL] if _is_waiting(frame) else []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    stack.append(thread_name)
+    return ";".join(reversed(stack))
+
+
+# ---------- OBS script lifecycle ----------
+def dvov_profiler_script_update(settings):
+    global root_dir
+    root_dir = obs.obs_data_get_string(settings, "rootDir")
+
+
+def dvov_profiler_script_unload():
+    stop_profiling()
@@ -0,0 +1,64 @@
+'''
+Compiled source-binding plans: declarative tables of which message field goes to which OBS source, compiled into flat
+lists of writes.
+
+Each binding (table row) says when it applies (predicate over plan key, e.g. synchro event with awards), target source,
+value and writer (text by default, see obs_utils write_source_*). Value is read from the message by getter - field()
+with optional formatter, or any function of the message - or is static for the whole plan (fixed(), computed from the
+key when compiled, e.g. judge group visibility for the judge count).
+compile_plan() keeps the rows applying to the key and namespaces source names (obs_utils.source_namespace), so
+applying the plan is a loop over precomputed (writer, source name, getter) and (writer, source name, value) triples.
+Plans are compiled once per key by their user (see overlay_data.py). Used on main thread only.
+'''
+from operator import attrgetter
+from typing import Callable, Hashable, List, NamedTuple, Tuple, Union
+
+from obs_utils import namespaced_source_name, write_source_string
+
+
+class Binding(NamedTuple):
+    when: Callable[[Hashable], bool]        # plan key -> binding applies
+    source: str                             # source name (enums.py), namespaced when compiled
+    value: Callable                         # message -> value, static: plan key -> value
+    write: Callable[[str, object], None] = write_source_string
+    static: bool = False
+
+
+class SourcePlan(NamedTuple):
+    message_writes: List[Tuple[Callable[[str, object], None], str, Callable]]
+    static_writes: List[Tuple[Callable[[str, object], None], str, object]]
+
+
+def field(name: str, formatter: Union[Callable[[str], object], None] = None) -> Callable:
+    """Getter of message field, formatted."""
+    get = attrgetter(name)
+    if formatter is None:
+        return get
+    return lambda message: formatter(get(message))
+
+
+def fixed(value) -> Callable:
+    """Static value, the same for all keys."""
+    return lambda key: value
+
+
+def compile_plan(bindings: List[Binding], key: Hashable) -> SourcePlan:
+    """Flat plan of bindings applying to key, for current source namespace."""
+    plan = SourcePlan([], [])
+    for binding in bindings:
+        if not binding.when(key):
+            continue
+        source_name = namespaced_source_name(binding.source)
+        if binding.static:
+            plan.static_writes.append((binding.write, source_name, binding.value(key)))
+        else:
+            plan.message_writes.append((binding.write, source_name, binding.value))
+    return plan
+
+
+def apply_plan(plan: SourcePlan, message):
+    # message values first, static ones (mostly visibility) after - groups are shown with their new contents
+    for write, source_name, get_value in plan.message_writes:
+        write(source_name, get_value(message))
+    for write, source_name, value in plan.static_writes:
+        write(source_name, value)
@@ -2,6 +2,7 @@
 Module for managing state of overlays and reflecting state in Status dock
 '''
 import typing
+import time
 
 from rankings import dvov_rank_set_mode
 
@@ -10,9 +11,9 @@ if typing.TYPE_CHECKING:
 else:
     import obspython as obs   # real runtime module
 
-from typing import Union
+from typing import Callable, Union
 
-from obs_utils import set_source_string, set_color_source_alpha, set_source_visibility, log_info_if_debug
+from obs_utils import set_source_string, set_color_source_alpha, set_source_visibility, log_info_if_debug, clear_write_cache, batched
 from enums import (
     EventMode,
     DiveInfoGrp,
@@ -36,8 +37,12 @@ from enums import (
     TopOverlayGrp,
 )
 
-from overlay_data import dvov_act_single_event_referee_update, dvov_act_set_event_ab, dvov_act_set_display_enabled
-from rankings import dvov_rank_set_event_ab
+from overlay_data import dvov_act_single_event_referee_update, dvov_act_clear_event, dvov_act_set_display_enabled, dvov_act_set_event_complete
+from rankings import dvov_rank_clear_event, dvov_rank_set_divers
+from event_state import EVENT_A, EVENT_B, event_metrics_summary, get_selected_event_state, is_selected_event, is_dual_mode, select_event, set_event_b_suffix
+from latency_trace import latency_summary
+from script_profiler import toggle_profiling
+from debug_log import dump_debug_log
 
 from datatypes import DiveMessage
 
@@ -48,7 +53,6 @@ referee_message: Union[DiveMessage, None] = None
 synchro = False
 
 top_overlay_pos_left: bool = True
-event_ab_is_a: bool = True
 overlays_enabled: bool = True
 event_complete: bool = False
 file_contents_changed: bool = True
@@ -60,6 +64,7 @@ def dvov_state_set_event_complete(is_event_complete: bool):
     global event_complete
     event_complete = is_event_complete
     set_color_source_alpha(PostEventGrp.EventCompleted, 255 if event_complete else 0)
+    update_tv_banner_hide_pause()
 
 
 # responsible for updating visibility/overlay removal logic
@@ -68,10 +73,8 @@ def dvov_state_on_message(msg: DiveMessage):
 
     referee_message = msg
 
-    # If not "our" event, ignore message (e.g. if Event A message received but currently displaying Event B)
-    if ((referee_message.event_ab == "a" and not event_ab_is_a)
-        or
-        (referee_message.event_ab == "b" and event_ab_is_a)):
+    # Overlays follow selected event only (other event is rendered only to its own board in dual mode)
+    if not is_selected_event(referee_message.event_ab):
         return
 
     # Judges count
@@ -80,7 +83,7 @@ def dvov_state_on_message(msg: DiveMessage):
     # Set hide timer only if pre-dive message was received
     # TODO: should not depend on j1 being set. Find a better way.
     if referee_message.j1.strip() == "":
-        obs.timer_add(lambda: tv_banner_remove_callback(), display_duration)
+        tv_banner_hide.arm(display_duration)
 
     synchro = (referee_message.synchro_event == "True")
 
@@ -133,6 +136,94 @@ def display_tv_banner():
         set_source_visibility(TVBannerGrp.GroupName, True)
         set_source_visibility(MainBoardGrp.GroupName, True)
 
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+# ---------- Auto-hide scheduler ----------
+# ------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+class DeadlineTimer:
+    """
+    Calls callback once, when the deadline passes. arm() moves the deadline (each pre-dive message), cancel() drops it,
+    pause() freezes remaining time until resume(). At most one OBS timer is alive: when the deadline moves later,
+    the running timer is left alone and re-added for the rest of the time when it fires.
+    """
+
+    def __init__(self, callback: Callable[[], None]):
+        self.callback = callback
+        self.deadline: Union[float, None] = None   # time.monotonic() seconds, None if not armed
+        self.paused_remaining: Union[float, None] = None  # seconds left when paused
+        self._timer_due: Union[float, None] = None  # when the OBS timer fires, None if no timer
+        self._on_timer = self._timer_callback      # same callable for timer_add and timer_remove
+
+    def arm(self, duration_ms: int):
+        if self.paused_remaining is not None:
+            self.paused_remaining = duration_ms / 1000
+            return
+        self.deadline = time.monotonic() + duration_ms / 1000
+        self._schedule()
+
+    def cancel(self):
+        self.deadline = None
+        self.paused_remaining = None
+        self._remove_timer()
+
+    def pause(self):
+        if self.paused_remaining is not None:
+            return
+        self.paused_remaining = self.remaining_ms() / 1000 if self.deadline is not None else 0.0
+        self.deadline = None
+        self._remove_timer()
+
+    def resume(self):
+        if self.paused_remaining is None:
+            return
+        remaining = self.paused_remaining
+        self.paused_remaining = None
+        if remaining > 0:
+            self.deadline = time.monotonic() + remaining
+            self._schedule()
+
+    @property
+    def paused(self) -> bool:
+        return self.paused_remaining is not None
+
+    def remaining_ms(self) -> Union[int, None]:
+        """Milliseconds until callback (frozen while paused), None if not armed."""
+        if self.paused_remaining is not None:
+            return round(self.paused_remaining * 1000) if self.paused_remaining > 0 else None
+        if self.deadline is None:
+            return None
+        return max(0, round((self.deadline - time.monotonic()) * 1000))
+
+    def _schedule(self):
+        if self._timer_due is not None and self._timer_due <= self.deadline:
+            return  # running timer fires first and re-adds itself for the rest
+        self._remove_timer()
+        self._add_timer(self.deadline - time.monotonic())
+
+    def _add_timer(self, delay: float):
+        delay_ms = max(1, round(delay * 1000))
+        self._timer_due = time.monotonic() + delay_ms / 1000
+        obs.timer_add(self._on_timer, delay_ms)
+
+    def _remove_timer(self):
+        if self._timer_due is not None:
+            obs.timer_remove(self._on_timer)
+            self._timer_due = None
+
+    def _timer_callback(self):
+        self._remove_timer()
+        if self.deadline is None:
+            return
+
+        remaining = self.deadline - time.monotonic()
+        if remaining > 0.001:
+            # deadline moved since the timer was added
+            self._add_timer(remaining)
+            return
+
+        self.deadline = None
+        self.callback()
+
+
 # ------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
 # ---------- Banner ----------
 # ------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
@@ -145,34 +236,26 @@ def remove_tv_banner():
     for name in [TopOverlayGrp.Left, TopOverlayGrp.Right, TVBannerGrp.GroupName, AwardsCommonGrp.GroupName, DiveInfoGrp.GroupName]:
         set_source_visibility(name, False)
 
-    # cancel any pending remove_TVbanner timer callback if exists:
-    try:
-        obs.remove_current_callback()
-    except Exception:
-        pass
-
 
+@batched
 def tv_banner_remove_callback():
     global tv_banner_removed
     log_info_if_debug(debug, "start tv_banner_remove_callback()")
 
-    if hide_disable and not event_complete:
-        tv_banner_removed = True
-        try:
-            obs.remove_current_callback()
-        except Exception:
-            pass
+    remove_tv_banner()
+    tv_banner_removed = True
 
-        log_info_if_debug(debug, "hide_disable set - skipping tv_banner_remove_callback unless event_complete true")
 
-        return
+tv_banner_hide = DeadlineTimer(tv_banner_remove_callback)
 
-    remove_tv_banner()
-    try:
-        obs.remove_current_callback()
-    except Exception:
-        pass
-    tv_banner_removed = True
+
+def update_tv_banner_hide_pause():
+    # with auto-hide disabled banner stays until event is complete
+    if hide_disable and not event_complete:
+        tv_banner_hide.pause()
+    else:
+        tv_banner_hide.resume()
+    log_info_if_debug(debug, "TV banner auto-hide paused=%s, remaining=%s ms", tv_banner_hide.paused, tv_banner_hide.remaining_ms())
 
 
 # ---------- Hotkey/callback functions ----------
@@ -209,6 +292,10 @@ def display_overlays(pressed):
 def redisplay_overlays(pressed):
     if not pressed:
         return
+
+    # force all values to be written again, in case sources were changed outside the script
+    clear_write_cache()
+
     # re-display top overlay
     display_overlays(True)
 
@@ -245,19 +332,46 @@ def set_event_a(is_a: bool):
     set_color_source_alpha(EventABGrp.AActive, 255 if is_a else 0)
     set_color_source_alpha(EventABGrp.BActive, 0 if is_a else 255)
 
-    dvov_act_set_event_ab(is_a)
-    dvov_rank_set_event_ab(is_a)
+    select_event(EVENT_A if is_a else EVENT_B)
+
+    # in dual mode regular sources always show event A, nothing to clear
+    if not is_dual_mode():
+        dvov_act_clear_event()
+        remove_overlays(True)
+    dvov_rank_clear_event()
+
+    show_selected_event_state()
+
 
-    remove_overlays(True)
+def show_selected_event_state():
+    # latest data of selected event (messages of not selected event are kept, see event_state.py)
+    global referee_message, synchro
+
+    state = get_selected_event_state()
+    referee_message = state.referee_message
+    synchro = referee_message is not None and referee_message.synchro_event == "True"
+    set_synchro_event(synchro)
+    dvov_state_set_event_complete(state.event_complete)
+
+    if state.referee_message is not None and not is_dual_mode():
+        dvov_act_single_event_referee_update(state.referee_message, state.synchro)
+        if state.event_complete:
+            dvov_act_set_event_complete(True)
+
+    if state.rankings_records and state.rankings_event_record is not None:
+        dvov_rank_set_divers(state.rankings_records, state.rankings_event_record)
 
 
 def toggle_event_a_or_b(pressed):
-    global event_ab_is_a
     if not pressed:
         return
-    event_ab_is_a = not event_ab_is_a
 
-    set_event_a(event_ab_is_a)
+    if is_dual_mode():
+        # both events are shown, rankings and auto-hide stay with event A (see event_state.py)
+        obs.script_log(obs.LOG_INFO, "Event B sources suffix is set: both events are shown, F4 does not switch events.")
+        return
+
+    set_event_a(not is_selected_event(EVENT_A))
 
 
 def set_autohide_enabled(isEnabled):
@@ -282,6 +396,7 @@ def toggle_disable_of_autohide(pressed):
     obs.obs_data_set_bool(script_settings, "hide_disable", hide_disable)
 
     set_autohide_enabled(not hide_disable)
+    update_tv_banner_hide_pause()
 
 def toggle_top_overlay_position(pressed):
     global top_overlay_pos_left
@@ -297,6 +412,28 @@ def toggle_top_overlay_position(pressed):
         obs.script_log(obs.LOG_INFO, "Toggle single event position.")
 
 
+def log_latency_summary(pressed):
+    if not pressed:
+        return
+
+    for line in event_metrics_summary() + latency_summary() or ["Latency: no messages traced yet."]:
+        obs.script_log(obs.LOG_INFO, line)
+
+
+def toggle_script_profiling(pressed):
+    if not pressed:
+        return
+
+    toggle_profiling()
+
+
+def dump_script_debug_log(pressed):
+    if not pressed:
+        return
+
+    dump_debug_log("hotkey")
+
+
 def set_event_mode (eventMode: EventMode):
     set_color_source_alpha(PreEventGrp.Active, 0)
     set_color_source_alpha(InProgrGrp.Active, 0)
@@ -337,11 +474,13 @@ def set_event_rankings_mode(pressed):
 
 hotkey_handles = {}
 _registered = False
+HOTKEYS_SAVED = ("htk_11", "htk_12", "htk_13")  # no default key, binding is saved with script settings
 
-def dvov_status_register_hotkeys_force():
+def dvov_status_register_hotkeys_force(settings):
     """
     Register hotkeys and force default F1..F12 bindings using a JSON blob,
     similar to your working Lua code.
+    Hotkeys without default key keep the binding user assigned (saved in script settings by dvov_state_script_save).
     """
     global hotkey_handles, _registered
     if _registered:
@@ -377,6 +516,9 @@ def dvov_status_register_hotkeys_force():
             "htk_8":  ("Permanently Remove All Overlays",           toggle_display_disable),
             "htk_9":  ("Disable Auto-hide of Overlays",             toggle_disable_of_autohide),
             "htk_10": ("Toggle Event Overlay Position",             toggle_top_overlay_position),
+            "htk_11": ("Log Latency Summary",                       log_latency_summary),  # no default key
+            "htk_12": ("Start/Stop Profiling",                      toggle_script_profiling),  # no default key
+            "htk_13": ("Dump Debug Log",                            dump_script_debug_log),  # no default key
         }
 
     # Create an obs_data_t from JSON
@@ -388,10 +530,11 @@ def dvov_status_register_hotkeys_force():
     # Register hotkeys & load arrays from JSON
     for key_id, (desc, callback) in HK.items():
         try:
-            handle = obs.obs_hotkey_register_frontend(key_id, desc, callback)
+            # source writes made by hotkey handler are applied at once when it returns
+            handle = obs.obs_hotkey_register_frontend(key_id, desc, batched(callback, key_id))
             hotkey_handles[key_id] = handle
 
-            arr = obs.obs_data_get_array(data, key_id)
+            arr = obs.obs_data_get_array(data if key_id not in HOTKEYS_SAVED else settings, key_id)
             # Load default key array into the handle (this sets F1..F12)
             obs.obs_hotkey_load(handle, arr)
             obs.obs_data_array_release(arr)
@@ -404,10 +547,12 @@ def dvov_status_register_hotkeys_force():
 
 def dvov_state_script_properties(props):
     obs.obs_properties_add_int(props, "dinterval", "TVOverlay display period (ms)", 4000, 15000, 1000)
+    obs.obs_properties_add_text(props, "event_b_suffix", "Event B sources suffix (both events at once)", obs.OBS_TEXT_DEFAULT)
 
 
 def dvov_state_script_defaults(settings):
     obs.obs_data_set_default_int(settings, "dinterval", 5000)
+    obs.obs_data_set_default_string(settings, "event_b_suffix", "")
 
 
 # load state values from persisted script settings
@@ -420,6 +565,22 @@ def dvov_state_script_update(settings):
     top_overlay_pos_left = obs.obs_data_get_bool(settings, "single_event_pos_left")
     overlays_enabled = obs.obs_data_get_bool(settings, "overlays_enabled")
     hide_disable = obs.obs_data_get_bool(settings, "hide_disable")
+    update_tv_banner_hide_pause()
+
+    was_dual_mode = is_dual_mode()
+    set_event_b_suffix(obs.obs_data_get_string(settings, "event_b_suffix"))
+    if is_dual_mode() and not was_dual_mode:
+        set_event_a(True)  # rankings and auto-hide stay with event A in dual mode
+
+
+def dvov_state_script_save(settings):
+    for key_id in HOTKEYS_SAVED:
+        handle = hotkey_handles.get(key_id)
+        if handle is None:
+            continue
+        arr = obs.obs_hotkey_save(handle)
+        obs.obs_data_set_array(settings, key_id, arr)
+        obs.obs_data_array_release(arr)
 
 
 def dvov_state_script_load(settings):
@@ -433,4 +594,5 @@ def dvov_state_script_load(settings):
         obs.script_log(obs.LOG_INFO, f"dvov_state_script_load(): single_event_pos_left={top_overlay_pos_left}, overlays_enabled={overlays_enabled}, hide_disable={hide_disable}")
 
 
-
+def dvov_state_script_unload():
+    tv_banner_hide.cancel()
@@ -0,0 +1,481 @@
+'''
+Mirroring of overlay state to other OBS instances on LAN ("Mirror mode" setting), e.g. board PC which is not on
+DiveRecorder subnet.
+
+Primary instance publishes every source write the script applies (text, file, color and visibility, as in written
+values in obs_utils - only real changes) as versioned state. Follower connecting over TCP gets snapshot of the whole
+state, then one delta per applied batch (UDP tick, hotkey, rankings page). Follower does not process DiveRecorder
+messages, it applies received values to its sources by name - both instances must use the same scene collection.
+Scene switching (F1-F3) is not mirrored, each instance switches its own scenes.
+
+Frame: header (frame type, version, body length, send time - wall clock ns, for latency) + compact JSON body
+[[new source names], [[source index, property index, value], ...]]. Source names are sent once per connection
+(snapshot has all of them, delta only the ones added since previous delta) and referred to by index afterwards.
+Follower that does not keep up (send queue full) is disconnected and gets new snapshot when it reconnects.
+'''
+import typing
+
+if typing.TYPE_CHECKING:
+    import _obspython as obs  # full symbol set for IDE
+else:
+    import obspython as obs   # real runtime module
+
+import json
+import queue
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Set, Tuple, Union
+
+from obs_utils import (batch_updates, get_written_values, log_info_if_debug, set_source_value, set_source_visibility,
+                       set_write_listener, traced_operation)
+from latency_trace import percentiles
+
+MIRROR_MODE_OFF = "off"
+MIRROR_MODE_PRIMARY = "primary"
+MIRROR_MODE_FOLLOWER = "follower"
+
+MIRROR_PORT = 58095
+MIRROR_PROPS = ("text", "file", "color", "visible")  # property index in frames
+MIRROR_FRAME_SNAPSHOT = 1
+MIRROR_FRAME_DELTA = 2
+MIRROR_HEADER = struct.Struct("!BIIq")  # frame type, version, body length, send time ns
+MIRROR_MAX_QUEUED_FRAMES = 1000         # per follower
+MIRROR_ACCEPT_TIMEOUT = 0.5             # seconds, threads check stop request this often
+MIRROR_RECONNECT_INTERVAL = 2.0         # seconds
+MIRROR_APPLY_INTERVAL_MS = 1            # apply timer fires every OBS frame
+MIRROR_LATENCY_SAMPLES = 500
+
+debug = False
+mode = MIRROR_MODE_OFF
+host = ""
+port = MIRROR_PORT
+
+_stop = threading.Event()
+_threads: List[threading.Thread] = []
+
+# ---------------------------
+# Primary
+# ---------------------------
+_lock = threading.Lock()                        # guards published state, names and followers (accept thread snapshots them)
+_version = 0
+_published: Dict[Tuple[str, int], object] = {}  # (source name, property index) -> value
+_names: List[str] = []
+_name_ids: Dict[str, int] = {}
+_followers: List["_Follower"] = []
+_listen_sock: Union[socket.socket, None] = None
+
+# main thread only
+_actual: Dict[Tuple[str, str], object] = {}       # values written to OBS
+_overrides: Dict[str, Dict[str, object]] = {}     # source name -> values published instead of written ones
+_dirty: Set[Tuple[str, str]] = set()
+
+# stats
+_deltas_sent = 0
+_delta_bytes = 0
+_max_delta_bytes = 0
+
+
+class _Follower:
+    def __init__(self, sock: socket.socket, addr):
+        self.sock = sock
+        self.addr = addr
+        self.frames: "queue.Queue[Union[bytes, None]]" = queue.Queue(MIRROR_MAX_QUEUED_FRAMES)
+
+    def send(self, frame: bytes) -> bool:
+        try:
+            self.frames.put_nowait(frame)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self):
+        try:
+            self.frames.put_nowait(None)
+        except queue.Full:
+            pass
+        _close(self.sock)
+
+
+def mirror_override(source_name: str, values: Union[Dict[str, object], None]):
+    """
+    Publishes values of source instead of the ones written to it (None - written ones again). Used when what is shown
+    differs from source writes, e.g. flag shown by companion of the flag source (flag_pool.py).
+    """
+    if mode != MIRROR_MODE_PRIMARY:
+        return
+    previous = _overrides.pop(source_name, {})
+    if values:
+        _overrides[source_name] = dict(values)
+    for prop in set(previous) | set(values or ()):
+        _dirty.add((source_name, prop))
+
+
+def _on_write(source_name: str, prop: str, value):
+    _actual[(source_name, prop)] = value
+    _dirty.add((source_name, prop))
+
+
+def _on_applied():
+    global _version, _deltas_sent, _delta_bytes, _max_delta_bytes
+
+    if not _dirty:
+        return
+
+    changes = []
+    for source_name, prop in _dirty:
+        override = _overrides.get(source_name)
+        if override is not None and prop in override:
+            changes.append((source_name, prop, override[prop]))
+        elif (source_name, prop) in _actual:
+            changes.append((source_name, prop, _actual[(source_name, prop)]))
+    _dirty.clear()
+
+    with _lock:
+        new_names_from = len(_names)
+        entries = []
+        for source_name, prop, value in changes:
+            if prop not in MIRROR_PROPS:
+                continue
+            key = (source_name, MIRROR_PROPS.index(prop))
+            if key in _published and _published[key] == value:
+                continue
+            _published[key] = value
+            entries.append([_name_id(source_name), key[1], value])
+        if not entries:
+            return
+
+        _version += 1
+        frame = _encode_frame(MIRROR_FRAME_DELTA, _version, _names[new_names_from:], entries)
+        for follower in list(_followers):
+            if not follower.send(frame):
+                obs.script_log(obs.LOG_WARNING, f"Mirror follower {follower.addr[0]} does not keep up, disconnected.")
+                _followers.remove(follower)
+                follower.close()
+
+    _deltas_sent += 1
+    _delta_bytes += len(frame)
+    _max_delta_bytes = max(_max_delta_bytes, len(frame))
+
+
+def _name_id(source_name: str) -> int:
+    name_id = _name_ids.get(source_name)
+    if name_id is None:
+        name_id = _name_ids[source_name] = len(_names)
+        _names.append(source_name)
+    return name_id
+
+
+def _encode_frame(frame_type: int, version: int, new_names: List[str], entries: List[list]) -> bytes:
+    body = json.dumps([new_names, entries], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return MIRROR_HEADER.pack(frame_type, version, len(body), time.time_ns()) + body
+
+
+def _start_primary():
+    global _listen_sock
+
+    # state written before mirroring was started
+    for source_name, written in get_written_values().items():
+        for prop, value in written.items():
+            _on_write(source_name, prop, value)
+    set_write_listener(_on_write, _on_applied)
+    _on_applied()
+
+    try:
+        _listen_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        _listen_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        _listen_sock.bind(("", port))
+        _listen_sock.listen()
+        _listen_sock.settimeout(MIRROR_ACCEPT_TIMEOUT)
+    except OSError as e:
+        obs.script_log(obs.LOG_ERROR, f"Mirror: failed to listen on TCP {port}: {e}")
+        _close(_listen_sock)
+        _listen_sock = None
+        return
+
+    _start_thread(_accept_thread_main, (_listen_sock,), "Mirror primary")
+    obs.script_log(obs.LOG_INFO, f"Mirror: primary, listening on TCP {port}")
+
+
+def _accept_thread_main(listen_sock: socket.socket):
+    while not _stop.is_set():
+        try:
+            sock, addr = listen_sock.accept()
+        except socket.timeout:
+            continue
+        except OSError:
+            break  # closed on stop
+
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        follower = _Follower(sock, addr)
+        with _lock:
+            # snapshot and registration at once - follower gets every delta after the snapshot version
+            entries = [[_name_ids[source_name], prop_index, value] for (source_name, prop_index), value in _published.items()]
+            follower.send(_encode_frame(MIRROR_FRAME_SNAPSHOT, _version, _names, entries))
+            _followers.append(follower)
+
+        obs.script_log(obs.LOG_INFO, f"Mirror: follower {addr[0]} connected ({len(entries)} values in snapshot)")
+        _start_thread(_follower_sender_main, (follower,), f"Mirror sender {addr[0]}")
+
+
+def _follower_sender_main(follower: "_Follower"):
+    while not _stop.is_set():
+        frame = follower.frames.get()
+        if frame is None:
+            break
+        try:
+            follower.sock.sendall(frame)
+        except OSError:
+            break
+
+    with _lock:
+        if follower in _followers:
+            _followers.remove(follower)
+    _close(follower.sock)
+    if not _stop.is_set():
+        obs.script_log(obs.LOG_INFO, f"Mirror: follower {follower.addr[0]} disconnected")
+
+
+def _stop_primary():
+    global _listen_sock, _version, _deltas_sent, _delta_bytes, _max_delta_bytes
+
+    set_write_listener(None)
+    _close(_listen_sock)
+    _listen_sock = None
+
+    with _lock:
+        for follower in _followers:
+            follower.close()
+        _followers.clear()
+        _published.clear()
+        _names.clear()
+        _name_ids.clear()
+        _version = 0
+
+    _actual.clear()
+    _overrides.clear()
+    _dirty.clear()
+
+    if _deltas_sent:
+        obs.script_log(obs.LOG_INFO, f"Mirror: {_deltas_sent} deltas sent, avg {_delta_bytes / _deltas_sent:.0f} bytes, "
+                                     f"max {_max_delta_bytes} bytes")
+    _deltas_sent = _delta_bytes = _max_delta_bytes = 0
+
+
+# ---------------------------
+# Follower
+# ---------------------------
+# (send time ns, [(source name, property, value), ...]) received frames, guarded by _received_lock
+_received: Deque[Tuple[int, List[Tuple[str, str, object]]]] = deque()
+_received_lock = threading.Lock()
+_follower_sock: Union[socket.socket, None] = None
+
+# stats (main thread)
+_frames_applied = 0
+_latencies_ms: Deque[float] = deque(maxlen=MIRROR_LATENCY_SAMPLES)
+
+
+def is_mirror_follower() -> bool:
+    return mode == MIRROR_MODE_FOLLOWER
+
+
+def _start_follower():
+    if not host:
+        obs.script_log(obs.LOG_WARNING, "Mirror: follower mode needs primary address.")
+        return
+    # permanent, added on main thread - receiver thread only queues frames (timers can't be added from other threads)
+    obs.timer_add(_apply_callback, MIRROR_APPLY_INTERVAL_MS)
+    _start_thread(_receiver_thread_main, (host, port), "Mirror follower")
+    obs.script_log(obs.LOG_INFO, f"Mirror: follower of {host}:{port}")
+
+
+def _receiver_thread_main(primary_host: str, primary_port: int):
+    global _follower_sock
+
+    while not _stop.is_set():
+        try:
+            sock = socket.create_connection((primary_host, primary_port), timeout=MIRROR_RECONNECT_INTERVAL)
+        except OSError:
+            _stop.wait(MIRROR_RECONNECT_INTERVAL)
+            continue
+
+        _follower_sock = sock
+        log_info_if_debug(debug, "Mirror: connected to %s:%d", primary_host, primary_port)
+        try:
+            sock.settimeout(None)  # closed on stop
+            _receive_frames(sock)
+        except (OSError, ValueError) as e:
+            if not _stop.is_set():
+                obs.script_log(obs.LOG_WARNING, f"Mirror: connection to {primary_host}:{primary_port} lost: {e}")
+        finally:
+            _follower_sock = None
+            _close(sock)
+
+        _stop.wait(MIRROR_RECONNECT_INTERVAL)
+
+
+def _receive_frames(sock: socket.socket):
+    names: List[str] = []
+    version = None
+
+    while not _stop.is_set():
+        frame_type, frame_version, body_len, sent_ns = MIRROR_HEADER.unpack(_recv_exact(sock, MIRROR_HEADER.size))
+        new_names, entries = json.loads(_recv_exact(sock, body_len).decode("utf-8"))
+
+        if frame_type == MIRROR_FRAME_SNAPSHOT:
+            names = new_names
+        elif version is not None and frame_version == version + 1:
+            names.extend(new_names)
+        else:
+            raise ValueError(f"unexpected frame (type {frame_type}, version {frame_version} after {version})")
+        version = frame_version
+
+        changes = [(names[name_id], MIRROR_PROPS[prop_index], value) for name_id, prop_index, value in entries]
+        with _received_lock:
+            _received.append((sent_ns, changes))
+
+
+def _apply_callback():
+    # every OBS frame, nothing received most of the time
+    if _received:
+        _apply_received()
+
+
+@traced_operation("mirror apply")
+def _apply_received():
+    global _frames_applied
+
+    with _received_lock:
+        frames = list(_received)
+        _received.clear()
+
+    # all frames received since last OBS frame are applied at once
+    with batch_updates():
+        for _, changes in frames:
+            for source_name, prop, value in changes:
+                if prop == "visible":
+                    set_source_visibility(source_name, value)
+                else:
+                    set_source_value(source_name, prop, value)
+
+    applied_ns = time.time_ns()
+    for sent_ns, _ in frames:
+        _latencies_ms.append((applied_ns - sent_ns) / 1e6)
+    _frames_applied += len(frames)
+
+
+def _stop_follower():
+    global _frames_applied
+
+    _close(_follower_sock)
+    obs.timer_remove(_apply_callback)
+    with _received_lock:
+        _received.clear()
+
+    if _frames_applied:
+        p50, p95, p_max = percentiles(_latencies_ms, (50, 95, 100))
+        obs.script_log(obs.LOG_INFO, f"Mirror: {_frames_applied} frames applied, latency from primary (wall clock) "
+                                     f"p50 {p50:.1f} ms, p95 {p95:.1f} ms, max {p_max:.1f} ms")
+    _frames_applied = 0
+    _latencies_ms.clear()
+
+
+# ---------------------------
+# Helpers
+# ---------------------------
+def _start_thread(target, args, name: str):
+    thread = threading.Thread(target=target, args=args, name=name)
+    thread.daemon = True  # thread will exit when OBS exits
+    thread.start()
+    _threads.append(thread)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        data += chunk
+    return bytes(data)
+
+
+def _close(sock: Union[socket.socket, None]):
+    if sock is None:
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    try:
+        sock.close()
+    except OSError:
+        pass
+
+
+def _start():
+    global _stop
+    _stop = threading.Event()
+    if mode == MIRROR_MODE_PRIMARY:
+        _start_primary()
+    elif mode == MIRROR_MODE_FOLLOWER:
+        _start_follower()
+
+
+def _stop_mirror(running_mode: str):
+    _stop.set()
+    if running_mode == MIRROR_MODE_PRIMARY:
+        _stop_primary()
+    elif running_mode == MIRROR_MODE_FOLLOWER:
+        _stop_follower()
+
+    for thread in _threads:
+        thread.join(MIRROR_ACCEPT_TIMEOUT * 2)
+    _threads.clear()
+
+
+# ---------------------------
+# Lifecycle (called from overlay_script_common)
+# ---------------------------
+def dvov_mirror_script_properties(props):
+    mode_list = obs.obs_properties_add_list(props, "mirror_mode", "Mirror mode (other OBS on LAN)", obs.OBS_COMBO_TYPE_LIST, obs.OBS_COMBO_FORMAT_STRING)
+    obs.obs_property_list_add_string(mode_list, "Off", MIRROR_MODE_OFF)
+    obs.obs_property_list_add_string(mode_list, "Primary (publish state)", MIRROR_MODE_PRIMARY)
+    obs.obs_property_list_add_string(mode_list, "Follower (show state of primary)", MIRROR_MODE_FOLLOWER)
+    obs.obs_properties_add_text(props, "mirror_host", "Mirror primary address (follower)", obs.OBS_TEXT_DEFAULT)
+    obs.obs_properties_add_int(props, "mirror_port", "Mirror TCP port", 1024, 65535, 1)
+
+
+def dvov_mirror_script_defaults(settings):
+    obs.obs_data_set_default_string(settings, "mirror_mode", MIRROR_MODE_OFF)
+    obs.obs_data_set_default_string(settings, "mirror_host", "")
+    obs.obs_data_set_default_int(settings, "mirror_port", MIRROR_PORT)
+
+
+def dvov_mirror_script_update(settings):
+    global debug, mode, host, port
+
+    debug = obs.obs_data_get_bool(settings, "debug")
+    new_mode = obs.obs_data_get_string(settings, "mirror_mode") or MIRROR_MODE_OFF
+    new_host = obs.obs_data_get_string(settings, "mirror_host").strip()
+    new_port = obs.obs_data_get_int(settings, "mirror_port") or MIRROR_PORT
+
+    # No change? Do nothing.
+    if (new_mode, new_host, new_port) == (mode, host, port):
+        return
+
+    _stop_mirror(mode)
+    mode, host, port = new_mode, new_host, new_port
+    _start()
+
+
+def dvov_mirror_script_load(settings):
+    dvov_mirror_script_update(settings)
+
+
+def dvov_mirror_script_unload():
+    global mode
+    _stop_mirror(mode)
+    mode = MIRROR_MODE_OFF
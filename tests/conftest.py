@@ -0,0 +1,14 @@
+'''
+Tests run outside OBS against the fake obspython module (dev/obspython.py), as the dev/ benchmarks do.
+
+Usage (from repository root):
+    python -m pytest -q
+'''
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(TESTS_DIR)
+DEV_DIR = os.path.join(ROOT_DIR, "dev")
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, DEV_DIR)  # fake obspython must win over real one
@@ -0,0 +1,41 @@
+import pytest
+
+import obspython as obs
+import obs_utils
+from benchmark import Bench, make_diver
+from overlay_script_common import OBS_CALL_BUDGETS_DEFAULT
+
+
+@pytest.fixture
+def bench():
+    bench = Bench()
+    obs_utils.set_obs_call_tracing(True, obs_utils.parse_call_budgets(OBS_CALL_BUDGETS_DEFAULT))
+    yield bench
+    obs_utils.set_obs_call_tracing(False)
+    bench.script.script_unload()
+
+
+def budget_warnings():
+    return [msg for _, msg in obs.log if msg.startswith("OBS call budget exceeded")]
+
+
+def test_default_budgets_parse():
+    budgets = obs_utils.parse_call_budgets(OBS_CALL_BUDGETS_DEFAULT)
+    assert {"REFEREE pre-dive", "REFEREE awards", "REFEREE synchro pre-dive", "REFEREE synchro awards"} <= budgets.keys()
+    assert all(calls > 0 for calls in budgets.values())
+
+
+@pytest.mark.parametrize("synchro", [False, True])
+def test_referee_messages_stay_within_default_budgets(bench, synchro):
+    # first message of a kind builds source indexes - only steady state is budgeted
+    bench.send(make_diver(1, synchro, awards=False), make_diver(1, synchro, awards=True))
+    obs.log.clear()
+
+    for no in range(2, 13):
+        bench.send(make_diver(no, synchro, awards=False))
+        bench.send(make_diver(no, synchro, awards=True))
+
+    kind = "REFEREE synchro" if synchro else "REFEREE"
+    assert obs_utils._operation_stats[f"{kind} pre-dive"][0] > 0
+    assert obs_utils._operation_stats[f"{kind} awards"][0] > 0
+    assert budget_warnings() == []
@@ -0,0 +1,53 @@
+import pytest
+
+import dive_recorder_overlays as script
+from event_state import get_event_state
+
+
+def message(packet_type, event_ab, text, receive_ns=0):
+    return [packet_type, event_ab, text], receive_ns
+
+
+@pytest.fixture(autouse=True)
+def counters():
+    script.udp_messages_coalesced = 0
+    for event_ab in ("a", "b"):
+        get_event_state(event_ab).metrics.coalesced = 0
+
+
+def texts(messages):
+    return [parts[2] for parts, _ in messages]
+
+
+def test_latest_referee_message_of_event_wins():
+    messages = [message("REFEREE", "a", "1"), message("REFEREE", "a", "2"), message("REFEREE", "a", "3", 30)]
+
+    kept = script.coalesce_udp_messages(messages)
+
+    assert kept == [messages[2]]
+    assert script.udp_messages_coalesced == 2
+    assert get_event_state("a").metrics.coalesced == 2
+
+
+def test_events_are_coalesced_separately():
+    messages = [message("REFEREE", "a", "a1"), message("REFEREE", "b", "b1"), message("REFEREE", "a", "a2"),
+                message("REFEREE", "b", "b2")]
+
+    assert texts(script.coalesce_udp_messages(messages)) == ["a2", "b2"]
+    assert get_event_state("a").metrics.coalesced == 1
+    assert get_event_state("b").metrics.coalesced == 1
+
+
+def test_other_packet_is_barrier():
+    messages = [message("REFEREE", "a", "1"), message("AVIDEO", "a", "video"), message("REFEREE", "a", "2"),
+                message("REFEREE", "a", "3")]
+
+    assert texts(script.coalesce_udp_messages(messages)) == ["1", "video", "3"]
+    assert script.udp_messages_coalesced == 1
+
+
+def test_single_message_is_kept():
+    messages = [message("REFEREE", "a", "1")]
+
+    assert script.coalesce_udp_messages(messages) is messages
+    assert script.udp_messages_coalesced == 0
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+import debug_log
+import obspython as obs
+from obs_utils import log_info_if_debug
+
+
+@pytest.fixture(autouse=True)
+def debug_events(tmp_path):
+    obs.fake_reset()
+    debug_log._events.clear()
+    debug_log.root_dir = str(tmp_path)
+    debug_log._last_error_dump = 0.0
+    yield
+    debug_log.dvov_debug_log_script_unload()
+    debug_log.recording = False
+    debug_log.root_dir = ""
+    debug_log._events.clear()
+
+
+class Unformattable:
+    def __str__(self):
+        raise ValueError("no text")
+
+
+def test_nothing_is_recorded_without_debug_or_recording():
+    log_info_if_debug(False, "diver %s", "First1")
+
+    assert debug_log.get_debug_events() == []
+
+
+def test_recorded_event_is_formatted_lazily():
+    debug_log.recording = True
+    args = ["First1"]
+    log_info_if_debug(False, "diver %s", args)
+    args.append("changed before formatting")
+
+    event, = debug_log.get_debug_events()
+    assert (event.level, event.source, event.message) == (obs.LOG_INFO, __name__, "diver %s")
+    assert event.text() == "diver ['First1', 'changed before formatting']"
+    assert debug_log.flush_debug_log()
+    assert obs.log == []  # recorded only, debug is off
+
+
+def test_debug_event_is_written_by_writer_thread():
+    log_info_if_debug(True, "%d records", 12)
+
+    assert debug_log.flush_debug_log()
+    assert obs.log == [(obs.LOG_INFO, "12 records")]
+
+
+def test_bad_args_do_not_lose_event():
+    debug_log.recording = True
+    log_info_if_debug(False, "value %s", Unformattable())
+
+    assert debug_log.get_debug_events()[0].text() == "value %s (args not formatted)"
+
+
+def test_error_is_logged_at_once_and_dumped_once(tmp_path):
+    debug_log.recording = True
+    log_info_if_debug(False, "before error %d", 1)
+
+    debug_log.log_error("Failed to fetch %s", "Update.txt")
+    debug_log.log_error("Failed again")
+    assert debug_log.flush_debug_log()
+
+    assert obs.log[:2] == [(obs.LOG_ERROR, "Failed to fetch Update.txt"), (obs.LOG_ERROR, "Failed again")]
+    dump_name, = os.listdir(tmp_path)
+    with open(tmp_path / dump_name, encoding="utf-8") as dump_file:
+        lines = dump_file.read().splitlines()
+    assert [line.split(": ", 1)[1] for line in lines] == ["before error 1", "Failed to fetch Update.txt"]
+    assert " error [" in lines[1]
@@ -0,0 +1,55 @@
+import pytest
+
+import obspython as obs
+import event_state
+from benchmark import Bench, make_diver
+from event_state import EVENT_A, EVENT_B
+from state_controls import toggle_event_a_or_b  # F4
+
+
+@pytest.fixture
+def bench():
+    bench = Bench()
+    yield bench
+    set_suffix(bench, "")
+    event_state.select_event(EVENT_A)
+    bench.script.script_unload()
+
+
+def set_suffix(bench, suffix: str):
+    obs.obs_data_set_string(bench.settings, "event_b_suffix", suffix)
+    bench.script.script_update(bench.settings)
+
+
+def test_messages_of_not_selected_event_are_kept(bench):
+    bench.send(make_diver(1, False, awards=False, event_ab="b"))
+    assert event_state.get_event_state(EVENT_B).referee_message.start_no == "1"
+    assert obs.fake_source("Diver1").settings.get("text", "") != "First1 Family1 (VDC)"  # event A is selected
+
+    toggle_event_a_or_b(True)
+    assert event_state.get_selected_event_state().event_ab == EVENT_B
+    assert obs.fake_source("Diver1").settings.get("text", "") == "First1 Family1 (VDC)"
+
+
+def test_dual_mode_renders_event_b_into_suffixed_sources(bench):
+    obs.fake_add_source("Diver1 B")
+    obs.fake_add_source("Diver2 B")
+    set_suffix(bench, " B")
+
+    bench.send(make_diver(2, True, awards=False, event_ab="b"))
+    assert event_state.get_event_state(EVENT_B).synchro
+    assert obs.fake_source("Diver2 B").settings.get("text", "") == "Second2 Pair2 - VDC"
+    assert obs.fake_source("Diver2").settings.get("text", "") != "Second2 Pair2 - VDC"
+
+
+def test_dual_mode_keeps_rankings_and_auto_hide_with_event_a(bench):
+    toggle_event_a_or_b(True)  # event B selected before dual mode
+    set_suffix(bench, " B")
+    assert event_state.get_selected_event_state().event_ab == EVENT_A
+    assert not event_state.is_selected_event(EVENT_B)
+
+    toggle_event_a_or_b(True)  # ignored in dual mode
+    assert event_state.get_selected_event_state().event_ab == EVENT_A
+    assert event_state.is_rendered_event(EVENT_B)
+    assert event_state.event_source_namespace(EVENT_B) == " B"
+    assert event_state.event_source_namespace(EVENT_A) == ""
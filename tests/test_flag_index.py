@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+import obspython as obs
+import flag_index
+from flag_index import dvov_flags_set_folder, get_flag_path
+
+
+@pytest.fixture
+def flags(tmp_path):
+    for name in ("Default.png", "KPM.png", "ad.png", "gb-eng.png", "lt.png", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    (tmp_path / "aliases.txt").write_text("# team code = flag file name\nLTU = lt\nKAU = Kaunas\n", encoding="utf-8")
+
+    obs.fake_reset()
+    previous = flag_index._folder
+    dvov_flags_set_folder(str(tmp_path))
+    yield tmp_path
+    dvov_flags_set_folder(previous)
+
+
+def test_codes_match_case_insensitively(flags):
+    assert get_flag_path("kpm") == str(flags / "KPM.png")
+    assert get_flag_path("AD") == str(flags / "ad.png")
+    assert get_flag_path("GB_ENG") == str(flags / "gb-eng.png")
+
+
+def test_aliases_map_codes_to_flag_files(flags):
+    assert get_flag_path("LTU") == str(flags / "lt.png")
+    # alias to missing file is reported and not used
+    assert any("KAU = Kaunas" in message for _, message in obs.log)
+    assert get_flag_path("KAU") == str(flags / "Default.png")
+
+
+def test_unknown_code_gets_default_flag_logged_once(flags):
+    assert get_flag_path("XYZ") == str(flags / "Default.png")
+    assert get_flag_path("XYZ") == str(flags / "Default.png")
+    assert sum("'XYZ'" in message for _, message in obs.log) == 1
+    assert get_flag_path("notes") == str(flags / "Default.png")  # not a .png
+
+
+def test_empty_code_has_no_flag(flags):
+    assert get_flag_path("") == ""
+    assert get_flag_path("  ") == ""
+
+
+def test_folder_is_rescanned_when_it_changes(flags, monkeypatch):
+    assert get_flag_path("SSC") == str(flags / "Default.png")
+
+    (flags / "SSC.png").write_bytes(b"")
+    os.utime(flags, (1, 1))  # folder mtime differs from the one indexed
+    monkeypatch.setattr(flag_index, "_next_check", 0.0)
+    assert get_flag_path("SSC") == str(flags / "SSC.png")
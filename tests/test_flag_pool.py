@@ -0,0 +1,60 @@
+import pytest
+
+import obspython as obs
+from benchmark import Bench, make_diver
+from flag_index import get_flag_path
+
+
+@pytest.fixture(scope="module")
+def bench():
+    return Bench(flag_pool=True)
+
+
+def shown_flag(slot: str, companion: str) -> str:
+    # file of whichever of slot source and its companion is visible
+    (slot_visible,), (companion_visible,) = obs.fake_visible(slot), obs.fake_visible(companion)
+    assert slot_visible != companion_visible
+    return obs.fake_source(slot if slot_visible else companion).settings.get("file", "")
+
+
+def hidden_flag(slot: str, companion: str) -> str:
+    visible, = obs.fake_visible(slot)
+    return obs.fake_source(companion if visible else slot).settings.get("file", "")
+
+
+def test_next_diver_flag_is_preloaded_and_swapped_in(bench):
+    bench.send(make_diver(1, False, awards=False))
+    assert shown_flag("Flag", "Flag Preload") == get_flag_path("VDC")
+
+    obs.fake_advance(600)
+    assert hidden_flag("Flag", "Flag Preload") == get_flag_path("SSC")  # diver 2
+
+    obs.fake_reset_calls()
+    bench.send(make_diver(2, False, awards=False))
+    assert shown_flag("Flag", "Flag Preload") == get_flag_path("SSC")
+    assert hidden_flag("Flag", "Flag Preload") == get_flag_path("VDC")
+    assert obs.fake_call_counts()["obs_sceneitem_set_visible"] > 0
+
+
+def test_unexpected_diver_flag_is_set_to_shown_source(bench):
+    bench.send(make_diver(2, False, awards=False))
+    obs.fake_advance(600)
+    assert hidden_flag("Flag", "Flag Preload") == get_flag_path("lt")  # diver 3 expected
+
+    bench.send(make_diver(5, False, awards=False))
+    assert shown_flag("Flag", "Flag Preload") == get_flag_path("VDC")
+
+    obs.fake_advance(600)
+    assert hidden_flag("Flag", "Flag Preload") == get_flag_path("SSC")  # diver 6
+
+
+def test_unload_shows_flag_in_slot_source(bench):
+    bench.send(make_diver(7, False, awards=True))
+    obs.fake_advance(600)
+    flag = shown_flag("Flag", "Flag Preload")
+
+    bench.script.script_unload()
+
+    assert obs.fake_visible("Flag") == [True] and obs.fake_visible("Flag Preload") == [False]
+    assert obs.fake_source("Flag").settings.get("file", "") == flag == get_flag_path("lt")
+    assert obs.fake_leaked_refs() == {}
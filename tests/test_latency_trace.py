@@ -0,0 +1,49 @@
+import pytest
+
+import latency_trace
+from latency_trace import event_latency_ms, percentiles
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    latency_trace.reset_latency_traces()
+    yield
+    latency_trace.reset_latency_traces()
+
+
+def test_percentiles_nearest_rank():
+    values = list(range(100, 0, -1))  # 1..100, unordered
+
+    assert percentiles(values) == [50, 95, 99]
+    assert percentiles(values, (0, 100)) == [1, 100]
+    assert percentiles([4, 1, 3, 2]) == [2, 4, 4]
+    assert percentiles(range(1, 11), (50, 90, 95)) == [5, 9, 10]
+    assert percentiles([7.5]) == [7.5, 7.5, 7.5]
+    assert percentiles([]) == [0.0, 0.0, 0.0]
+
+
+def test_written_traces_add_stage_and_event_durations():
+    for event_ab, received_ns in (("a", 0), ("b", 0), ("", 0)):
+        latency_trace.trace_begin("REFEREE", [("receive", received_ns)], event_ab)
+        latency_trace.trace_mark("parse")
+        latency_trace.trace_end()
+    latency_trace.trace_written()
+
+    stages = latency_trace._durations_ms["REFEREE"]
+    assert list(stages) == ["parse", "state", "write", "total"]
+    assert len(stages["total"]) == 3
+    assert list(latency_trace._event_totals_ms) == ["a", "b"]
+    assert event_latency_ms("a")[2] == stages["total"][0]
+    assert event_latency_ms("missing") == [0.0, 0.0, 0.0]
+    assert latency_trace.latency_summary()[0].startswith("Latency REFEREE (last 3, p50/p95/p99 ms): parse ")
+
+
+def test_aborted_trace_is_not_counted():
+    latency_trace.trace_begin("REFEREE", [("receive", 123)], "a")
+    assert latency_trace.trace_received_ns() == 123
+    latency_trace.trace_abort()
+    latency_trace.trace_end()
+    latency_trace.trace_written()
+
+    assert latency_trace.latency_summary() == []
+    assert latency_trace.trace_received_ns() == 0
@@ -0,0 +1,58 @@
+import pytest
+
+import obs_utils
+import obspython as obs
+
+
+@pytest.fixture(autouse=True)
+def source_cache():
+    obs.fake_reset()
+    obs_utils.connect_source_signals()
+    yield
+    obs_utils.clear_source_cache()
+    obs_utils.disconnect_source_signals()
+
+
+def lookups() -> int:
+    return obs.fake_call_counts()["obs_get_source_by_name"]
+
+
+def test_source_is_looked_up_once():
+    source = obs.fake_add_source("Rnk_Name 1")
+
+    assert obs_utils.get_cached_source("Rnk_Name 1") is source
+    assert obs_utils.get_cached_source("Rnk_Name 1") is source
+    assert lookups() == 1
+    assert obs.fake_leaked_refs() == {"Rnk_Name 1": 1}  # owned by the cache until cleared
+
+    obs_utils.clear_source_cache()
+    assert obs.fake_leaked_refs() == {}
+
+
+def test_missing_source_is_cached_until_created():
+    assert obs_utils.get_cached_source("Flag") is None
+    assert obs_utils.get_cached_source("Flag") is None
+    assert lookups() == 1
+
+    source = obs.fake_add_source("Flag", "image_source")
+    assert obs_utils.get_cached_source("Flag") is source
+
+
+def test_removed_source_is_released():
+    obs.fake_add_source("Flag", "image_source")
+    obs_utils.get_cached_source("Flag")
+
+    obs.fake_remove_source("Flag")
+
+    assert obs_utils.get_cached_source("Flag") is None
+    assert obs.fake_leaked_refs() == {}
+
+
+def test_renamed_source_is_looked_up_by_new_name():
+    source = obs.fake_add_source("Flag", "image_source")
+    obs_utils.get_cached_source("Flag")
+
+    obs.fake_rename_source("Flag", "Flag Old")
+
+    assert obs_utils.get_cached_source("Flag") is None
+    assert obs_utils.get_cached_source("Flag Old") is source
@@ -0,0 +1,77 @@
+import dataclasses
+
+import pytest
+
+import obspython as obs
+import rankings
+import rankings_banks
+from benchmark import Bench, make_rankings, make_referee_message
+
+
+@pytest.fixture
+def bench():
+    bench = Bench()
+    yield bench
+    bench.script.script_unload()
+
+
+def start_rankings(bench, count=40):
+    event = bench.script.parse_dive_message(make_referee_message().split("|"))
+    bench.script.dvov_rank_set_divers(make_rankings(count), event)
+
+
+def text(name: str) -> str:
+    return obs.fake_source(name).settings.get("text", "")
+
+
+def remove_bank_b():
+    # scene collection imported before bank B was added
+    for parent, name in (("OverlayRankings", "Rnk_Lines B"), ("BoardRankings", "Rnk_BoardLines B")):
+        scene = obs.fake_source(parent).scene
+        for item in [item for item in scene.items if item.source.name == name]:
+            scene.items.remove(item)
+            scene.source.signal_handler.emit("item_remove", {"scene": scene, "item": item})
+    obs.fake_fire_frontend_event(obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGING)
+
+
+def test_next_page_is_prefetched_and_flip_switches_two_items_per_view(bench):
+    start_rankings(bench)
+    per_page = rankings.rankings_no_lines_per_page
+    assert obs.fake_visible("Rnk_Lines A") == [True] and obs.fake_visible("Rnk_Lines B") == [False]
+
+    obs.fake_advance(rankings.RANKINGS_PREFETCH_DELAY_MS + 100)
+    assert text("Rnk_Name 1 [B]") == rankings.ranking_rec_working_copy[per_page].diver
+
+    obs.fake_reset_calls()
+    obs.fake_advance(rankings.rankings_page_display_duration * 1000 - rankings.RANKINGS_PREFETCH_DELAY_MS - 100)
+
+    calls = obs.fake_call_counts()
+    assert calls["obs_sceneitem_set_visible"] == 4  # overlay and board, shown and hidden bank
+    assert calls["obs_source_update"] == 0
+    for bank_a, bank_b in zip(rankings_banks.BANK_SCENES[rankings_banks.BANK_A], rankings_banks.BANK_SCENES[rankings_banks.BANK_B]):
+        assert obs.fake_visible(bank_a) == [False] and obs.fake_visible(bank_b) == [True]
+    assert text("Rnk_Name 1") == rankings.ranking_rec_working_copy[0].diver  # page 1 stays in bank A
+
+
+def test_rankings_change_after_prefetch_reaches_next_page(bench):
+    start_rankings(bench)
+    obs.fake_advance(rankings.RANKINGS_PREFETCH_DELAY_MS + 100)
+
+    records = make_rankings(40)
+    records[-9] = dataclasses.replace(records[-9], diver="Changed Diver")  # first diver of page 2 in start order
+    bench.script.dvov_rank_set_divers(records, rankings.rankings_event_rec_working_copy)
+    obs.fake_advance(rankings.rankings_page_display_duration * 1000 - rankings.RANKINGS_PREFETCH_DELAY_MS - 100)
+
+    assert rankings_banks.front_bank() == rankings_banks.BANK_B
+    assert text("Rnk_Name 1 [B]") == "Changed Diver"
+
+
+def test_collection_without_bank_b_shows_pages_in_bank_a(bench):
+    remove_bank_b()
+    bank_b_text = text("Rnk_Name 1 [B]")
+    start_rankings(bench)
+    obs.fake_advance(rankings.rankings_page_display_duration * 1000)
+
+    assert rankings_banks.front_bank() == rankings_banks.BANK_A
+    assert text("Rnk_Name 1") == rankings.ranking_rec_working_copy[rankings.rankings_no_lines_per_page].diver
+    assert text("Rnk_Name 1 [B]") == bank_b_text
@@ -0,0 +1,45 @@
+import dataclasses
+
+from benchmark import make_rankings
+from rankings import diff_rankings
+
+
+def test_same_records_give_empty_diff():
+    diff = diff_rankings(make_rankings(8), make_rankings(8))
+
+    assert diff.is_empty()
+    assert str(diff) == "0 changed, 0 inserted, 0 removed, 0 reordered"
+
+
+def test_changed_points_of_diver():
+    old = make_rankings(8)
+    new = list(old)
+    new[5] = dataclasses.replace(old[5], points="1.00")
+
+    diff = diff_rankings(old, new)
+
+    assert diff.changed == [new[5]]
+    assert not (diff.inserted or diff.removed or diff.reordered)
+
+
+def test_inserted_and_removed_divers():
+    old = make_rankings(8)
+    new = old[:3] + old[4:] + [dataclasses.replace(old[0], diver="New Diver", start_position=99)]
+
+    diff = diff_rankings(old, new)
+
+    assert diff.removed == [old[3]]
+    assert diff.inserted == [new[-1]]
+    assert not (diff.changed or diff.reordered)
+
+
+def test_swapped_divers_are_reordered():
+    old = make_rankings(5)
+    first = dataclasses.replace(old[2], rank=2)
+    second = dataclasses.replace(old[1], rank=3)
+    new = [old[0], first, second, old[3], old[4]]
+
+    diff = diff_rankings(old, new)
+
+    assert diff.reordered == [first, second]
+    assert diff.changed == [first, second]
@@ -0,0 +1,49 @@
+from collections import namedtuple
+
+from obs_utils import source_namespace
+from source_plans import Binding, apply_plan, compile_plan, field, fixed
+
+Message = namedtuple("Message", "name points")
+
+
+def make_bindings(writes):
+    def write(source_name, value):
+        writes.append((source_name, value))
+
+    return [
+        Binding(lambda synchro: True, "Name", field("name"), write),
+        Binding(lambda synchro: synchro, "Name2", field("name", str.upper), write),
+        Binding(lambda synchro: True, "Points", lambda message: f"{message.points:.2f}", write),
+        Binding(lambda synchro: True, "Group", lambda synchro: not synchro, write, static=True),
+        Binding(lambda synchro: not synchro, "Single", fixed("shown"), write, static=True),
+    ]
+
+
+def test_plan_keeps_bindings_applying_to_key():
+    writes = []
+    plan = compile_plan(make_bindings(writes), True)
+
+    assert [source_name for _, source_name, _ in plan.message_writes] == ["Name", "Name2", "Points"]
+    assert [(source_name, value) for _, source_name, value in plan.static_writes] == [("Group", False)]
+
+
+def test_apply_writes_message_values_then_static_ones():
+    writes = []
+    plan = compile_plan(make_bindings(writes), False)
+
+    apply_plan(plan, Message("diver", 45.5))
+    apply_plan(plan, Message("next", 7))
+
+    assert writes == [("Name", "diver"), ("Points", "45.50"), ("Group", True), ("Single", "shown"),
+                      ("Name", "next"), ("Points", "7.00"), ("Group", True), ("Single", "shown")]
+
+
+def test_sources_are_namespaced_when_compiled():
+    writes = []
+    with source_namespace(" B"):
+        plan = compile_plan(make_bindings(writes), True)
+
+    apply_plan(plan, Message("diver", 1))
+
+    assert [source_name for source_name, _ in writes] == ["Name B", "Name2 B", "Points B", "Group B"]
+    assert writes[1] == ("Name2 B", "DIVER")
@@ -0,0 +1,112 @@
+from types import SimpleNamespace
+
+import pytest
+
+import debug_log
+import obspython as obs
+import state_controls
+from state_controls import DeadlineTimer
+
+
+@pytest.fixture(autouse=True)
+def fake_clock(monkeypatch):
+    # deadlines follow the fake OBS clock
+    obs.fake_reset()
+    monkeypatch.setattr(state_controls, "time", SimpleNamespace(monotonic=lambda: obs.fake_now_ms() / 1000))
+
+
+@pytest.fixture
+def fired():
+    return []
+
+
+@pytest.fixture
+def timer(fired):
+    return DeadlineTimer(lambda: fired.append(obs.fake_now_ms()))
+
+
+def test_fires_once_at_deadline(timer, fired):
+    assert timer.remaining_ms() is None
+    timer.arm(5000)
+    assert timer.remaining_ms() == 5000
+
+    obs.fake_advance(4999)
+    assert fired == []
+    obs.fake_advance(10000)
+
+    assert fired == [5000]
+    assert timer.remaining_ms() is None
+    assert obs.fake_active_timers() == []
+
+
+def test_later_deadline_keeps_single_timer(timer, fired):
+    timer.arm(5000)
+    obs.fake_advance(3000)
+    timer.arm(5000)  # e.g. next pre-dive message
+
+    assert len(obs.fake_active_timers()) == 1
+    obs.fake_advance(6000)
+
+    assert fired == [8000]
+    assert obs.fake_call_counts()["timer_add"] == 2  # first one re-added for the rest
+
+
+def test_earlier_deadline_replaces_timer(timer, fired):
+    timer.arm(5000)
+    timer.arm(1000)
+
+    assert len(obs.fake_active_timers()) == 1
+    obs.fake_advance(10000)
+
+    assert fired == [1000]
+
+
+def test_cancelled_timer_does_not_fire(timer, fired):
+    timer.arm(5000)
+    obs.fake_advance(1000)
+    timer.cancel()
+    obs.fake_advance(10000)
+
+    assert fired == []
+    assert timer.remaining_ms() is None
+    assert obs.fake_active_timers() == []
+
+
+def test_pause_freezes_remaining_time(timer, fired):
+    timer.arm(5000)
+    obs.fake_advance(2000)
+    timer.pause()
+    assert timer.paused
+
+    obs.fake_advance(10000)
+    assert fired == []
+    assert timer.remaining_ms() == 3000
+
+    timer.arm(4000)  # while paused only remaining time changes
+    timer.resume()
+    obs.fake_advance(10000)
+
+    assert fired == [16000]
+    assert not timer.paused
+
+
+def test_resume_without_deadline_does_nothing(timer, fired):
+    timer.pause()
+    assert timer.remaining_ms() is None
+
+    timer.resume()
+    obs.fake_advance(10000)
+
+    assert fired == []
+    assert obs.fake_active_timers() == []
+
+
+def test_hide_pause_logs_unarmed_timer(monkeypatch):
+    monkeypatch.setattr(state_controls, "debug", True)
+    monkeypatch.setattr(state_controls, "hide_disable", False)
+    state_controls.tv_banner_hide.cancel()
+
+    state_controls.update_tv_banner_hide_pause()
+
+    assert debug_log.flush_debug_log()
+    assert (obs.LOG_INFO, "TV banner auto-hide paused=False, remaining=None ms") in obs.log
@@ -0,0 +1,124 @@
+import json
+import socket
+import threading
+
+import pytest
+
+import obs_utils
+import obspython as obs
+import state_mirror
+from state_mirror import (MIRROR_FRAME_DELTA, MIRROR_FRAME_SNAPSHOT, MIRROR_HEADER, MIRROR_MODE_OFF, MIRROR_MODE_PRIMARY,
+                          mirror_override)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def write(name: str, text: str):
+    # one applied batch, as a UDP tick
+    with obs_utils.batch_updates():
+        obs_utils.set_source_string(name, text)
+
+
+def read_frame(sock: socket.socket):
+    frame_type, version, body_len, _ = MIRROR_HEADER.unpack(state_mirror._recv_exact(sock, MIRROR_HEADER.size))
+    new_names, entries = json.loads(state_mirror._recv_exact(sock, body_len))
+    return frame_type, version, new_names, entries
+
+
+def encode(frame_type: int, version: int, new_names, entries) -> bytes:
+    return state_mirror._encode_frame(frame_type, version, new_names, entries)
+
+
+@pytest.fixture
+def primary():
+    obs.fake_reset()
+    obs_utils.clear_write_cache()
+    for name in ("Diver1", "Diver2", "Flag"):
+        obs.fake_add_source(name)
+
+    settings = obs.obs_data_create()
+    obs.obs_data_set_string(settings, "mirror_mode", MIRROR_MODE_PRIMARY)
+    obs.obs_data_set_int(settings, "mirror_port", free_port())
+    write("Diver1", "before start")
+    state_mirror.dvov_mirror_script_update(settings)
+    yield state_mirror.port
+    state_mirror.dvov_mirror_script_unload()
+    assert state_mirror.mode == MIRROR_MODE_OFF
+
+
+def connect(port: int) -> socket.socket:
+    return socket.create_connection(("127.0.0.1", port), timeout=2)
+
+
+def test_follower_gets_snapshot_then_deltas(primary):
+    with connect(primary) as sock:
+        frame_type, version, names, entries = read_frame(sock)
+        assert frame_type == MIRROR_FRAME_SNAPSHOT
+        assert names == ["Diver1"]
+        assert entries == [[0, 0, "before start"]]
+
+        write("Diver2", "new source")
+        assert read_frame(sock) == (MIRROR_FRAME_DELTA, version + 1, ["Diver2"], [[1, 0, "new source"]])
+
+        # name sent once, referred to by index afterwards
+        write("Diver2", "changed")
+        assert read_frame(sock) == (MIRROR_FRAME_DELTA, version + 2, [], [[1, 0, "changed"]])
+
+
+def test_unchanged_values_are_not_sent(primary):
+    with connect(primary) as sock:
+        _, version, _, _ = read_frame(sock)
+        write("Diver1", "before start")  # same as published
+        write("Diver1", "changed")
+        assert read_frame(sock) == (MIRROR_FRAME_DELTA, version + 1, [], [[0, 0, "changed"]])
+
+
+def test_override_is_published_instead_of_written_value(primary):
+    with connect(primary) as sock:
+        _, version, _, _ = read_frame(sock)
+        with obs_utils.batch_updates():
+            obs_utils.set_source_string("Flag", "written")
+            mirror_override("Flag", {"text": "shown"})
+        assert read_frame(sock) == (MIRROR_FRAME_DELTA, version + 1, ["Flag"], [[1, 0, "shown"]])
+
+        with obs_utils.batch_updates():
+            mirror_override("Flag", None)
+        assert read_frame(sock) == (MIRROR_FRAME_DELTA, version + 2, [], [[1, 0, "written"]])
+
+
+@pytest.fixture
+def receiving(monkeypatch):
+    monkeypatch.setattr(state_mirror, "_stop", threading.Event())  # follower running
+    state_mirror._received.clear()
+    yield
+    state_mirror._received.clear()
+
+
+def test_follower_resolves_names_of_snapshot_and_deltas(receiving):
+    primary_end, follower_end = socket.socketpair()
+    primary_end.sendall(encode(MIRROR_FRAME_SNAPSHOT, 7, ["Diver1"], [[0, 0, "a"]]) +
+                        encode(MIRROR_FRAME_DELTA, 8, ["Flag"], [[1, 1, "flag.png"], [0, 3, False]]))
+    primary_end.close()
+
+    with follower_end, pytest.raises(ConnectionError):
+        state_mirror._receive_frames(follower_end)
+
+    assert [changes for _, changes in state_mirror._received] == [
+        [("Diver1", "text", "a")],
+        [("Flag", "file", "flag.png"), ("Diver1", "visible", False)],
+    ]
+
+
+def test_follower_drops_connection_on_missed_delta(receiving):
+    primary_end, follower_end = socket.socketpair()
+    primary_end.sendall(encode(MIRROR_FRAME_SNAPSHOT, 7, ["Diver1"], []) +
+                        encode(MIRROR_FRAME_DELTA, 9, [], [[0, 0, "b"]]))
+    primary_end.close()
+
+    with follower_end, pytest.raises(ValueError):
+        state_mirror._receive_frames(follower_end)
+    assert len(state_mirror._received) == 1  # snapshot only
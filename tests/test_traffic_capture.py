@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+
+import obspython as obs
+import traffic_capture
+from traffic_capture import (RECORD_UDP, RECORD_XFER, CaptureRecord, capture_udp_datagram, capture_xfer_payload,
+                             dvov_capture_start, dvov_capture_stop, read_capture, xfer_record_event)
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    obs.fake_reset()
+    yield
+    dvov_capture_stop()
+
+
+def test_queued_records_are_written_on_stop(tmp_path):
+    path = dvov_capture_start(str(tmp_path))
+    capture_udp_datagram(b"REFEREE|a|^", ("192.168.1.10", 58091))
+    capture_xfer_payload("192.168.1.10", "Update.txt", "b", bytearray(b"payload"))
+    dvov_capture_stop()
+
+    records = list(read_capture(path))
+    assert [(record.kind, record.meta, record.payload) for record in records] == [
+        (RECORD_UDP, "192.168.1.10:58091", b"REFEREE|a|^"),
+        (RECORD_XFER, "192.168.1.10|Update.txt|b", b"payload"),
+    ]
+    assert records[0].timestamp_ns <= records[1].timestamp_ns
+    assert xfer_record_event(records[1]) == "b"
+
+
+def test_records_are_written_by_writer_thread(tmp_path, monkeypatch):
+    writer_threads = set()
+    write_record = traffic_capture._writer_main
+
+    def writer_main(capture_file, records):
+        writer_threads.add(threading.current_thread().name)
+        write_record(capture_file, records)
+
+    monkeypatch.setattr(traffic_capture, "_writer_main", writer_main)
+    path = dvov_capture_start(str(tmp_path))
+    capture_udp_datagram(b"AVIDEO|a|^", None)
+    dvov_capture_stop()
+
+    assert writer_threads == {traffic_capture.CAPTURE_THREAD_NAME}
+    assert [record.payload for record in read_capture(path)] == [b"AVIDEO|a|^"]
+
+
+def test_nothing_is_queued_when_not_capturing():
+    capture_udp_datagram(b"REFEREE|a|^", None)
+    assert not traffic_capture.capture_is_active()
+
+
+def test_older_xfer_record_has_no_event():
+    assert xfer_record_event(CaptureRecord(RECORD_XFER, 0, "192.168.1.10|Update.txt", b"")) is None
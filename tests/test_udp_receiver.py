@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+import obspython as obs
+from benchmark import ROOT_DIR, SCENE_COLLECTION, make_diver
+
+
+@pytest.fixture
+def script():
+    obs.fake_reset()
+    obs.fake_load_scene_collection(SCENE_COLLECTION)
+
+    import dive_recorder_overlays as script
+    settings = obs.obs_data_create()
+    script.script_defaults(settings)
+    obs.obs_data_set_string(settings, "rootDir", ROOT_DIR)
+    obs.obs_data_set_bool(settings, "overlays_enabled", True)
+    obs.obs_data_set_string(settings, "udp_receive_mode", script.UDP_MODE_THREAD)
+    script.script_load(settings)
+    script.script_update(settings)
+    yield script
+    script.script_unload()
+
+
+def udp_timers(script):
+    callbacks = (script.udp_timer_callback, script.udp_wake_check_callback, script.udp_drain_callback)
+    return [timer.callback for timer in obs.fake_active_timers() if timer.callback in callbacks]
+
+
+def receive(script, no: int):
+    # as receiver thread does
+    with script.udp_lock:
+        script.udp_queue.append((make_diver(no, False, awards=True).encode(), ("127.0.0.1", 0), time.monotonic_ns()))
+    script.wake_main_thread()
+
+
+def test_idle_only_wake_check_timer_runs(script):
+    obs.fake_advance(5000)
+    assert udp_timers(script) == [script.udp_wake_check_callback]
+
+
+def test_drain_timer_runs_only_while_messages_come(script):
+    obs.fake_advance(5000)
+    received = script.udp_messages_received
+
+    receive(script, 1)
+    obs.fake_advance(script.UDP_WAKE_CHECK_INTERVAL_MS)
+    assert script.udp_messages_received == received + 1
+    assert script.udp_drain_callback in udp_timers(script)
+
+    # next message of the burst is processed on the next frame
+    receive(script, 2)
+    obs.fake_advance(script.UDP_DRAIN_INTERVAL_MS)
+    assert script.udp_messages_received == received + 2
+
+    # nothing queued - drain timer removes itself, wake check adds it again
+    obs.fake_advance(script.UDP_DRAIN_INTERVAL_MS)
+    assert udp_timers(script) == [script.udp_wake_check_callback]
+    receive(script, 3)
+    obs.fake_advance(script.UDP_WAKE_CHECK_INTERVAL_MS)
+    assert script.udp_messages_received == received + 3
+    obs.fake_advance(script.UDP_WAKE_CHECK_INTERVAL_MS)
+    assert udp_timers(script) == [script.udp_wake_check_callback]
+
+
+def test_stop_removes_udp_timers(script):
+    receive(script, 1)
+    obs.fake_advance(script.UDP_WAKE_CHECK_INTERVAL_MS)
+    script.stop_udp_receiving()
+    assert udp_timers(script) == []
+    assert not script.udp_drain_armed
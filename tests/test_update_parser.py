@@ -0,0 +1,47 @@
+from benchmark import make_diver, make_rankings
+from datatypes import DIVE_MESSAGE_FIELD_COUNT
+from update_parser import UpdateFileParser, iter_update_records
+
+
+def make_update_payload(divers: int) -> bytes:
+    event = make_diver(1, False, awards=False).split("|")[:DIVE_MESSAGE_FIELD_COUNT - 1]
+    fields = [f"{r.rank}|{r.points}|{r.unknown}|{r.diver}|{r.start_position}|{r.club_code}" for r in make_rankings(divers)]
+    return ("|".join(event + fields) + "|^").encode('utf-16le')
+
+
+def test_whole_payload_gives_all_records():
+    parser = UpdateFileParser()
+    parser.feed(make_update_payload(12))
+    parser.close()
+
+    assert parser.records == make_rankings(12)
+    assert parser.event_record.meet_title == "Benchmark Meet"
+    assert parser.event_record.short_event_name == "M1m"
+
+
+def test_pieces_of_any_size_give_same_records():
+    payload = make_update_payload(12)
+    # odd sizes split UTF-16 code units and fields
+    for size in (1, 3, 7, 64, 1461):
+        chunks = [payload[i:i + size] for i in range(0, len(payload), size)]
+        assert list(iter_update_records(chunks)) == make_rankings(12), size
+
+
+def test_record_is_returned_as_soon_as_complete():
+    payload = make_update_payload(3)
+    text = payload.decode('utf-16le')
+    second_record_end = text.index("|", text.index("First2 Family2")) + len("|2|VDC|")
+
+    parser = UpdateFileParser()
+    completed = parser.feed(text[:second_record_end].encode('utf-16le'))
+    assert [r.diver for r in completed] == ["First1 Family1", "First2 Family2"]
+    assert [r.diver for r in parser.feed(text[second_record_end:].encode('utf-16le'))] == ["First3 Family3"]
+    assert parser.close() == []
+
+
+def test_bad_record_is_skipped():
+    text = make_update_payload(3).decode('utf-16le').replace("First1 Family1|3|", "First1 Family1|x|")  # start position
+
+    records = list(iter_update_records([text.encode('utf-16le')]))
+
+    assert [r.diver for r in records] == ["First2 Family2", "First3 Family3"]
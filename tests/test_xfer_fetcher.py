@@ -0,0 +1,137 @@
+import socket
+import threading
+import time
+
+import pytest
+
+import obspython as obs
+import xfer_fetcher
+
+PAYLOAD = "Update".encode('utf-16le')
+FETCH_TIMEOUT = 5.0  # seconds
+
+
+class XferServer:
+    '''Local stand-in for DiveRecorder XFER server: answers "XFER|<file>" lines with length-prefixed payload.'''
+
+    def __init__(self, close_after_response: bool, answer_second_request: bool = True):
+        self.close_after_response = close_after_response
+        self.answer_second_request = answer_second_request
+        self.connections = 0
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket):
+        with conn, conn.makefile('rb') as requests:
+            for requests_served in range(1000):
+                if not requests.readline():
+                    return
+                if requests_served and not self.answer_second_request:
+                    time.sleep(xfer_fetcher.XFER_RECEIVE_TIMEOUT * 2)
+                    return
+                conn.sendall(len(PAYLOAD).to_bytes(4, 'big') + PAYLOAD)
+                if self.close_after_response:
+                    return
+
+    def close(self):
+        self.listener.close()
+
+
+@pytest.fixture
+def fetch(monkeypatch):
+    servers = []
+
+    def start(close_after_response: bool, answer_second_request: bool = True) -> XferServer:
+        server = XferServer(close_after_response, answer_second_request)
+        servers.append(server)
+        monkeypatch.setattr(xfer_fetcher, "XFER_TCP_PORT", server.port)
+        return server
+
+    obs.fake_reset()
+    yield start
+    xfer_fetcher.dvov_xfer_stop()
+    for server in servers:
+        server.close()
+
+
+def fetch_once(on_payload=None) -> tuple:
+    results = []
+    done = threading.Event()
+
+    def deliver(data, timing, consumer):
+        results.append((bytes(data), timing.reused_connection))
+        done.set()
+        if on_payload:
+            on_payload(data, timing, consumer)
+
+    xfer_fetcher.xfer_fetch_async("127.0.0.1", "Update.txt", deliver)
+    assert done.wait(FETCH_TIMEOUT)
+    _wait_idle()
+    return results[0]
+
+
+def _wait_idle():
+    deadline = time.monotonic() + FETCH_TIMEOUT
+    while time.monotonic() < deadline:
+        with xfer_fetcher._slots_lock:
+            if not xfer_fetcher._slots[("127.0.0.1", "Update.txt")].in_flight:
+                return
+        time.sleep(0.01)
+    raise AssertionError("fetch still in flight")
+
+
+def slot():
+    return xfer_fetcher._slots[("127.0.0.1", "Update.txt")]
+
+
+def test_kept_connection_is_reused(fetch):
+    server = fetch(close_after_response=False)
+
+    assert [fetch_once() for _ in range(3)] == [(PAYLOAD, False), (PAYLOAD, True), (PAYLOAD, True)]
+    assert server.connections == 1
+    assert (slot().fetches, slot().failures, slot().reused) == (3, 0, 2)
+
+
+def test_connection_closed_after_response_is_not_kept(fetch):
+    server = fetch(close_after_response=True)
+
+    fetch_once()
+    time.sleep(0.1)  # server closes its side
+    assert [fetch_once() for _ in range(2)] == [(PAYLOAD, False), (PAYLOAD, False)]
+
+    assert server.connections == 3
+    assert not slot().keep_connection
+    assert slot().connection is None
+    assert (slot().fetches, slot().failures, slot().reused) == (3, 0, 0)
+
+
+def test_unanswered_request_on_kept_connection_is_retried_on_new_one(fetch):
+    server = fetch(close_after_response=False, answer_second_request=False)
+
+    assert [fetch_once() for _ in range(3)] == [(PAYLOAD, False), (PAYLOAD, False), (PAYLOAD, False)]
+
+    assert server.connections == 3
+    assert not slot().keep_connection
+    assert (slot().fetches, slot().failures) == (3, 0)
+
+
+def test_processing_error_is_not_failed_fetch(fetch):
+    fetch(close_after_response=False)
+
+    def fail(data, timing, consumer):
+        raise ValueError("bad payload")
+
+    fetch_once(fail)
+
+    assert (slot().fetches, slot().failures) == (1, 0)
+    assert (obs.LOG_ERROR, "Failed to process Update.txt from 127.0.0.1 - bad payload") in obs.log
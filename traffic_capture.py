@@ -0,0 +1,166 @@
+'''
+Capture of DiveRecorder traffic - UDP datagrams received on portClient and XFER payloads (Update.txt) fetched over TCP -
+into compact append-only capture file, so meet-day traffic can be replayed offline (see dev/replay.py).
+
+File format: CAPTURE_MAGIC followed by records:
+    header: kind (1 byte), timestamp (8 bytes, ns since capture start, monotonic clock), meta length (2 bytes), payload length (4 bytes)
+    meta:   UTF-8, UDP - "ip:port" of sender, XFER - "ip|file name|event a/b" (event missing in older captures)
+    payload: raw bytes as received (datagram / XFER payload without 4-byte length header)
+All numbers little endian.
+Records are timestamped by the capturing thread (OBS main thread for UDP, fetch thread for XFER) and written and flushed
+by writer thread, callers only queue them.
+'''
+import typing
+
+if typing.TYPE_CHECKING:
+    import _obspython as obs  # full symbol set for IDE
+else:
+    import obspython as obs   # real runtime module
+
+import os
+import queue
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Union
+
+CAPTURE_MAGIC = b"DVCAP1\n"
+CAPTURE_FOLDER = "Captures"
+CAPTURE_FILE_EXT = ".dvcap"
+CAPTURE_THREAD_NAME = "DiveRecorder capture writer"
+CAPTURE_STOP_TIMEOUT = 2.0  # seconds, writer thread writes records queued before stop
+
+RECORD_UDP = 1
+RECORD_XFER = 2
+
+_RECORD_HEADER = struct.Struct("<BQHI")
+
+@dataclass
+class CaptureRecord:
+    kind: int
+    timestamp_ns: int
+    meta: str
+    payload: bytes
+
+
+# ---------------------------
+# Recorder
+# ---------------------------
+_capture_queue: Union["queue.SimpleQueue", None] = None  # queue of running writer thread
+_capture_writer: Union[threading.Thread, None] = None
+_capture_path = ""
+_capture_start_ns = 0
+
+def capture_is_active() -> bool:
+    return _capture_queue is not None
+
+
+def dvov_capture_start(root_dir: str) -> str:
+    """
+    Starts new capture file in <root_dir>/Captures, returns its path.
+    """
+    global _capture_queue, _capture_writer, _capture_path, _capture_start_ns
+
+    dvov_capture_stop()
+
+    folder = os.path.join(root_dir, CAPTURE_FOLDER)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, time.strftime("capture_%Y%m%d_%H%M%S") + CAPTURE_FILE_EXT)
+
+    capture_file = open(path, "ab")
+    capture_file.write(CAPTURE_MAGIC)
+    capture_file.flush()
+
+    _capture_path = path
+    _capture_start_ns = time.monotonic_ns()
+    records = queue.SimpleQueue()
+    _capture_writer = threading.Thread(target=_writer_main, args=(capture_file, records), name=CAPTURE_THREAD_NAME)
+    _capture_writer.daemon = True  # thread will exit when OBS exits
+    _capture_writer.start()
+    _capture_queue = records
+
+    obs.script_log(obs.LOG_INFO, f"Capturing DiveRecorder traffic to {path}")
+    return path
+
+
+def dvov_capture_stop():
+    global _capture_queue, _capture_writer
+
+    records, writer = _capture_queue, _capture_writer
+    _capture_queue = None
+    _capture_writer = None
+
+    if records is not None:
+        records.put(None)  # writer writes what is queued, closes file and exits
+        writer.join(CAPTURE_STOP_TIMEOUT)
+        obs.script_log(obs.LOG_INFO, f"Traffic capture stopped: {_capture_path}")
+
+
+def _queue_record(kind: int, meta: str, payload: bytes):
+    records = _capture_queue
+    if records is None:
+        return
+    records.put((kind, time.monotonic_ns() - _capture_start_ns, meta, payload))
+
+
+def _writer_main(capture_file: BinaryIO, records: "queue.SimpleQueue"):
+    with capture_file:
+        while True:
+            record = records.get()
+            if record is None:
+                return
+            kind, timestamp_ns, meta, payload = record
+            meta_bytes = meta.encode("utf-8")[:0xFFFF]
+            try:
+                capture_file.write(_RECORD_HEADER.pack(kind, timestamp_ns, len(meta_bytes), len(payload)))
+                capture_file.write(meta_bytes)
+                capture_file.write(payload)
+                # flush each record - capture should survive OBS crash, which is one of the reasons to capture
+                capture_file.flush()
+            except OSError as e:
+                obs.script_log(obs.LOG_ERROR, f"Traffic capture write failed: {e}")
+
+
+def capture_udp_datagram(data: bytes, addr):
+    if _capture_queue is None:
+        return
+    _queue_record(RECORD_UDP, f"{addr[0]}:{addr[1]}" if addr else "", data)
+
+
+def capture_xfer_payload(ip_address: str, file_name: str, event_ab: str, data: bytes):
+    if _capture_queue is None:
+        return
+    # data is kept by reference until written - fetcher receives each payload into new buffer
+    _queue_record(RECORD_XFER, f"{ip_address}|{file_name}|{event_ab}", data)
+
+
+def xfer_record_event(record: CaptureRecord) -> Union[str, None]:
+    # event of XFER record, None in captures made before it was recorded
+    fields = record.meta.split("|")
+    return fields[2] if len(fields) > 2 else None
+
+
+# ---------------------------
+# Reader
+# ---------------------------
+def read_capture(path: str) -> Iterator[CaptureRecord]:
+    """
+    Yields records from capture file. Incomplete last record (e.g. OBS crashed while writing) is ignored.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError(f"Not a capture file: {path}")
+
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+
+            kind, timestamp_ns, meta_len, payload_len = _RECORD_HEADER.unpack(header)
+            meta = f.read(meta_len)
+            payload = f.read(payload_len)
+            if len(meta) < meta_len or len(payload) < payload_len:
+                return
+
+            yield CaptureRecord(kind, timestamp_ns, meta.decode("utf-8", errors="replace"), payload)
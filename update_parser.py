@@ -0,0 +1,178 @@
+'''
+Incremental parser of DiveRecorder Update.txt (XFER payload, UTF-16LE, fields separated by "|").
+
+Payload is fed in pieces as it is received: text is decoded by incremental decoder, split into fields and each ranking
+record is parsed as soon as its 6 fields are complete - whole decoded text or list of all its fields is never built.
+
+Layout: fields 1..74 are event record (same as REFEREE message, only meet/event info is relevant), ranking records
+of 6 fields (rank, points, unknown, diver, start position, club code) start at field 74.
+'''
+import typing
+
+if typing.TYPE_CHECKING:
+    import _obspython as obs  # full symbol set for IDE
+else:
+    import obspython as obs   # real runtime module
+
+import codecs
+import hashlib
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Union
+
+from datatypes import DiveListRecord, DiveMessageView, DIVE_MESSAGE_FIELD_COUNT
+from obs_utils import log_info_if_debug
+
+UPDATE_RECORDS_START_FIELD = 74  # 1-based, overlaps last field of event record
+UPDATE_RECORD_SIZE = 6
+MAX_LOGGED_PARSE_ERRORS = 5
+UPDATE_DIGEST_SIZE = 16  # bytes of blake2b digest
+
+
+class UpdateFileParser:
+    def __init__(self, debug: bool = False):
+        self.debug = debug
+        self.event_record: Union[DiveMessageView, None] = None
+        self.records: List[DiveListRecord] = []
+
+        self._decoder = codecs.getincrementaldecoder('utf-16-le')(errors='replace')
+        self._tail = ""              # text after last "|" (field not complete yet)
+        self._event_fields: List[str] = []
+        self._record_fields: List[str] = []
+        self._error_count = 0
+        self._stopped = False        # too many errors, rest of payload is ignored
+
+    def feed(self, data) -> List[DiveListRecord]:
+        """
+        Feeds next piece of payload (bytes-like), returns ranking records completed by it.
+        """
+        text = self._tail + self._decoder.decode(data)
+        fields = text.split("|")
+        self._tail = fields.pop()
+        return self._parse_fields(fields)
+
+    def feed_text(self, text: str) -> List[DiveListRecord]:
+        fields = (self._tail + text).split("|")
+        self._tail = fields.pop()
+        return self._parse_fields(fields)
+
+    def close(self) -> List[DiveListRecord]:
+        """
+        Ends payload. Text after last "|" is the last field (incomplete last record is ignored).
+        """
+        tail = self._tail + self._decoder.decode(b'', final=True)
+        self._tail = ""
+        records = self._parse_fields([tail])
+
+        if self.event_record is None:
+            self.event_record = DiveMessageView(self._event_fields)
+
+        log_info_if_debug(self.debug, "Finished parsing UPDATE message, total records: %d", len(self.records))
+        return records
+
+    def _parse_fields(self, fields: List[str]) -> List[DiveListRecord]:
+        if self.event_record is None:
+            missing = DIVE_MESSAGE_FIELD_COUNT - len(self._event_fields)
+            self._event_fields.extend(fields[:missing])
+            if len(self._event_fields) < DIVE_MESSAGE_FIELD_COUNT:
+                return []
+
+            self.event_record = DiveMessageView(self._event_fields)
+            # records start within event record fields
+            self._record_fields = self._event_fields[UPDATE_RECORDS_START_FIELD - 1:]
+            fields = fields[missing:]
+
+        if self._stopped:
+            return []
+
+        record_fields = self._record_fields
+        record_fields.extend(fields)
+
+        records = []
+        complete = len(record_fields) - len(record_fields) % UPDATE_RECORD_SIZE
+        for i in range(0, complete, UPDATE_RECORD_SIZE):
+            record = self._parse_record(record_fields[i:i + UPDATE_RECORD_SIZE])
+            if record is not None:
+                records.append(record)
+            elif self._stopped:
+                break
+        del record_fields[:complete]
+
+        self.records.extend(records)
+        return records
+
+    def _parse_record(self, chunk: List[str]) -> Union[DiveListRecord, None]:
+        rank_str, points_str, unknown, diver, start_pos_str, club_code = chunk
+
+        try:
+            record = DiveListRecord(
+                rank=int(rank_str) if rank_str.strip() else 0,
+                points=points_str.strip(),
+                unknown=unknown.strip(),
+                diver=diver.strip(),
+                start_position=int(start_pos_str) if start_pos_str.strip() else 0,
+                club_code=club_code.strip(),
+            )
+            if self.debug:  # per record, would push everything else out of debug log ring buffer
+                log_info_if_debug(self.debug, "Parsed Record: %s", record)
+            return record
+
+        except Exception:
+            # If any conversion fails, skip this chunk safely
+            self._error_count += 1
+            if self._error_count <= MAX_LOGGED_PARSE_ERRORS:
+                obs.script_log(obs.LOG_WARNING, f"Failed to parse ranking record chunk: {chunk}")
+            else:
+                obs.script_log(obs.LOG_WARNING, "Multiple parsing errors encountered; further errors will be suppressed.")
+                self._stopped = True
+            return None
+
+
+def iter_update_records(chunks: Iterable, debug: bool = False) -> Iterator[DiveListRecord]:
+    """
+    Yields ranking records from payload pieces as soon as each record is complete.
+    """
+    parser = UpdateFileParser(debug)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+# ---------------------------
+# Last parsed payload
+# ---------------------------
+# DiveRecorder sends the same Update.txt many times - unchanged payload is recognized by length and digest of raw bytes
+# and its parse result is reused. Kept in this module because OBS reloads only the script module on "Reload script",
+# modules it imports keep their state, so unchanged payload is not parsed again even after script reload.
+@dataclass
+class ParsedUpdate:
+    length: int
+    digest: bytes
+    records: List[DiveListRecord]
+    event_record: DiveMessageView
+
+
+last_parsed_update: Union[ParsedUpdate, None] = None
+
+
+def payload_digest(data) -> bytes:
+    return hashlib.blake2b(data, digest_size=UPDATE_DIGEST_SIZE).digest()
+
+
+def may_be_last_parsed_update(payload_len: int) -> bool:
+    """
+    Length fast path: payload of different length than last parsed one has certainly changed.
+    """
+    return last_parsed_update is not None and last_parsed_update.length == payload_len
+
+
+def find_parsed_update(data, digest: bytes) -> Union[ParsedUpdate, None]:
+    if may_be_last_parsed_update(len(data)) and last_parsed_update.digest == digest:
+        return last_parsed_update
+    return None
+
+
+def remember_parsed_update(data, digest: bytes, parser: UpdateFileParser) -> ParsedUpdate:
+    global last_parsed_update
+
+    last_parsed_update = ParsedUpdate(len(data), digest, parser.records, parser.event_record)
+    return last_parsed_update
@@ -0,0 +1,287 @@
+'''
+Fetching of DiveRecorder remote files (Update.txt) over TCP - "XFER|<file name>" request, response is 4-byte big endian
+payload length followed by payload.
+
+DiveRecorder repeats UPDATE datagrams, so fetches are single-flight: at most one fetch per host and file is in flight,
+requests arriving meanwhile are coalesced into one more fetch started when the current one finishes (trailing edge),
+so the newest file contents are always fetched, but never more than once at a time. Each request gets generation number,
+results older than the last delivered one (e.g. fetch finishing after script reload) are dropped.
+Connection is kept open after fetch and reused by the next one. If DiveRecorder closes it (found closed or with unread
+data before the next request, or closed while the request is sent) or does not answer a second request on it, fetch is
+done on a new connection and keeping is turned off for the file - later fetches use a connection per request, which
+is closed after the payload is read (baseline read until DiveRecorder closed it).
+Stats and slot state are guarded by _slots_lock; connection of a slot is used only by its fetch thread while in flight.
+'''
+import typing
+
+if typing.TYPE_CHECKING:
+    import _obspython as obs  # full symbol set for IDE
+else:
+    import obspython as obs   # real runtime module
+
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Tuple, Union
+
+from debug_log import log_error
+
+XFER_TCP_PORT = 58291  # DiveRecorder listening TCP port
+XFER_CONNECT_TIMEOUT = 3.0  # seconds
+XFER_RECEIVE_TIMEOUT = 1.0  # seconds per recv
+XFER_RECV_SIZE = 16384
+
+
+@dataclass
+class FetchTiming:
+    generation: int
+    duration_ms: float
+    payload_len: int
+    reused_connection: bool
+
+
+class PayloadConsumer(typing.Protocol):
+    # receives payload pieces while it is being received (e.g. incremental parser)
+    def feed(self, data: memoryview): ...
+    def close(self): ...
+
+
+OnPayload = Callable[[bytearray, FetchTiming, Union[PayloadConsumer, None]], None]
+
+
+@dataclass
+class _FetchSlot:
+    ip_address: str
+    file_name: str
+    on_payload: OnPayload
+    new_consumer: Union[Callable[[int], Union[PayloadConsumer, None]], None] = None
+    generation: int = 0            # generation of newest request
+    delivered_generation: int = 0  # generation of last result passed to on_payload
+    in_flight: bool = False
+    closed: bool = False           # fetcher stopped, results are dropped
+    connection: Union[socket.socket, None] = None
+    keep_connection: bool = True   # cleared if DiveRecorder closes kept connection or does not answer second request on it
+    # stats
+    fetches: int = 0
+    failures: int = 0
+    coalesced: int = 0
+    stale: int = 0
+    reused: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+_slots: Dict[Tuple[str, str], _FetchSlot] = {}
+_slots_lock = threading.Lock()
+
+
+def xfer_fetch_async(ip_address: str, file_name: str, on_payload: OnPayload,
+                     new_consumer: Union[Callable[[int], Union[PayloadConsumer, None]], None] = None):
+    """
+    Requests fetch of file from DiveRecorder at ip_address. on_payload(data, timing, consumer) is called from fetch thread
+    with raw payload (without length header) for each fetch that is not stale. If new_consumer(payload_len) is given
+    and returns consumer, it is fed with payload pieces as they are received.
+    """
+    key = (ip_address, file_name)
+
+    with _slots_lock:
+        slot = _slots.get(key)
+        if slot is None:
+            slot = _slots[key] = _FetchSlot(ip_address, file_name, on_payload)
+        slot.on_payload = on_payload
+        slot.new_consumer = new_consumer
+        slot.generation += 1
+
+        if slot.in_flight:
+            # running fetch will start one more when it finishes
+            slot.coalesced += 1
+            return
+        slot.in_flight = True
+
+    thread = threading.Thread(target=_fetch_worker, args=(slot,), name=f"DiveRecorder XFER {file_name}")
+    thread.daemon = True  # thread will exit when OBS exits
+    thread.start()
+
+
+def dvov_xfer_stop():
+    """
+    Called on script unload: closes kept connections, results of fetches still in flight are dropped.
+    Logs fetch stats.
+    """
+    connections = []
+    with _slots_lock:
+        slots = list(_slots.values())
+        _slots.clear()
+        for slot in slots:
+            slot.closed = True
+            # connection of fetch in flight is closed by its thread
+            if slot.connection is not None and not slot.in_flight:
+                connections.append(slot.connection)
+                slot.connection = None
+
+        stats = [f"XFER {slot.ip_address} {slot.file_name}: {xfer_stats_text(slot)}" for slot in slots if slot.fetches]
+
+    for sock in connections:
+        _close(sock)
+
+    for line in stats:
+        obs.script_log(obs.LOG_INFO, line)
+
+
+def xfer_stats_text(slot: _FetchSlot) -> str:
+    # caller holds _slots_lock
+    average_ms = slot.total_ms / slot.fetches if slot.fetches else 0.0
+    return (f"{slot.fetches} fetches ({slot.failures} failed), avg {average_ms:.1f} ms, max {slot.max_ms:.1f} ms, "
+            f"{slot.reused} on reused connection, {slot.coalesced} requests coalesced, {slot.stale} stale results dropped")
+
+
+def get_xfer_stats() -> Dict[Tuple[str, str], str]:
+    with _slots_lock:
+        return {key: xfer_stats_text(slot) for key, slot in _slots.items()}
+
+
+# ---------------------------
+# Fetch thread
+# ---------------------------
+def _fetch_worker(slot: _FetchSlot):
+    while True:
+        with _slots_lock:
+            generation = slot.generation
+
+        start_ns = time.perf_counter_ns()
+        try:
+            data, consumer, reused = _fetch(slot)
+        except Exception as e:
+            with _slots_lock:
+                slot.fetches += 1
+                slot.failures += 1
+            log_error("Failed to fetch %s from %s:%d - %s", slot.file_name, slot.ip_address, XFER_TCP_PORT, e)
+        else:
+            duration_ms = (time.perf_counter_ns() - start_ns) / 1e6
+            with _slots_lock:
+                slot.fetches += 1
+                slot.reused += reused
+                slot.total_ms += duration_ms
+                slot.max_ms = max(slot.max_ms, duration_ms)
+                stale = slot.closed or generation <= slot.delivered_generation
+                if stale:
+                    slot.stale += 1
+                else:
+                    slot.delivered_generation = generation
+
+            if not stale:
+                # processing failure is not a failed fetch
+                try:
+                    slot.on_payload(data, FetchTiming(generation, duration_ms, len(data), reused), consumer)
+                except Exception as e:
+                    log_error("Failed to process %s from %s - %s", slot.file_name, slot.ip_address, e)
+
+        with _slots_lock:
+            if slot.closed or slot.generation == generation:
+                slot.in_flight = False
+                if slot.closed and slot.connection is not None:
+                    _close(slot.connection)
+                    slot.connection = None
+                return
+        # requests arrived while fetching - fetch again (once for all of them)
+
+
+def _fetch(slot: _FetchSlot) -> Tuple[bytearray, Union[PayloadConsumer, None], bool]:
+    """
+    Fetches file on kept connection if DiveRecorder did not close it, otherwise on new one.
+    Returns (payload, consumer fed with it, connection was reused).
+    """
+    sock = slot.connection
+    slot.connection = None
+
+    if sock is not None and not _connection_is_usable(sock):
+        # DiveRecorder closes connection after response - do not keep the next one
+        _close(sock)
+        sock = None
+        slot.keep_connection = False
+
+    if sock is not None:
+        try:
+            data, consumer = _request(sock, slot.file_name, slot.new_consumer)
+            slot.connection = sock
+            return data, consumer, True
+        except socket.timeout:
+            # no answer on kept connection - DiveRecorder serves one request per connection
+            _close(sock)
+            slot.keep_connection = False
+        except OSError:
+            # closed by DiveRecorder meanwhile - retry on new connection
+            _close(sock)
+            slot.keep_connection = False
+
+    sock = socket.create_connection((slot.ip_address, XFER_TCP_PORT), timeout=XFER_CONNECT_TIMEOUT)
+    try:
+        data, consumer = _request(sock, slot.file_name, slot.new_consumer)
+    except Exception:
+        _close(sock)
+        raise
+
+    if slot.keep_connection:
+        slot.connection = sock
+    else:
+        _close(sock)
+    return data, consumer, False
+
+
+def _request(sock: socket.socket, file_name: str,
+             new_consumer: Union[Callable[[int], Union[PayloadConsumer, None]], None]) -> Tuple[bytearray, Union[PayloadConsumer, None]]:
+    sock.settimeout(XFER_RECEIVE_TIMEOUT)
+    sock.sendall(f"XFER|{file_name}\n".encode('utf-8'))
+
+    # Step 1: read the 4-byte header
+    header = bytearray(4)
+    _recv_exact_into(sock, memoryview(header))
+    payload_len = int.from_bytes(header, 'big')
+    consumer = new_consumer(payload_len) if new_consumer else None
+
+    # Step 2: read the full payload into buffer allocated once, pass each received piece to consumer
+    payload = bytearray(payload_len)
+    view = memoryview(payload)
+    bytes_read = 0
+    while bytes_read < payload_len:
+        n = sock.recv_into(view[bytes_read:], min(XFER_RECV_SIZE, payload_len - bytes_read))
+        if not n:
+            raise ConnectionError("Connection closed before full message received")
+        if consumer is not None:
+            consumer.feed(view[bytes_read:bytes_read + n])
+        bytes_read += n
+
+    if consumer is not None:
+        consumer.close()
+
+    return payload, consumer
+
+
+def _recv_exact_into(sock: socket.socket, view: memoryview):
+    bytes_read = 0
+    while bytes_read < len(view):
+        n = sock.recv_into(view[bytes_read:])
+        if not n:
+            raise ConnectionError("Connection closed early")
+        bytes_read += n
+
+
+def _connection_is_usable(sock: socket.socket) -> bool:
+    # kept connection is usable if it is open and has no unread data
+    try:
+        sock.setblocking(False)
+        try:
+            sock.recv(1, socket.MSG_PEEK)
+            return False  # closed by peer (b'') or unexpected data
+        except BlockingIOError:
+            return True
+    except OSError:
+        return False
+
+
+def _close(sock: socket.socket):
+    try:
+        sock.close()
+    except OSError:
+        pass